@@ -0,0 +1,138 @@
+import argparse
+import time
+
+import gym
+from gym import logger, spaces
+from gym.envs.temp_ctrl import TempCtrlVectorEnvs
+import numpy as np
+
+
+class MPCAgent(object):
+    """
+    Sampling-based model-predictive control of the temp_ctrl envs
+
+    Every decision, `num_samples` heater power sequences of `horizon` steps are
+    rolled out together through `model`, a `TempCtrlVectorEnvs` of the
+    controlled system with `num_envs=num_samples`. The first action of the
+    planned sequence is taken and the rest of it warm-starts the next decision.
+
+    Args:
+        model (TempCtrlVectorEnvs): batched model of the controlled env
+        horizon (int): number of steps planned ahead
+        method (str): 'cem' refits the sampling distribution to the best
+            `elite_frac` of the sequences, 'mppi' to all the sequences weighted
+            by exp(return/temperature)
+        n_iter (int): number of sampling iterations per decision
+        elite_frac (float): fraction of the sequences kept by 'cem'
+        temperature (float): scale of the returns in the weights of 'mppi'
+        initial_std (float): standard deviation of the heater power, as a fraction of its range
+        seed (int): seed of the sampling of the sequences
+    """
+    def __init__(self, model, horizon=20, method='cem', n_iter=4, elite_frac=0.1,
+                 temperature=0.01, initial_std=0.5, seed=None):
+        if method not in ['cem', 'mppi']:
+            raise ValueError('Unknown MPC method {}'.format(method))
+        self.model = model
+        self.num_samples = model.num_envs
+        self.horizon = horizon
+        self.method = method
+        self.n_iter = n_iter
+        self.n_elite = max(1, int(np.round(self.num_samples*elite_frac)))
+        self.temperature = temperature
+        self.np_random = np.random.RandomState(seed)
+
+        space = model.single_action_space
+        if isinstance(space, spaces.Discrete):
+            self.low, self.high = 0., float(space.n - 1)
+        else:
+            self.low, self.high = float(space.low[0]), float(space.high[0])
+        self.initial_std = initial_std*(self.high - self.low)
+        self.reset()
+
+    def reset(self):
+        self.mean = np.full(self.horizon, (self.low + self.high)/2.)
+
+    def actions(self, sequences):
+        """Returns the actions of the model for a column of the sequences"""
+        if isinstance(self.model.single_action_space, spaces.Discrete):
+            return np.round(sequences).astype(np.int64)
+        return sequences[:, None]
+
+    def rollout(self, observation, elapsed_steps, sequences):
+        """Returns the return of each sequence of heater powers from `observation`"""
+        model = self.model
+        model.state[:] = observation
+        model.elapsed_steps[:] = elapsed_steps
+        returns = np.zeros(self.num_samples)
+        alive = np.ones(self.num_samples, dtype=np.bool_)
+        for t in range(self.horizon):
+            _, rewards, dones, _ = model.step(self.actions(sequences[:, t]))
+            # systems that railed are reset by the model, their return is final
+            returns += np.where(alive, rewards, 0.)
+            alive &= ~dones
+        return returns
+
+    def act(self, observation, elapsed_steps=0):
+        """Returns the action to take in `observation`, after `elapsed_steps` steps of the env"""
+        mean = self.mean
+        std = np.full(self.horizon, self.initial_std)
+        for _ in range(self.n_iter):
+            sequences = np.clip(mean + std*self.np_random.randn(self.num_samples, self.horizon),
+                                self.low, self.high)
+            if isinstance(self.model.single_action_space, spaces.Discrete):
+                sequences = np.round(sequences)
+            returns = self.rollout(observation, elapsed_steps, sequences)
+            if self.method == 'cem':
+                elite = sequences[returns.argsort()[::-1][:self.n_elite]]
+                mean, std = elite.mean(axis=0), elite.std(axis=0)
+            else:
+                weights = np.exp((returns - returns.max())/self.temperature)
+                weights /= weights.sum()
+                mean = weights.dot(sequences)
+                std = np.sqrt(weights.dot((sequences - mean)**2))
+        self.mean = np.append(mean[1:], mean[-1])
+        return self.actions(mean[:1])[0]
+
+
+if __name__ == '__main__':
+    logger.set_level(logger.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('target', nargs="?", default="Vaccan_D100_Rexp_Tsin_t10-v0")
+    parser.add_argument('--method', choices=['cem', 'mppi'], default='cem')
+    parser.add_argument('--num_samples', type=int, default=1000)
+    parser.add_argument('--horizon', type=int, default=20)
+    parser.add_argument('--n_iter', type=int, default=4)
+    parser.add_argument('--temperature', type=float, default=0.01)
+    parser.add_argument('--episodes', type=int, default=3)
+    parser.add_argument('--num_steps', type=int, default=200)
+    args = parser.parse_args()
+
+    env = gym.make(args.target)
+    env.seed(0)
+
+    # The model is the batched copy of the env, integrated exactly with the
+    # ambient temperature held over each step
+    kwargs = dict(env.spec._kwargs)
+    kwargs['integrator'] = 'exact'
+    model = TempCtrlVectorEnvs(args.num_samples, copy=False, **kwargs)
+    model.seed(0)
+    agent = MPCAgent(model, horizon=args.horizon, method=args.method,
+                     n_iter=args.n_iter, temperature=args.temperature, seed=0)
+
+    for i in range(args.episodes):
+        ob = env.reset()
+        agent.reset()
+        total_rew, start = 0., time.time()
+        for t in range(args.num_steps):
+            action = agent.act(ob, env.unwrapped.elapsed_steps)
+            ob, reward, done, _ = env.step(action)
+            total_rew += reward
+            if done:
+                break
+        elapsed = time.time() - start
+        steps = (t + 1)*args.n_iter*args.horizon*args.num_samples
+        print('Episode %2i. Return: %7.3f over %i steps, final T_can %.2f C, %.2f ms per decision, %.2e model steps/s'
+              % (i, total_rew, t + 1, ob[0], 1e3*elapsed/(t + 1), steps/elapsed))
+
+    env.close()
@@ -1,4 +1,4 @@
-from gym.envs.registration import registry, register, make, spec
+from gym.envs.registration import registry, register, register_family, make, spec
 
 # Custom Environment for Temperature Control
 # ----------------------------------------------------
@@ -9,21 +9,27 @@ reward_type = ['Rw10', 'Rw4', 'Rquad', 'Rexp', 'Rrecquad']
 ambtemp_model = ['Tcon', 'Tsin', 'Trand', 'Tsinrand']
 timestep_size = ['t1', 't10', 't30', 't60', 't100']
 
+# e.g. Vaccan_D200_Rexp_Tsin_t10-v0, specs are created when first looked up
+register_family(
+    id='{thermalParam}_{act_space}_{reward_type}_{ambtemp_model}_{timestep_size}-v0',
+    entry_point='gym.envs.temp_ctrl:TempCtrlEnvs',
+    params=[('thermalParam', thermal_param),
+            ('act_space', act_space),
+            ('reward_type', reward_type),
+            ('ambtemp_model', ambtemp_model),
+            ('timestep_size', timestep_size)],
+)
 
-for p in thermal_param:
-    for a in act_space:
-        for r in reward_type:
-            for ta in ambtemp_model:
-                for ts in timestep_size:
-                    register(
-                        id='{}_{}_{}_{}_{}-v0'.format(p,a,r,ta,ts),
-                        entry_point='gym.envs.temp_ctrl:TempCtrlEnvs',
-                        kwargs={'thermalParam': p,
-                                'act_space': a,
-                                'reward_type': r,
-                                'ambtemp_model': ta,
-                                'timestep_size': ts},
-                    )
+# Multi-node thermal networks of the same systems, e.g. SeismNet_D200_Rexp_Tsin_t10-v0
+register_family(
+    id='{thermalParam}_{act_space}_{reward_type}_{ambtemp_model}_{timestep_size}-v0',
+    entry_point='gym.envs.temp_ctrl:ThermalNetworkEnv',
+    params=[('thermalParam', [param + 'Net' for param in thermal_param]),
+            ('act_space', act_space),
+            ('reward_type', reward_type),
+            ('ambtemp_model', ambtemp_model),
+            ('timestep_size', timestep_size)],
+)
 
 
 
@@ -144,21 +150,6 @@ register(
     max_episode_steps=500,
 )
 
-register(
-    id='VacCan-v0',
-    entry_point='gym.envs.classic_control:VacCanEnvDiscrete',
-)
-
-register(
-         id='VacCanC-v0',
-         entry_point='gym.envs.classic_control:VacCanEnvContinuous',
-         )
-
-register(
-id='TempControl-v0', 
-    entry_point='gym.envs.classic_control:TempEnv', 
-)
-
 # Box2d
 # ----------------------------------------
 
@@ -11,25 +11,34 @@ if "Apple" in sys.version:
 
 from gym import error
 
+# pyglet and OpenGL are only needed by the windows, not by the 'numpy' backend
 try:
     import pyglet
-except ImportError as e:
-    raise ImportError('''
+except ImportError:
+    pyglet = None
+    _pyglet_error = '''
     Cannot import pyglet.
     HINT: you can install pyglet directly via 'pip install pyglet'.
     But if you really just want to install all Gym dependencies and not have to think about it,
     'pip install -e .[all]' or 'pip install gym[all]' will do it.
-    ''')
-
-try:
-    from pyglet.gl import *
-except ImportError as e:
-    raise ImportError('''
-    Error occurred while running `from pyglet.gl import *`
+    '''
+else:
+    if os.environ.get('GYM_RENDERING_BACKEND') == 'numpy':
+        # without the hidden shadow window, pyglet.gl is imported without a display
+        pyglet.options['shadow_window'] = False
+    try:
+        from pyglet.gl import *
+    except Exception as e:
+        # e.g. an ImportError without OpenGL, or no display for the shadow window
+        pyglet = None
+        _pyglet_error = '''
+    Error occurred while running `from pyglet.gl import *`: {}
     HINT: make sure you have OpenGL install. On Ubuntu, you can run 'apt-get install python-opengl'.
     If you're running on a server, you may need a virtual frame buffer; something like this should work:
     'xvfb-run -s \"-screen 0 1400x900x24\" python <your_script.py>'
-    ''')
+    Alternatively, set the environment variable GYM_RENDERING_BACKEND=numpy to render
+    'rgb_array' frames without a window.
+    '''.format(e)
 
 import math
 import numpy as np
@@ -42,6 +51,8 @@ def get_display(spec):
 
     Pyglet only supports multiple Displays on Linux.
     """
+    if pyglet is None:
+        raise ImportError(_pyglet_error)
     if spec is None:
         return pyglet.canvas.get_display()
         # returns already available pyglet_display,
@@ -62,23 +73,46 @@ def get_window(width, height, display, **kwargs):
     return pyglet.window.Window(width=width, height=height, display=display, config=config, context=context, **kwargs)
 
 class Viewer(object):
-    def __init__(self, width, height, display=None):
-        display = get_display(display)
+    """
+    Renders the geoms in a pyglet window, or with the 'numpy' backend, into a NumPy
+    array without any window or OpenGL context (in 'human' mode, nothing is shown).
 
+    The backend and the antialiasing of the 'numpy' backend (the number of samples
+    per pixel along each axis) default to the environment variables
+    GYM_RENDERING_BACKEND ('pyglet' or 'numpy') and GYM_RENDERING_ANTIALIAS, so that
+    they apply to the viewers created by the environments.
+    """
+    def __init__(self, width, height, display=None, backend=None, antialias=None):
+        self.window = None
+        if backend is None:
+            backend = os.environ.get('GYM_RENDERING_BACKEND', 'pyglet')
+        if backend not in ('pyglet', 'numpy'):
+            raise error.Error('Invalid rendering backend: {}. (Must be \'pyglet\' or \'numpy\'.)'.format(backend))
+        self.backend = backend
         self.width = width
         self.height = height
-        self.window = get_window(width=width, height=height, display=display)
-        self.window.on_close = self.window_closed_by_user
         self.isopen = True
         self.geoms = []
         self.onetime_geoms = []
         self.transform = Transform()
 
+        if backend == 'numpy':
+            if antialias is None:
+                antialias = int(os.environ.get('GYM_RENDERING_ANTIALIAS', 1))
+            self.rasterizer = Rasterizer(width, height, antialias=antialias)
+            return
+
+        display = get_display(display)
+        self.window = get_window(width=width, height=height, display=display)
+        self.window.on_close = self.window_closed_by_user
+
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
     def close(self):
-        if self.isopen and sys.meta_path:
+        if self.window is None:
+            self.isopen = False
+        elif self.isopen and sys.meta_path:
             # ^^^ check sys.meta_path to avoid 'ImportError: sys.meta_path is None, Python is likely shutting down'
             self.window.close()
             self.isopen = False
@@ -101,6 +135,10 @@ class Viewer(object):
         self.onetime_geoms.append(geom)
 
     def render(self, return_rgb_array=False):
+        if self.window is None:
+            arr = self.rasterizer.render(self.transform, self.geoms + self.onetime_geoms)
+            self.onetime_geoms = []
+            return arr.copy() if return_rgb_array else self.isopen
         glClearColor(1,1,1,1)
         self.window.clear()
         self.window.switch_to()
@@ -154,6 +192,8 @@ class Viewer(object):
         return geom
 
     def get_array(self):
+        if self.window is None:
+            return self.rasterizer.frame.copy()
         self.window.flip()
         image_data = pyglet.image.get_buffer_manager().get_color_buffer().get_image_data()
         self.window.flip()
@@ -324,14 +364,171 @@ class Image(Geom):
         self.set_color(1.0, 1.0, 1.0)
         self.width = width
         self.height = height
-        img = pyglet.image.load(fname)
-        self.img = img
+        self.fname = fname
+        # loaded when first rendered, the 'numpy' backend does not need pyglet
+        self.img = None
         self.flip = False
     def render1(self):
+        if self.img is None:
+            self.img = pyglet.image.load(self.fname)
         self.img.blit(-self.width/2, -self.height/2, width=self.width, height=self.height)
 
 # ================================================================
 
+class Rasterizer(object):
+    """
+    Renders the geoms into a NumPy RGB array, the way the OpenGL calls of their
+    `render` methods would, without OpenGL: the convex polygons (as drawn by
+    OpenGL) of `FilledPolygon`, `PolyLine` and `Line` (as polygons of their line
+    width in pixels, without stipple), `Point`, `Image`, and `Compound` geoms,
+    with their `Transform`, `Color` and `LineWidth` attributes.
+
+    With `antialias` greater than 1, every pixel is the average of `antialias` x
+    `antialias` samples.
+    """
+    def __init__(self, width, height, antialias=1):
+        assert antialias >= 1
+        self.width = width
+        self.height = height
+        self.antialias = antialias
+        # the samples, rendered at `antialias` times the resolution
+        self.buffer = np.empty((height*antialias, width*antialias, 3), dtype=np.uint8)
+        self.frame = self.buffer if antialias == 1 else np.empty((height, width, 3), dtype=np.uint8)
+        self._samples = None if antialias == 1 else np.empty((height, width, 3), dtype=np.float32)
+        # sample centres, x along the columns and y up the rows
+        self.pixels = self.buffer.reshape(-1, 3)
+        self.x = np.arange(self.buffer.shape[1]) + 0.5
+        self.y = self.buffer.shape[0] - np.arange(self.buffer.shape[0]) - 0.5
+        self._images = {}
+        # most geoms do not move between frames, so the pixels of their polygons are cached
+        self._polygons = {}
+
+    def render(self, transform, geoms):
+        """Returns the frame of the geoms, which is overwritten by the next frame"""
+        self.buffer.fill(255)
+        matrix = np.diag([self.antialias, self.antialias, 1.]).dot(_matrix(transform))
+        for geom in geoms:
+            self.draw(geom, matrix, (0, 0, 0, 1.0), 1)
+        if self.antialias > 1:
+            k = self.antialias
+            self.buffer.reshape(self.height, k, self.width, k, 3).mean(axis=(1, 3), out=self._samples)
+            np.rint(self._samples, out=self._samples)
+            np.copyto(self.frame, self._samples, casting='unsafe')
+        return self.frame
+
+    def draw(self, geom, matrix, color, linewidth):
+        # like `Geom.render`, the attributes are enabled in reverse order, so the
+        # last transform added is the outermost one
+        for attr in reversed(geom.attrs):
+            if isinstance(attr, Transform):
+                matrix = matrix.dot(_matrix(attr))
+            elif isinstance(attr, Color):
+                color = attr.vec4
+            elif isinstance(attr, LineWidth):
+                linewidth = attr.stroke
+
+        if isinstance(geom, Compound):
+            for g in geom.gs:
+                self.draw(g, matrix, color, linewidth)
+        elif isinstance(geom, FilledPolygon):
+            if len(geom.v) >= 3:
+                self.fill_polygon(_apply(matrix, geom.v), color)
+        elif isinstance(geom, (PolyLine, Line)):
+            v = [geom.start, geom.end] if isinstance(geom, Line) else list(geom.v)
+            if isinstance(geom, PolyLine) and geom.close:
+                v.append(v[0])
+            v = _apply(matrix, v)
+            for start, end in zip(v[:-1], v[1:]):
+                self.draw_line(start, end, linewidth*self.antialias, color)
+        elif isinstance(geom, Point):
+            x, y = _apply(matrix, [(0., 0.)])[0]
+            self.fill_polygon([(x - .5, y - .5), (x - .5, y + .5), (x + .5, y + .5), (x + .5, y - .5)], color)
+        elif isinstance(geom, Image):
+            self.draw_image(geom, matrix)
+        else:
+            raise NotImplementedError('{} cannot be rendered by the numpy backend'.format(type(geom).__name__))
+
+    def _box(self, v):
+        """Rows and columns of the samples whose centres may be in the bounding box of `v`"""
+        height, width = self.buffer.shape[:2]
+        cols = slice(max(int(np.floor(v[:, 0].min())), 0), min(int(np.ceil(v[:, 0].max())), width))
+        rows = slice(max(int(np.floor(height - v[:, 1].max())), 0),
+                     min(int(np.ceil(height - v[:, 1].min())), height))
+        return rows, cols
+
+    def _indices(self, rows, cols, mask):
+        """Returns the flat indices of the samples of `mask` over the box"""
+        row, col = np.nonzero(mask)
+        return (row + rows.start)*self.buffer.shape[1] + col + cols.start
+
+    def fill_polygon(self, v, color):
+        """Fills the convex polygon of vertices `v`, in either winding order"""
+        v = np.asarray(v, dtype=np.float64)
+        key = v.tobytes()
+        indices = self._polygons.get(key)
+        if indices is None:
+            rows, cols = self._box(v)
+            x, y = self.x[None, cols], self.y[rows, None]
+            edges = np.roll(v, -1, axis=0) - v
+            # inside when on the same side of every edge
+            sides = [edge[0]*(y - start[1]) - edge[1]*(x - start[0])
+                     for start, edge in zip(v, edges)]
+            mask = np.all([side >= 0. for side in sides], axis=0) \
+                   | np.all([side <= 0. for side in sides], axis=0)
+            indices = self._indices(rows, cols, mask)
+            if len(self._polygons) >= 4096:
+                self._polygons.clear()
+            self._polygons[key] = indices
+        self._blend(indices, np.asarray(color[:3])*255., color[3] if len(color) > 3 else 1.)
+
+    def draw_line(self, start, end, width, color):
+        direction = end - start
+        length = np.hypot(*direction)
+        if length == 0.:
+            return
+        normal = np.array([-direction[1], direction[0]])*(max(width, 1.)/2./length)
+        self.fill_polygon([start - normal, start + normal, end + normal, end - normal], color)
+
+    def draw_image(self, geom, matrix):
+        if geom.fname not in self._images:
+            from PIL import Image as PILImage
+            self._images[geom.fname] = np.asarray(PILImage.open(geom.fname).convert('RGBA'))
+        texture = self._images[geom.fname]
+        if abs(np.linalg.det(matrix[:2, :2])) < 1e-12:
+            return
+        w, h = geom.width/2., geom.height/2.
+        rows, cols = self._box(_apply(matrix, [(-w, -h), (-w, h), (w, h), (w, -h)]))
+        if rows.start >= rows.stop or cols.start >= cols.stop:
+            return
+        # coordinates of the samples in the image, from its bottom left corner
+        inverse = np.linalg.inv(matrix)
+        x, y = self.x[None, cols], self.y[rows, None]
+        u = (inverse[0, 0]*x + inverse[0, 1]*y + inverse[0, 2] + w)/geom.width
+        v = (inverse[1, 0]*x + inverse[1, 1]*y + inverse[1, 2] + h)/geom.height
+        mask = (u >= 0.) & (u < 1.) & (v >= 0.) & (v < 1.)
+        texels = texture[((1. - v[mask])*texture.shape[0]).astype(np.int64).clip(0, texture.shape[0] - 1),
+                         (u[mask]*texture.shape[1]).astype(np.int64).clip(0, texture.shape[1] - 1)]
+        self._blend(self._indices(rows, cols, mask), texels[:, :3], texels[:, 3:]/255.)
+
+    def _blend(self, indices, rgb, alpha):
+        if np.all(alpha >= 1.):
+            self.pixels[indices] = np.rint(rgb)
+        else:
+            self.pixels[indices] = np.rint(self.pixels[indices]*(1. - alpha) + rgb*alpha)
+
+def _matrix(transform):
+    """Affine matrix of a `Transform`, as applied by OpenGL: scale, rotate, then translate"""
+    c, s = math.cos(transform.rotation), math.sin(transform.rotation)
+    sx, sy = transform.scale
+    tx, ty = transform.translation
+    return np.array([[c*sx, -s*sy, tx], [s*sx, c*sy, ty], [0., 0., 1.]])
+
+def _apply(matrix, v):
+    v = np.asarray(v, dtype=np.float64).reshape(-1, 2)
+    return v.dot(matrix[:2, :2].T) + matrix[:2, 2]
+
+# ================================================================
+
 class SimpleImageViewer(object):
     def __init__(self, display=None, maxwidth=500):
         self.window = None
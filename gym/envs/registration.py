@@ -1,6 +1,8 @@
 import re
 import copy
+import string
 import importlib
+import itertools
 import warnings
 
 from gym import error, logger
@@ -70,6 +72,71 @@ class EnvSpec(object):
         return "EnvSpec({})".format(self.id)
 
 
+class EnvSpecFamily(object):
+    """A family of environment specifications sharing an entry point, with one
+    environment per combination of a set of parameter values. The ID of each
+    environment is formatted from its parameter values, which are also passed
+    to the environment class as kwargs. Specs are only created when their ID
+    is looked up or the family is enumerated.
+
+    Args:
+        id (str): The format of the environment IDs, with a `{name}` field for each parameter (e.g. '{size}Grid-v0')
+        params (list of (str, list)): The name and the allowed values of each parameter
+        kwargs (dict): The kwargs to pass to the environment class, besides the parameters
+        **spec_kwargs: The other arguments of `EnvSpec`, shared by the whole family
+
+    """
+
+    def __init__(self, id, params, kwargs=None, **spec_kwargs):
+        self.id = id
+        self.params = [(name, list(values)) for name, values in params]
+        self._kwargs = {} if kwargs is None else kwargs
+        self._spec_kwargs = spec_kwargs
+        self._specs = {}
+
+        # Each field matches exactly one of its values, longest first
+        pattern = ''
+        fields = set(name for name, _ in self.params)
+        for literal, field, _, _ in string.Formatter().parse(id):
+            pattern += re.escape(literal)
+            if field is None:
+                continue
+            if field not in fields:
+                raise error.Error('Unknown parameter {} in environment ID format: {}'.format(field, id))
+            values = sorted(dict(self.params)[field], key=lambda value: -len(str(value)))
+            pattern += '(?P<{}>{})'.format(field, '|'.join(re.escape(str(value)) for value in values))
+        self._id_re = re.compile('^' + pattern + '$')
+
+    def match(self, id):
+        """Returns the parameters of the environment `id`, or None if it is not in the family"""
+        match = self._id_re.search(id)
+        if not match:
+            return None
+        params = match.groupdict()
+        # IDs only hold strings, map them back to the registered values
+        return {name: next(value for value in values if str(value) == params[name])
+                for name, values in self.params}
+
+    def spec(self, id):
+        """Returns the spec of the environment `id`, or None if it is not in the family"""
+        if id not in self._specs:
+            params = self.match(id)
+            if params is None:
+                return None
+            kwargs = self._kwargs.copy()
+            kwargs.update(params)
+            self._specs[id] = EnvSpec(id, kwargs=kwargs, **self._spec_kwargs)
+        return self._specs[id]
+
+    def all(self):
+        names = [name for name, _ in self.params]
+        for values in itertools.product(*[values for _, values in self.params]):
+            yield self.spec(self.id.format(**dict(zip(names, values))))
+
+    def __repr__(self):
+        return "EnvSpecFamily({})".format(self.id)
+
+
 class EnvRegistry(object):
     """Register an env by ID. IDs remain stable over time and are
     guaranteed to resolve to the same environment dynamics (or be
@@ -80,6 +147,7 @@ class EnvRegistry(object):
 
     def __init__(self):
         self.env_specs = {}
+        self.env_spec_families = []
 
     def make(self, path, **kwargs):
         if len(kwargs) > 0:
@@ -100,7 +168,8 @@ class EnvRegistry(object):
         return env
 
     def all(self):
-        return self.env_specs.values()
+        return itertools.chain(self.env_specs.values(),
+                               *[family.all() for family in self.env_spec_families])
 
     def spec(self, path):
         if ':' in path:
@@ -120,6 +189,11 @@ class EnvRegistry(object):
         try:
             return self.env_specs[id]
         except KeyError:
+            for family in self.env_spec_families:
+                spec = family.spec(id)
+                if spec is not None:
+                    return spec
+
             # Parse the env name and check to see if it matches the non-version
             # part of a valid env (could also check the exact number here)
             env_name = match.group(1)
@@ -131,16 +205,23 @@ class EnvRegistry(object):
                 raise error.UnregisteredEnv('No registered env with id: {}'.format(id))
 
     def register(self, id, **kwargs):
-        if id in self.env_specs:
+        if id in self.env_specs or any(family.match(id) is not None
+                                       for family in self.env_spec_families):
             raise error.Error('Cannot re-register id: {}'.format(id))
         self.env_specs[id] = EnvSpec(id, **kwargs)
 
+    def register_family(self, id, **kwargs):
+        self.env_spec_families.append(EnvSpecFamily(id, **kwargs))
+
 # Have a global registry
 registry = EnvRegistry()
 
 def register(id, **kwargs):
     return registry.register(id, **kwargs)
 
+def register_family(id, **kwargs):
+    return registry.register_family(id, **kwargs)
+
 def make(id, **kwargs):
     return registry.make(id, **kwargs)
 
@@ -1,9 +1,13 @@
 import gym
 from gym import logger
 import gym.spaces as spaces
-from gym.utils import seeding
+from gym.utils import seeding, atomic_write
 import numpy as np
 from scipy.integrate import odeint
+from scipy import linalg, sparse
+from scipy.sparse import linalg as sparse_linalg
+
+import os
 
                 ##### Parameters in model for thermal dynamics #####
 class sysParam():
@@ -23,6 +27,12 @@ class sysParam():
         d = 5.08e-2   # Thickness of foam
         return k, m, C, A, d
 
+    def VacCanObservationSpace():
+        # T_can: [15,60]C; T_amb: [0,50]C, episodes end outside of it
+        return spaces.Box(np.array([15.0, 0.0]),
+                          np.array([60.0, 50.0]),
+                          dtype=np.float64)
+
 
                 ###### Ambient temperature models #####
 Tamb_standard = 20.
@@ -31,38 +41,170 @@ class TambModels():
     def TConstant():
         return Tamb_standard
 
-    def TRandom():
-        return np.random.random()*5. + Tamb_standard
+    def TRandom(size=None, np_random=np.random):
+        return np_random.random_sample(size)*5. + Tamb_standard
 
     def TSine(elapsed_steps, time, timestep):
+        offset, amplitude, phase = TambModels.TSineCoeffs(elapsed_steps, timestep)
+        return amplitude*np.sin(time + phase) + offset
+
+    def TSineCoeffs(elapsed_steps, timestep):
+        """Offset, amplitude and phase of TSine as a sinusoid in time."""
         time_period = 24. # hours
         amplitude = 5. # degrees Celsius
 
-        return amplitude*np.sin(2*np.pi*elapsed_steps*timestep + time)/(time_period*3600) + Tamb_standard
+        return Tamb_standard, amplitude/(time_period*3600), 2*np.pi*elapsed_steps*timestep
 
-    def TSineRandom(elapsed_steps, time, timestep):
+    def TSineRandom(elapsed_steps, time, timestep, size=None, np_random=np.random):
         time_period = 24. # hours
         amplitude = 5. # degrees Celsius
 
-        return amplitude*np.sin(2*np.pi*elapsed_steps*timestep + time)/(time_period*3600)/2 + np.random.random()*amplitude/2 + Tamb_standard
+        return amplitude*np.sin(2*np.pi*elapsed_steps*timestep + time)/(time_period*3600)/2 + np_random.random_sample(size)*amplitude/2 + Tamb_standard
+
+
+# Logs already mapped in this process, shared by all of its envs
+_Tamb_data_maps = {}
+
+class TambData():
+    """Measured ambient temperature log in degrees Celsius, sampled every
+       `sample_time` seconds and memory-mapped from `filename`, so the pages
+       of the file are shared between all the processes replaying it.
+
+       `.npy` files are mapped directly and any other binary file is read as
+       a flat array of `dtype`. CSV/text logs (last column is the temperature,
+       lines starting with # are skipped) are converted once to a `.npy` file
+       next to them, which is then mapped."""
+    def __init__(self, filename, sample_time, dtype=np.float64):
+        self.filename = filename
+        self.sample_time = float(sample_time)
+        self.data = TambData.load(filename, dtype)
+        if len(self.data) < 2:
+            raise ValueError('Error: ambient temperature log needs at least two samples')
+
+    def load(filename, dtype=np.float64):
+        key = (os.path.abspath(filename), np.dtype(dtype).str)
+        if key not in _Tamb_data_maps:
+            root, ext = os.path.splitext(filename)
+            if ext in ['.csv', '.txt']:
+                npy_filename = root + '.npy'
+                if not os.path.exists(npy_filename) or \
+                        os.path.getmtime(npy_filename) < os.path.getmtime(filename):
+                    data = np.loadtxt(filename, delimiter=',' if ext == '.csv' else None,
+                                      ndmin=2)[:, -1].astype(dtype)
+                    with atomic_write.atomic_write(npy_filename, binary=True) as f:
+                        np.save(f, data)
+                filename, ext = npy_filename, '.npy'
+            if ext == '.npy':
+                data = np.load(filename, mmap_mode='r').reshape(-1)
+            else:
+                data = np.memmap(filename, dtype=dtype, mode='r')
+            _Tamb_data_maps[key] = data
+        return _Tamb_data_maps[key]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __call__(self, time):
+        """Returns the log linearly interpolated at `time` seconds from its
+           first sample, wrapping around at the end of the log."""
+        position = np.asarray(time, dtype=np.float64)/self.sample_time
+        first = int(np.floor(position.min()))
+        index = np.arange(first, int(np.ceil(position.max())) + 1)
+        # only the pages holding the requested samples are read
+        values = self.data[index % len(self.data)]
+        return np.interp(position, index, values)
 
 
+class TambTrace():
+    """Ambient temperature of an episode, precomputed on the integration grid
+       of every time-step from the env's seeded np_random. The trace is
+       generated lazily, `chunk_size` samples at a time, and lookups within a
+       time-step interpolate linearly between grid points.
+
+       The Tdata model replays the TambData log `data` and starts every
+       episode at a random sample of the log."""
+    def __init__(self, ambtemp_model, timestep, t_int_step, chunk_size=2**16, data=None):
+        if ambtemp_model not in ['Tcon', 'Tsin', 'Trand', 'Tsinrand', 'Tdata']:
+            raise ValueError('Error: unknown ambient temperature model')
+        if ambtemp_model == 'Tdata' and data is None:
+            raise ValueError('Error: Tdata ambient temperature model needs a data log')
+        self.ambtemp_model = ambtemp_model
+        self.data = data
+        self.timestep = timestep
+        self.t_int_step = t_int_step
+        self.samples_per_step = int(timestep/t_int_step)
+        self.time = np.arange(self.samples_per_step + 1)*t_int_step
+        self.chunk_steps = max(1, chunk_size//len(self.time))
+        self.reset(np.random, 0)
+
+    def reset(self, np_random, elapsed_steps):
+        """Starts the trace of a new episode at step `elapsed_steps`."""
+        self.np_random = np_random
+        self.chunk_start = elapsed_steps
+        self.chunk = []
+        self.step = None
+        self.episode_start = elapsed_steps
+        if self.data is not None:
+            self.data_offset = np_random.randint(len(self.data))*self.data.sample_time
+
+    def generate(self, elapsed_steps):
+        """Returns the trace of the steps in `elapsed_steps` on the grid."""
+        steps = elapsed_steps[:, None]
+        shape = (len(elapsed_steps), len(self.time))
+        if self.ambtemp_model == 'Tcon':
+            return np.full(shape, TambModels.TConstant())
+        elif self.ambtemp_model == 'Tsin':
+            return TambModels.TSine(steps, self.time, self.timestep)
+        elif self.ambtemp_model == 'Trand':
+            return TambModels.TRandom(shape, self.np_random)
+        elif self.ambtemp_model == 'Tsinrand':
+            return TambModels.TSineRandom(steps, self.time, self.timestep,
+                                          shape, self.np_random)
+        else:
+            # the first step of an episode starts from the ambient temperature
+            # observed on reset
+            episode_time = np.maximum(steps - self.episode_start - 1, 0)*self.timestep
+            return self.data(self.data_offset + episode_time + self.time)
+
+    def select(self, elapsed_steps):
+        """Makes `elapsed_steps` the step served by lookups."""
+        # only the chunk holding the current step is kept
+        while elapsed_steps - self.chunk_start >= len(self.chunk):
+            self.chunk_start += len(self.chunk)
+            self.chunk = self.generate(
+                self.chunk_start + np.arange(self.chunk_steps)).tolist()
+        self.values = self.chunk[elapsed_steps - self.chunk_start]
+        self.step = elapsed_steps
+
+    def __call__(self, elapsed_steps, time):
+        if elapsed_steps != self.step:
+            self.select(elapsed_steps)
+
+        # plain floats keep the lookup free of numpy scalar overhead
+        position = float(time)/self.t_int_step
+        if position <= 0.:
+            return self.values[0]
+        k = int(position)
+        if k >= self.samples_per_step:
+            return self.values[-1]
+        return self.values[k] + (position - k)*(self.values[k + 1] - self.values[k])
+
 
             ###### Reward functions ######
 class rewardType():
+    """Reward functions of T_can_updated, which is either a single temperature
+       or an array of temperatures (N envs or T timesteps)."""
     def RewardWindow10(T_can_updated, T_setpoint):
-        if T_can_updated > T_setpoint-5. and T_can_updated <= T_setpoint+5.:
-            reward = 0.1
-        else:
-            reward = 0.
-        return reward
+        inside = (T_can_updated > T_setpoint-5.) & (T_can_updated <= T_setpoint+5.)
+        if isinstance(inside, np.ndarray):
+            return np.where(inside, 0.1, 0.)
+        return 0.1 if inside else 0.
 
     def RewardWindow4(T_can_updated, T_setpoint):
-        if T_can_updated > T_setpoint-2. and T_can_updated <= T_setpoint+2.:
-            reward = 0.1
-        else:
-            reward = 0.
-        return reward
+        inside = (T_can_updated > T_setpoint-2.) & (T_can_updated <= T_setpoint+2.)
+        if isinstance(inside, np.ndarray):
+            return np.where(inside, 0.1, 0.)
+        return 0.1 if inside else 0.
 
     def RewardExp(T_can_updated, T_setpoint):
         return 0.1*np.exp(-(T_can_updated-T_setpoint)**2/(2*T_setpoint))
@@ -74,6 +216,168 @@ class rewardType():
         return 0.1/((T_can_updated - T_setpoint)**2/T_setpoint**2)
 
 
+class Reward():
+    """Reward function of a reward_type specifier, resolved once when the env
+       is made. Calling it evaluates a single T_can or a whole array of them in
+       one NumPy call."""
+    functions = {
+        'Rw10': rewardType.RewardWindow10,
+        'Rw4': rewardType.RewardWindow4,
+        'Rexp': rewardType.RewardExp,
+        'Rquad': rewardType.RewardQuadratic,
+        'Rrecquad': rewardType.RewardReciprocalQuadratic,
+    }
+
+    def __init__(self, reward_type, T_setpoint=45):
+        if reward_type not in Reward.functions:
+            raise ValueError('Error: unknown reward function')
+        self.reward_type = reward_type
+        self.T_setpoint = T_setpoint
+        self.function = Reward.functions[reward_type]
+
+    def __call__(self, T_can_updated):
+        return self.function(T_can_updated, self.T_setpoint)
+
+    def batch(self, T_can_updated, dones=None):
+        """Rewards of an array of temperatures, 0 where `dones` is set."""
+        rewards = self.function(np.asarray(T_can_updated, dtype=np.float64),
+                                self.T_setpoint)
+        if dones is None:
+            return rewards
+        return np.where(dones, 0., rewards)
+
+
+            ###### Exact solution of the heat equation ######
+class exactSolution():
+    def SineDriven(T_init, rate, drive, T_offset, amplitude, phase, t, omega=1.):
+        """Closed-form solution of dT/dt = -rate*(T - T_amb(t)) + drive with
+           T_amb(t) = T_offset + amplitude*sin(omega*t + phase), evaluated at
+           time t. A constant ambient temperature is the special case
+           amplitude = 0. All arguments may be arrays of equal shape."""
+        T_steady = T_offset + drive/rate
+        if np.all(np.asarray(amplitude) == 0.):
+            return T_steady + (T_init - T_steady)*np.exp(-rate*t)
+
+        # particular solution of the sinusoidal forcing
+        gain = rate*amplitude/(rate**2 + omega**2)
+        T_part_0 = gain*(rate*np.sin(phase) - omega*np.cos(phase))
+        T_part_t = gain*(rate*np.sin(omega*t + phase) - omega*np.cos(omega*t + phase))
+        return T_steady + T_part_t \
+               + (T_init - T_steady - T_part_0)*np.exp(-rate*t)
+
+
+            ###### Multi-node thermal networks ######
+class ThermalNetwork():
+    """Lumped thermal network of n nodes, whose temperatures T follow
+           C dT/dt = -L T + g_amb*(T_amb - T) + heater*P_heat
+       with `capacitance` C (J/K) of each node, the symmetric matrix
+       `conductance` (W/K) between pairs of nodes and its Laplacian L,
+       `ambient_conductance` g_amb (W/K) of each node to the ambient
+       temperature and `heater` the share of the heater power P_heat going
+       into each node. As dT/dt = A T + B [P_heat, T_amb], the network is
+       stepped exactly with the matrix exponential of A, or with a sparse
+       implicit (backward Euler) solver for networks too large for dense
+       matrices. `control_node` is the node whose temperature is rewarded."""
+    def __init__(self, capacitance, conductance, ambient_conductance, heater,
+                 names=None, control_node=0):
+        self.capacitance = np.asarray(capacitance, dtype=np.float64)
+        n = len(self.capacitance)
+        conductance = sparse.csr_matrix(conductance, dtype=np.float64)
+        ambient_conductance = np.asarray(ambient_conductance, dtype=np.float64)
+        heater = np.asarray(heater, dtype=np.float64)
+        if conductance.shape != (n, n) or ambient_conductance.shape != (n,) \
+                or heater.shape != (n,):
+            raise ValueError('Error: thermal network matrices do not match its number of nodes')
+        if abs(conductance - conductance.T).max() > 0.:
+            raise ValueError('Error: conductance matrix of a thermal network must be symmetric')
+        if not np.any(ambient_conductance > 0.):
+            raise ValueError('Error: thermal network needs a conductance to the ambient temperature')
+
+        conductance = conductance - sparse.diags(conductance.diagonal())
+        laplacian = sparse.diags(np.asarray(conductance.sum(axis=1)).ravel()) - conductance
+        inverse_capacitance = sparse.diags(1./self.capacitance)
+        self.A = (-inverse_capacitance.dot(laplacian + sparse.diags(ambient_conductance))).tocsc()
+        self.B = np.stack([heater, ambient_conductance], axis=1)/self.capacitance[:, None]
+        self.names = list(names) if names is not None else ['T{}'.format(i) for i in range(n)]
+        self.control_node = control_node
+
+    def __len__(self):
+        return len(self.capacitance)
+
+    def discretize(self, t):
+        """Returns Phi, Gamma such that T(t) = Phi T(0) + Gamma [P_heat, T_amb]
+           for inputs held constant over t, from the exponential of the
+           augmented matrix [[A, B], [0, 0]]."""
+        n = len(self)
+        augmented = np.zeros((n + 2, n + 2))
+        augmented[:n, :n] = self.A.toarray()
+        augmented[:n, n:] = self.B
+        transition = linalg.expm(augmented*t)
+        return transition[:n, :n], transition[:n, n:]
+
+    def implicit(self, h):
+        """Returns the sparse LU factorization of (I - h A), whose solve
+           advances T by one backward Euler step of h seconds."""
+        return sparse_linalg.splu(
+            (sparse.identity(len(self), format='csc') - h*self.A).tocsc())
+
+    def steady_state(self, P_heat, T_amb):
+        """Returns the temperatures of the nodes in equilibrium."""
+        return sparse_linalg.spsolve(self.A, -self.B.dot([P_heat, T_amb]))
+
+
+class networkParam():
+    """Thermal networks of the vacuum can with `n_foam` nodes across its foam
+       insulation, inside an enclosure of air. The heater is on the can."""
+    def Chain(names, capacitance, link_conductance, enclosure_conductance):
+        # nodes in series, the last one (the enclosure air) losing heat to the lab
+        n = len(capacitance)
+        conductance = sparse.diags([link_conductance, link_conductance], [1, -1], shape=(n, n))
+        ambient_conductance = np.zeros(n)
+        ambient_conductance[-1] = enclosure_conductance
+        return names, capacitance, conductance, ambient_conductance
+
+    def Foam(n_foam):
+        k, m, C, A, d = sysParam.VacCanParams()
+        G_foam = k*A/d  # W/K, conductance of the whole foam layer
+        rho_foam, c_foam = 30., 1300.  # kg/m^3, J/(kg K), polyurethane foam
+        if n_foam < 0:
+            raise ValueError('n_foam must be non-negative, got {}'.format(n_foam))
+        if n_foam == 0:
+            # massless foam, a single conductance between its faces
+            return [], [], [G_foam]
+        names = ['foam{}'.format(i) for i in range(n_foam)]
+        capacitance = [rho_foam*c_foam*A*d/n_foam]*n_foam
+        # nodes at the centres of equal layers, half a layer from either face
+        return names, capacitance, [2*n_foam*G_foam] + [n_foam*G_foam]*(n_foam - 1) + [2*n_foam*G_foam]
+
+    def VacCanNetwork(n_foam=4):
+        k, m, C, A, d = sysParam.VacCanParams()
+        C_air, G_enclosure = 1.2*1005*1., 10.  # 1 m^3 of air, enclosure walls
+        foam_names, foam_capacitance, links = networkParam.Foam(n_foam)
+        names, capacitance, conductance, ambient_conductance = networkParam.Chain(
+            ['can'] + foam_names + ['air'], [m*C] + foam_capacitance + [C_air],
+            links, G_enclosure)
+        heater = np.zeros(len(names))
+        heater[0] = 1.
+        return ThermalNetwork(capacitance, conductance, ambient_conductance,
+                              heater, names, control_node=0)
+
+    def SeismNetwork(n_foam=4):
+        k, m, C, A, d = sysParam.SeismParams()
+        m_seism, c_seism, G_seism = 13., 900., 0.5  # seismometer in the can
+        C_air, G_enclosure = 1.2*1005*1., 10.
+        foam_names, foam_capacitance, links = networkParam.Foam(n_foam)
+        names, capacitance, conductance, ambient_conductance = networkParam.Chain(
+            ['seismometer', 'can'] + foam_names + ['air'],
+            [m_seism*c_seism, m*C] + foam_capacitance + [C_air],
+            [G_seism] + links, G_enclosure)
+        heater = np.zeros(len(names))
+        heater[1] = 1.
+        return ThermalNetwork(capacitance, conductance, ambient_conductance,
+                              heater, names, control_node=0)
+
+
 #            ###### Heat conduction equation ######
 def ModelEquation(self, T, t_inst):
 
@@ -0,0 +1,137 @@
+import gym
+import gym.spaces as spaces
+from gym.utils import seeding
+
+import numpy as np
+
+from gym.envs.temp_ctrl.Models import networkParam, TambTrace
+from gym.envs.temp_ctrl.Run import TempCtrlEnvs
+
+
+class ThermalNetworkEnv(gym.Env):
+    """Temperature control of a multi-node thermal network (can, foam layers,
+       seismometer, enclosure air), configured by the same specifiers as
+       `TempCtrlEnvs`. The observation holds the temperatures of all the nodes
+       followed by the ambient temperature, and the reward is computed from the
+       temperature of the network's control node.
+
+       The network is linear, so each step is one product with the transition
+       matrices precomputed from its matrix exponential (`solver='expm'`), or a
+       few solves of a sparse LU factorization (`solver='implicit'`) for
+       networks too large for dense matrices. The heater power and the ambient
+       temperature are held over a step."""
+    metadata = {
+        'render.modes': []
+    }
+
+    def __init__(self,
+                 thermalParam='VaccanNet',
+                 act_space='D200',
+                 reward_type='Rexp',
+                 ambtemp_model='Tsin',
+                 timestep_size='t10',
+                 n_foam=4,
+                 network=None,
+                 solver='expm',
+                 implicit_step=1.,
+                 ambtemp_file=None,
+                 ambtemp_sample_time=60.):
+
+        # Thermal network, either given or one of the known systems
+        if network is not None:
+            self.network = network
+        elif thermalParam == 'VaccanNet':
+            self.network = networkParam.VacCanNetwork(n_foam)
+        elif thermalParam == 'SeismNet':
+            self.network = networkParam.SeismNetwork(n_foam)
+        else:
+            raise ValueError(
+                'Thermal parameter specifier not in known list of networks.')
+        self.control_node = self.network.control_node
+
+        # The other specifiers are parsed as for the single node envs
+        env = TempCtrlEnvs(act_space=act_space, reward_type=reward_type,
+                           ambtemp_model=ambtemp_model, timestep_size=timestep_size,
+                           ambtemp_file=ambtemp_file,
+                           ambtemp_sample_time=ambtemp_sample_time)
+        self.action_space = env.action_space
+        self.reward_type = reward_type
+        self.T_setpoint = env.T_setpoint
+        self.reward = env.reward
+        self.timestep = env.timestep
+        self.t_final = env.t_final
+        self.Tamb_trace = TambTrace(ambtemp_model, self.timestep, env.t_int_step,
+                                    data=env.Tamb_data)
+        env.close()
+
+        # Transition of one step, precomputed once
+        if solver == 'expm':
+            self.Phi, self.Gamma = self.network.discretize(self.t_final)
+        elif solver == 'implicit':
+            self.n_substeps = max(1, int(np.ceil(self.t_final/implicit_step)))
+            self.h = self.t_final/self.n_substeps
+            self.lu = self.network.implicit(self.h)
+        else:
+            raise ValueError('Error: solver must be expm or implicit')
+        self.solver = solver
+
+        # Steady-state profile per W of heater power above ambient, used to
+        # start episodes from a consistent temperature profile
+        self.T_profile = self.network.steady_state(1., 0.)
+        self.T_profile /= self.T_profile[self.control_node]
+
+        # Observation space : T_control: [15,60]C; other nodes: [0,60]C; T_amb: [0,50]C
+        n = len(self.network)
+        low, high = np.zeros(n + 1), np.full(n + 1, 60.)
+        low[self.control_node] = 15.
+        high[-1] = 50.
+        self.observation_space = spaces.Box(low, high, dtype=np.float64)
+
+        # initial seed and reset of env
+        self.elapsed_steps = 0
+        self.seed()
+        self.reset()
+
+    # Sets seed for random number generator used in the environment
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def reset(self):
+        T_control = self.np_random.uniform(low=15, high=30)
+        self.Tamb_trace.reset(self.np_random, self.elapsed_steps)
+        T_amb = self.T_amb(0)
+        self.T = T_amb + (T_control - T_amb)*self.T_profile
+        self.state = np.append(self.T, T_amb)
+        return np.array(self.state)
+
+    def T_amb(self, time):
+        """Returns the ambient temperature `time` seconds into the current step"""
+        return self.Tamb_trace(self.elapsed_steps, time)
+
+    def step(self, action):
+        assert self.action_space.contains(action), \
+                "%r (%s) invalid" % (action, type(action))
+
+        self.elapsed_steps += 1
+        self.P_heat = float(np.squeeze(action))
+        inputs = np.array([self.P_heat, self.T_amb(0)])
+
+        if self.solver == 'expm':
+            self.T = self.Phi.dot(self.T) + self.Gamma.dot(inputs)
+        else:
+            forcing = self.h*self.network.B.dot(inputs)
+            for _ in range(self.n_substeps):
+                self.T = self.lu.solve(self.T + forcing)
+
+        # ambient temperature at the end of the step
+        self.state = np.append(self.T, self.T_amb(self.timestep))
+
+        done = bool(not self.observation_space.contains(self.state))   # kill run if railed
+
+        if not done:
+            reward = self.reward(self.T[self.control_node])
+        else:
+            reward = 0
+
+        return self.state, reward, done, {}
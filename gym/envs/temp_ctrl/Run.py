@@ -6,7 +6,7 @@ from gym.utils import seeding
 import numpy as np
 from scipy.integrate import odeint
 
-from gym.envs.temp_ctrl.Models import sysParam, TambModels, rewardType
+from gym.envs.temp_ctrl.Models import sysParam, TambModels, TambData, TambTrace, Reward, exactSolution
 
 '''param = ['Vaccan', 'Seism']
 act_space = ['D10', 'D20', 'D50', 'D100', 'D200', 'D500', 'C']
@@ -16,7 +16,8 @@ timestep_size = ['t1', 't10', 't30', 't60', 't100']'''
 
 class TempCtrlEnvs(gym.Env):
     metadata = {
-        'render.modes':['human', 'rgb_array']
+        'render.modes':['human', 'rgb_array'],
+        'video.frames_per_second' : 2
     }
 
     def __init__(self,
@@ -24,7 +25,10 @@ class TempCtrlEnvs(gym.Env):
                  act_space='D200',
                  reward_type='Rexp',
                  ambtemp_model='Tsin',
-                 timestep_size='t10'):
+                 timestep_size='t10',
+                 integrator=None,
+                 ambtemp_file=None,
+                 ambtemp_sample_time=60.):
 
         #  Configure system thermal params or throw error if unknown
         if thermalParam == 'Vaccan':
@@ -36,15 +40,22 @@ class TempCtrlEnvs(gym.Env):
                 'Thermal parameter specifier not in known list of systems.')
 
 
-        # Model for ambient temperature
+        # Model for ambient temperature, Tdata replays the measured log in
+        # ambtemp_file sampled every ambtemp_sample_time seconds
         self.ambtemp_model = ambtemp_model
+        self.Tamb_data = None
+        if ambtemp_model == 'Tdata':
+            if ambtemp_file is None:
+                raise ValueError(
+                    'Error: Tdata ambient temperature model needs an ambtemp_file')
+            self.Tamb_data = TambData(ambtemp_file, ambtemp_sample_time)
 
 
         # Configure action space or throw error if unknown
         if act_space in ['D10', 'D20', 'D50', 'D100', 'D200', 'D500']:
             sizeActionSpace = int(act_space[1:])  # conv to useable number
             self.action_space = spaces.Discrete(float(sizeActionSpace))
-        elif act_space is 'C':
+        elif act_space == 'C':
             self.action_space = spaces.Box(np.array([0.]),  # todo: set range
                                            np.array([100.]),
                                            dtype=np.float64)
@@ -52,12 +63,14 @@ class TempCtrlEnvs(gym.Env):
             raise ValueError('Error: unknown act_space specifier.')
 
 
-        # Reward function
+        # Reward function, resolved once from its specifier
         self.reward_type = reward_type
+        self.T_setpoint = 45
+        self.reward = Reward(reward_type, self.T_setpoint)
 
 
         # Configure time-step size or throw error if unknown
-        if timestep_size[0] is 't':
+        if timestep_size[0] == 't':
             self.timestep = int(timestep_size[1:])  # Defines the number of seconds in one time-step
 
         else:
@@ -66,12 +79,33 @@ class TempCtrlEnvs(gym.Env):
 
         self.t_int_step = 0.1  # seconds between integration steps
         self.t = np.arange(0, self.timestep, self.t_int_step) # time array for odeint
+        self.t_final = self.t[int(self.timestep/self.t_int_step) - 1]
 
 
-        # Configure observation space : T_can: [15,90]C; T_amb: [0,50]C
-        self.observation_space = spaces.Box(np.array([15.0, 0.0]),
-                                            np.array([60.0, 50.0]),
-                                            dtype=np.float64)
+        # Integration scheme: 'exact' uses the closed-form solution of the
+        # linear heat equation, 'odeint' integrates vac_can numerically.
+        # Stochastic ambient models are only held constant over a time-step
+        # by the exact scheme, so they default to odeint.
+        if integrator is None:
+            integrator = 'exact' if ambtemp_model in ['Tcon', 'Tsin'] else 'odeint'
+        if integrator not in ['exact', 'odeint']:
+            raise ValueError('Error: integrator must be exact or odeint')
+        self.integrator = integrator
+        self.rate = self.k*self.A/(self.d*self.m*self.C)  # 1/s, heat loss rate
+
+
+        # Ambient temperature trace of the episode, drawn from np_random on reset
+        self.Tamb_trace = TambTrace(ambtemp_model, self.timestep, self.t_int_step,
+                                    data=self.Tamb_data)
+
+
+        # Configure observation space : T_can: [15,60]C; T_amb: [0,50]C
+        self.observation_space = sysParam.VacCanObservationSpace()
+
+
+        # rendered off-screen, human mode shows the frames in a window
+        self.scene = None
+        self.viewer = None
 
 
         # initial seed and reset of env
@@ -85,7 +119,9 @@ class TempCtrlEnvs(gym.Env):
         return [seed]
 
     def reset(self):
-        self.state = [self.np_random.uniform(low=15, high=30), self.T_amb(0)]
+        T_can = self.np_random.uniform(low=15, high=30)
+        self.Tamb_trace.reset(self.np_random, self.elapsed_steps)
+        self.state = [T_can, self.T_amb(0)]
         self.steps_beyond_done = None
         return np.array(self.state)
 
@@ -94,19 +130,24 @@ class TempCtrlEnvs(gym.Env):
             dTdt = -self.k*self.A*(T-self.T_amb(t_inst))/(self.d*self.m*self.C)+self.P_heat/(self.m*self.C)
             return dTdt
 
-    # Configure ambient temperature model or raise error if model is unknown
-    def T_amb(self, time):
-        """Returns ambient temperature based on ambient temperature model defined in the specific environment """
-        if self.ambtemp_model is 'Tcon':
-            return TambModels.TConstant()
-        elif self.ambtemp_model is 'Tsin':
-            return TambModels.TSine(self.elapsed_steps, time, self.timestep)
-        elif self.ambtemp_model is 'Trand':
-            return TambModels.TRandom()
-        elif self.ambtemp_model is 'Tsinrand':
-            return TambModels.TSineRandom(self.elapsed_steps, time, self.timestep)
+    def vac_can_exact(self, T):
+        """Returns T_can at the end of the time-step from the closed-form
+           solution of vac_can with the heater power held constant."""
+        drive = float(np.squeeze(self.P_heat))/(self.m*self.C)
+        if self.ambtemp_model == 'Tsin':
+            T_offset, amplitude, phase = TambModels.TSineCoeffs(
+                self.elapsed_steps, self.timestep)
         else:
-            raise ValueError('Error: unknown ambient temperature model')
+            # constant over the step (zero-order hold for the random models)
+            T_offset, amplitude, phase = self.T_amb(0), 0., 0.
+
+        return exactSolution.SineDriven(T, self.rate, drive, T_offset,
+                                        amplitude, phase, self.t_final)
+
+    def T_amb(self, time):
+        """Returns ambient temperature based on ambient temperature model defined in the specific environment,
+           looked up in the precomputed trace of the episode at `time` seconds into the current step"""
+        return self.Tamb_trace(self.elapsed_steps, time)
 
 
     def step(self, action):
@@ -118,31 +159,47 @@ class TempCtrlEnvs(gym.Env):
         self.P_heat = action
 
         #  gets final value after integration
-        T_can_updated = float(odeint(
-            self.vac_can, T_can, self.t)[int(self.timestep/self.t_int_step) - 1])
+        if self.integrator == 'exact':
+            T_can_updated = float(self.vac_can_exact(T_can))
+        else:
+            T_can_updated = float(odeint(
+                self.vac_can, T_can, self.t)[int(self.timestep/self.t_int_step) - 1])
 
-        self.state = np.array([T_can_updated,
-                               self.T_amb(self.elapsed_steps*self.timestep)])
+        # ambient temperature at the end of the step
+        self.state = np.array([T_can_updated, self.T_amb(self.timestep)])
 
         done =  not self.observation_space.contains(self.state)
         done = bool(done)   # kill run if railed
 
-        # todo: hard codeing reward, need to refactor rewards as class
-        T_setpoint = 45
         if not done:
-            if self.reward_type is 'Rw10':
-                reward = rewardType.RewardWindow10(T_can_updated,T_setpoint)
-            elif self.reward_type is 'Rw4':
-                reward = rewardType.RewardWindow4(T_can_updated, T_setpoint)
-            elif self.reward_type is 'Rexp':
-                reward = rewardType.RewardExp(T_can_updated, T_setpoint)
-            elif self.reward_type is 'Rquad':
-                reward = rewardType.RewardQuadratic(T_can_updated, T_setpoint)
-            elif self.reward_type is 'Rrecquad':
-                reward = rewardType.RewardReciprocalQuadratic(T_can_updated, T_setpoint)
-            else:
-                raise ValueError('Error: unknown reward function')
+            reward = self.reward(T_can_updated)
         else:
             reward = 0
 
         return self.state, reward, done, {}
+
+    def render(self, mode='human'):
+        if self.scene is None:
+            from gym.envs.temp_ctrl.raster import VacCanScene
+            self.scene = VacCanScene()
+
+        if isinstance(self.action_space, spaces.Discrete):
+            P_max = self.action_space.n
+        else:
+            P_max = self.action_space.high[0]
+        P_heat = float(np.squeeze(getattr(self, 'P_heat', 0.)))
+        # the frame is reused by the next render
+        frame = self.scene.render(self.state[0], self.state[1], P_heat/P_max)
+        if mode == 'rgb_array':
+            return frame
+
+        if self.viewer is None:
+            from gym.envs.temp_ctrl.rendering import SimpleImageViewer
+            self.viewer = SimpleImageViewer()
+        self.viewer.imshow(frame)
+        return self.viewer.isopen
+
+    def close(self):
+        if self.viewer:
+            self.viewer.close()
+            self.viewer = None
@@ -45,6 +45,7 @@ class VacCanTestEnv(gym.Env):
         self.reset()
 
         self.viewer = None
+        self.scene = None
 
 
 # Sets seed for random number generator used in the environment
@@ -124,6 +125,14 @@ class VacCanTestEnv(gym.Env):
 
     def render(self, mode='human'):
 
+        # rgb_array frames are rasterized with NumPy, without a GL context
+        if mode == 'rgb_array':
+            if self.scene is None:
+                from gym.envs.temp_ctrl.raster import VacCanScene
+                self.scene = VacCanScene()
+            return self.scene.render(self.state[0], self.state[1],
+                                     getattr(self, 'P_heat', 0)/self.action_space_dim)
+
         norm = mpl.colors.Normalize(15,60)
         m = cm.ScalarMappable(norm=norm, cmap=cm.hot)
 
@@ -197,7 +206,8 @@ class VacCanTestEnv(gym.Env):
 
         self.poletrans.set_rotation(h*np.pi/self.action_space_dim -np.pi/2)
 
-        return self.viewer.render(return_rgb_array = mode=='rgb_array')
+        return self.viewer.render()
 
     def close(self):
         if self.viewer: self.viewer.close()
+        if self.scene: self.scene.close()
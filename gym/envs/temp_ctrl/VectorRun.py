@@ -0,0 +1,280 @@
+import gym.spaces as spaces
+from gym.utils import seeding
+from gym.vector.vector_env import VectorEnv
+
+import numpy as np
+from scipy.integrate import odeint
+
+from gym.envs.temp_ctrl.Models import sysParam, TambModels, exactSolution
+from gym.envs.temp_ctrl.Run import TempCtrlEnvs
+
+
+#####################################################
+############## Batched thermal systems ##############
+#####################################################
+class ThermalVectorEnv(VectorEnv):
+    """Base class for batches of lumped thermal systems advanced together.
+
+    The state of all `num_envs` systems is held in a single (num_envs, 2)
+    array of [T_can, T_amb] and every step updates the whole batch with one
+    array operation. Episodes that end are reset in place, index by index,
+    and the observation returned for them is the first one of the new episode.
+
+    Subclasses set the thermal parameters (k, m, C, A, d), `timestep`,
+    `t_int_step`, `t`, `t_final`, `rate` and `integrator` before calling
+    `__init__`, and implement `T_amb`, `ambient_coeffs`, `rewards` and `dones`.
+    """
+    metadata = {
+        'render.modes': []
+    }
+
+    def __init__(self, num_envs, observation_space, action_space, copy=True):
+        super(ThermalVectorEnv, self).__init__(num_envs=num_envs,
+            observation_space=observation_space, action_space=action_space)
+        self.copy = copy
+
+        self.state = np.zeros((self.num_envs, 2), dtype=np.float64)
+        self.elapsed_steps = np.zeros((self.num_envs,), dtype=np.int64)
+        self.P_heat = np.zeros((self.num_envs,), dtype=np.float64)
+        self._actions = None
+
+        self.seed()
+        self.reset()
+
+    def seed(self, seeds=None):
+        """
+        Parameters
+        ----------
+        seeds : int, optional
+            Random seed of the single random number generator that draws the
+            initial and ambient temperatures of every system in the batch.
+        """
+        self.np_random, seed = seeding.np_random(seeds)
+        return [seed]
+
+    def T_amb(self, time):
+        """Returns the ambient temperature of every system, broadcastable to
+           (num_envs,)."""
+        raise NotImplementedError()
+
+    def T_amb_final(self):
+        """Returns the ambient temperature observed at the end of the step."""
+        return self.T_amb(self.elapsed_steps*self.timestep)
+
+    def ambient_coeffs(self):
+        """Returns (offset, amplitude, phase, omega) of the ambient
+           temperature over the current step as a sinusoid in time."""
+        raise NotImplementedError()
+
+    def rewards(self, T_can, dones):
+        """Returns the rewards of the batch, 0 for the systems that are done."""
+        raise NotImplementedError()
+
+    def dones(self, state):
+        raise NotImplementedError()
+
+    def vac_can(self, T, t_inst):
+        dTdt = -self.rate*(T - self.T_amb(t_inst)) + self.P_heat/(self.m*self.C)
+        return dTdt
+
+    def reset_wait(self):
+        self.state[:, 0] = self.np_random.uniform(low=15, high=30,
+                                                  size=self.num_envs)
+        self.state[:, 1] = self.T_amb(0)
+        return np.copy(self.state) if self.copy else self.state
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        actions = np.asarray(self._actions, dtype=np.float64)
+        assert self._contains_actions(actions), \
+                "%r (%s) invalid" % (self._actions, type(self._actions))
+
+        self.elapsed_steps += 1
+        self.P_heat = actions.reshape(self.num_envs)
+        T_can = self.state[:, 0]
+
+        #  gets final value after integration
+        if self.integrator == 'exact':
+            T_offset, amplitude, phase, omega = self.ambient_coeffs()
+            T_can_updated = exactSolution.SineDriven(
+                T_can, self.rate, self.P_heat/(self.m*self.C), T_offset,
+                amplitude, phase, self.t_final, omega)
+        else:
+            T_can_updated = odeint(
+                self.vac_can, T_can, self.t)[int(self.timestep/self.t_int_step) - 1]
+
+        self.state[:, 0] = T_can_updated
+        self.state[:, 1] = self.T_amb_final()
+
+        dones = self.dones(self.state)
+        rewards = self.rewards(self.state[:, 0], dones)
+
+        # per-index auto-reset of the systems whose episode ended
+        num_done = np.count_nonzero(dones)
+        if num_done > 0:
+            self.state[dones, 0] = self.np_random.uniform(low=15, high=30,
+                                                          size=num_done)
+            self.state[dones, 1] = np.broadcast_to(self.T_amb(0),
+                                                   (self.num_envs,))[dones]
+
+        infos = [{} for _ in range(self.num_envs)]
+        return (np.copy(self.state) if self.copy else self.state,
+                rewards, dones, infos)
+
+    def close_extras(self, **kwargs):
+        pass
+
+    def _contains_actions(self, actions):
+        space = self.single_action_space
+        if actions.size != self.num_envs:
+            return False
+        if isinstance(space, spaces.Discrete):
+            return bool(np.all((actions >= 0) & (actions < space.n)
+                               & (actions == np.floor(actions))))
+        return bool(np.all((actions >= space.low) & (actions <= space.high)))
+
+
+#####################################################
+############ Batched parametrised envs ##############
+#####################################################
+class TempCtrlVectorEnvs(ThermalVectorEnv):
+    """Batched counterpart of `TempCtrlEnvs`, taking the same parameters.
+
+    Example
+    -------
+    >>> env = TempCtrlVectorEnvs(1024, act_space='C', ambtemp_model='Tcon')
+    >>> observations = env.reset()
+    >>> observations, rewards, dones, infos = env.step(
+    ...     np.full((1024, 1), 50.))
+    """
+    def __init__(self,
+                 num_envs,
+                 thermalParam='Vaccan',
+                 act_space='D200',
+                 reward_type='Rexp',
+                 ambtemp_model='Tsin',
+                 timestep_size='t10',
+                 integrator=None,
+                 copy=True):
+
+        # parse and validate the configuration with a single env
+        env = TempCtrlEnvs(thermalParam=thermalParam,
+                           act_space=act_space,
+                           reward_type=reward_type,
+                           ambtemp_model=ambtemp_model,
+                           timestep_size=timestep_size,
+                           integrator=integrator)
+
+        self.k, self.m, self.C, self.A, self.d = env.k, env.m, env.C, env.A, env.d
+        self.ambtemp_model = ambtemp_model
+        self.reward_type = reward_type
+        self.T_setpoint = env.T_setpoint
+        self.reward = env.reward
+
+        self.timestep = env.timestep
+        self.t_int_step = env.t_int_step
+        self.t = env.t
+        self.t_final = env.t_final
+        self.integrator = env.integrator
+        self.rate = env.rate
+
+        observation_space, action_space = env.observation_space, env.action_space
+        env.close()
+        super(TempCtrlVectorEnvs, self).__init__(num_envs, observation_space,
+                                                 action_space, copy=copy)
+
+    def T_amb(self, time):
+        if self.ambtemp_model == 'Tcon':
+            return TambModels.TConstant()
+        elif self.ambtemp_model == 'Tsin':
+            return TambModels.TSine(self.elapsed_steps, time, self.timestep)
+        elif self.ambtemp_model == 'Trand':
+            return TambModels.TRandom(self.num_envs, self.np_random)
+        elif self.ambtemp_model == 'Tsinrand':
+            return TambModels.TSineRandom(self.elapsed_steps, time,
+                                          self.timestep, self.num_envs,
+                                          self.np_random)
+        else:
+            raise ValueError('Error: unknown ambient temperature model')
+
+    def T_amb_final(self):
+        return self.T_amb(self.timestep)
+
+    def ambient_coeffs(self):
+        if self.ambtemp_model == 'Tsin':
+            T_offset, amplitude, phase = TambModels.TSineCoeffs(
+                self.elapsed_steps, self.timestep)
+            return T_offset, amplitude, phase, 1.
+        # constant over the step (zero-order hold for the random models)
+        return self.T_amb(0), 0., 0., 1.
+
+    def rewards(self, T_can, dones):
+        return self.reward.batch(T_can, dones)
+
+    def dones(self, state):
+        low = self.single_observation_space.low
+        high = self.single_observation_space.high
+        return np.any((state < low) | (state > high), axis=1)
+
+
+#####################################################
+############## Batched default Vac Can ##############
+#####################################################
+class VacCanVectorEnv(ThermalVectorEnv):
+    """Shared physics of the batched default Vac Can envs."""
+    def __init__(self, num_envs, action_space, copy=True):
+        self.k = 1.136*25e-3
+        self.m = 15.76
+        self.C = 505
+        self.A = 1.3
+        self.d = 5.08e-2
+        self.rate = self.k*self.A/(self.d*self.m*self.C)
+
+        self.timestep = 10  # 10 seconds = 1 time-step
+        self.t_int_step = 0.1  # seconds between state updates
+        self.t = np.arange(0, self.timestep, self.t_int_step)
+        self.t_final = self.t[int(self.timestep/self.t_int_step) - 1]
+        self.integrator = 'exact'
+
+        # Set-point temperature
+        self.T_setpoint = 45  # Celsius
+
+        observation_space = sysParam.VacCanObservationSpace()
+        super(VacCanVectorEnv, self).__init__(num_envs, observation_space,
+                                              action_space, copy=copy)
+
+    def rewards(self, T_can, dones):
+        return np.where(~dones & (T_can > 40.) & (T_can < 50.), 0.1, 0.)
+
+    def dones(self, state):
+        return (state[:, 0] < 15.) | (state[:, 0] > 60.)
+
+
+class VacCanVectorEnvDiscrete(VacCanVectorEnv):
+    """Batched counterpart of `VacCanEnvDiscrete`."""
+    def __init__(self, num_envs, copy=True):
+        super(VacCanVectorEnvDiscrete, self).__init__(num_envs,
+            spaces.Discrete(35), copy=copy)
+
+    def T_amb(self, time):
+        return 5*np.sin(2*np.pi*(time)/(6*3600)) + 20.
+
+    def ambient_coeffs(self):
+        omega = 2*np.pi/(6*3600)
+        return 20., 5., omega*self.elapsed_steps*self.timestep, omega
+
+
+class VacCanVectorEnvContinuous(VacCanVectorEnv):
+    """Batched counterpart of `VacCanEnvContinuous`."""
+    def __init__(self, num_envs, copy=True):
+        super(VacCanVectorEnvContinuous, self).__init__(num_envs,
+            spaces.Box(np.array([0.]), np.array([100.]), dtype=np.float64),
+            copy=copy)
+
+    def T_amb(self, time):
+        return 5*np.sin(2*np.pi*(self.elapsed_steps*10.)/(24*3600)) + 20.
+
+    def ambient_coeffs(self):
+        return self.T_amb(0), 0., 0., 1.
@@ -6,3 +6,9 @@ from gym.envs.temp_ctrl.temp import TempEnv
 from gym.envs.temp_ctrl.Run import TempCtrlEnvs
 
 ###
+
+### Batched versions of the envs above, stepping N systems in one array operation
+from gym.envs.temp_ctrl.VectorRun import TempCtrlVectorEnvs, VacCanVectorEnvDiscrete, VacCanVectorEnvContinuous
+
+### Multi-node thermal networks
+from gym.envs.temp_ctrl.Network import ThermalNetworkEnv
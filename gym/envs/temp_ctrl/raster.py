@@ -0,0 +1,67 @@
+"""
+Off-screen rendering of the vacuum can with NumPy, without pyglet or OpenGL
+
+The scene is made of the geoms of `gym.envs.classic_control.rendering`, drawn
+by its `Rasterizer` into a uint8 RGB buffer that is allocated once and reused
+by every frame.
+"""
+import numpy as np
+
+import matplotlib as mpl
+import matplotlib.cm as cm
+
+from gym.envs.classic_control import rendering
+
+
+class VacCanScene(object):
+    """The vacuum can scene of `VacCanTestEnv`: the can coloured by its
+       temperature inside foam coloured by the ambient temperature, and a
+       dial showing the heater power."""
+    screen_width = 600
+    screen_height = 400
+    can_rad = 80.0
+    foam_rad = 120.0
+    polewidth = 10.0
+    polelen = 100.0
+
+    def __init__(self):
+        self.rasterizer = rendering.Rasterizer(self.screen_width, self.screen_height)
+        self.transform = rendering.Transform()
+        self.colors = cm.ScalarMappable(norm=mpl.colors.Normalize(15, 60), cmap=cm.hot)
+        # colours of the temperatures, looked up without going through matplotlib
+        self.T_colors = np.linspace(15, 60, 1024)
+        self.color_table = np.round(self.colors.to_rgba(self.T_colors)[:, :3]*255.).astype(np.uint8)
+        self.can_center = (self.screen_width/3.5, self.screen_height/2)
+        self.axle_center = (self.screen_width*2.5/3., 200.)
+
+        can_tran = rendering.Transform(translation=self.can_center)
+        self.foam = rendering.make_circle(self.foam_rad, res=90)
+        self.foam.add_attr(can_tran)
+        self.can = rendering.make_circle(self.can_rad, res=90)
+        self.can.add_attr(can_tran)
+        l, r, t, b = -self.polewidth/2, self.polewidth/2, \
+                     self.polelen - self.polewidth/2, -self.polewidth/2
+        self.poletrans = rendering.Transform(translation=self.axle_center)
+        pole = rendering.FilledPolygon([(l, b), (l, t), (r, t), (r, b)])
+        pole.set_color(.8, .6, .4)
+        pole.add_attr(self.poletrans)
+        axle = rendering.make_circle(self.polewidth/2)
+        axle.set_color(.5, .5, .8)
+        axle.add_attr(self.poletrans)
+        self.geoms = [self.foam, self.can, pole, axle]
+
+    def color(self, T):
+        index = np.searchsorted(self.T_colors, T)
+        return self.color_table[min(index, len(self.T_colors) - 1)]
+
+    def render(self, T_can, T_amb, heat_fraction):
+        """Returns the frame of the can at `T_can` in ambient `T_amb`, with
+           the heater at `heat_fraction` of its range. The frame is
+           overwritten by the next frame."""
+        self.foam.set_color(*self.color(T_amb)/255.)
+        self.can.set_color(*self.color(T_can)/255.)
+        self.poletrans.set_rotation(heat_fraction*np.pi - np.pi/2)
+        return self.rasterizer.render(self.transform, self.geoms)
+
+    def close(self):
+        pass
@@ -0,0 +1,74 @@
+"""
+Recomputes the rewards and done flags of recorded temp_ctrl transitions for
+another reward type or set-point, without re-running the simulator.
+
+    python -m gym.envs.temp_ctrl.relabel rollouts.npz relabeled.npz --reward_type Rw10 Rexp --setpoint 45
+"""
+import argparse
+
+import numpy as np
+
+from gym.envs.temp_ctrl.Models import Reward, sysParam
+
+
+def relabel(next_states, reward_type='Rexp', T_setpoint=45, observation_space=None):
+    """Returns the rewards and done flags of transitions ending in `next_states`.
+
+    Parameters
+    ----------
+    next_states : `np.ndarray` instance, shape (..., 2)
+        Observations [T_can, T_amb] returned by `TempCtrlEnvs.step`, before
+        any reset. The rewards and dones of the parametrised envs only depend
+        on the next state, so the states and actions are not needed.
+
+    reward_type : str
+        Reward function specifier, e.g. `Rw10`, `Rexp` or `Rquad`.
+
+    T_setpoint : float
+        Set-point temperature of the reward function.
+
+    observation_space : `gym.spaces.Box` instance, optional
+        Space outside of which an episode is done. If `None`, then the
+        observation space of `TempCtrlEnvs` (`sysParam.VacCanObservationSpace`)
+        is used.
+
+    Returns
+    -------
+    rewards : `np.ndarray` instance, shape (...)
+
+    dones : `np.ndarray` instance (dtype `np.bool_`), shape (...)
+    """
+    if observation_space is None:
+        observation_space = sysParam.VacCanObservationSpace()
+    next_states = np.asarray(next_states, dtype=np.float64)
+    dones = np.any((next_states < observation_space.low)
+                   | (next_states > observation_space.high), axis=-1)
+    rewards = Reward(reward_type, T_setpoint).batch(next_states[..., 0], dones)
+    return rewards, dones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Relabel recorded temp_ctrl '
+        'transitions with other reward types.')
+    parser.add_argument('input', help='.npz file holding the recorded transitions')
+    parser.add_argument('output', help='.npz file to write the relabeled transitions to')
+    parser.add_argument('--next_states', default='next_states',
+        help='name of the array of next states in the input file')
+    parser.add_argument('--reward_type', nargs='+', default=['Rexp'],
+        choices=sorted(Reward.functions))
+    parser.add_argument('--setpoint', type=float, default=45.)
+    args = parser.parse_args(argv)
+
+    with np.load(args.input) as data:
+        arrays = dict(data)
+
+    for reward_type in args.reward_type:
+        rewards, dones = relabel(arrays[args.next_states], reward_type,
+                                 args.setpoint)
+        arrays['rewards_{}'.format(reward_type)] = rewards
+    arrays['dones'] = dones
+    np.savez(args.output, **arrays)
+
+
+if __name__ == '__main__':
+    main()
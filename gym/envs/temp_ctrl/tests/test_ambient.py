@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from gym.envs.temp_ctrl import TempCtrlEnvs
+from gym.envs.temp_ctrl.Models import TambModels, TambData, TambTrace
+
+
+@pytest.mark.parametrize('timestep', [1, 10, 100])
+def test_trace_matches_sine(timestep):
+    trace = TambTrace('Tsin', timestep, 0.1, chunk_size=64)
+    trace.reset(np.random.RandomState(0), 3)
+    for elapsed_steps in range(3, 20):
+        for time in [0., 0.05, 0.1, 0.37, timestep - 0.1, timestep]:
+            assert np.isclose(trace(elapsed_steps, time),
+                              TambModels.TSine(elapsed_steps, time, timestep),
+                              rtol=0., atol=1e-7)
+
+
+def test_trace_clamps_time():
+    trace = TambTrace('Tsin', 10, 0.1)
+    assert trace(1, -1.) == trace(1, 0.)
+    assert trace(1, 11.) == trace(1, 10.)
+
+
+@pytest.mark.parametrize('ambtemp_model', ['Trand', 'Tsinrand'])
+def test_trace_random_range(ambtemp_model):
+    trace = TambTrace(ambtemp_model, 10, 0.1, chunk_size=256)
+    trace.reset(np.random.RandomState(0), 0)
+    values = [trace(elapsed_steps, time) for elapsed_steps in range(50)
+              for time in np.linspace(0., 10., 7)]
+    assert min(values) >= 20. and max(values) < 25.
+    assert len(set(values)) > 1
+
+
+def test_unknown_ambtemp_model():
+    with pytest.raises(ValueError):
+        TambTrace('Tfoo', 10, 0.1)
+
+
+@pytest.mark.parametrize('ambtemp_model', ['Tcon', 'Tsin', 'Trand', 'Tsinrand'])
+@pytest.mark.parametrize('integrator', ['exact', 'odeint'])
+def test_seeded_env_is_reproducible(ambtemp_model, integrator):
+    rollouts = []
+    for _ in range(2):
+        env = TempCtrlEnvs(act_space='D10', ambtemp_model=ambtemp_model,
+                           timestep_size='t1', integrator=integrator)
+        env.seed(0)
+        rollout = [env.reset()]
+        for action in [9, 9, 0, 5]:
+            rollout.append(env.step(action)[0])
+        rollouts.append(np.array(rollout))
+    assert np.array_equal(rollouts[0], rollouts[1])
+
+
+@pytest.fixture
+def Tamb_log():
+    return 20. + np.arange(100.)/10.
+
+
+@pytest.mark.parametrize('fmt', ['npy', 'bin', 'csv'])
+def test_data_formats(tmpdir, Tamb_log, fmt):
+    filename = str(tmpdir.join('Tamb.' + fmt))
+    if fmt == 'npy':
+        np.save(filename, Tamb_log)
+    elif fmt == 'bin':
+        Tamb_log.tofile(filename)
+    else:
+        np.savetxt(filename, np.stack([np.arange(100), Tamb_log], axis=1),
+                   delimiter=',', header='time,T_amb')
+    data = TambData(filename, 60.)
+
+    assert len(data) == 100
+    assert isinstance(data.data, np.memmap)
+    assert np.allclose(data(np.array([0., 60., 90., 5940.])), [20., 20.1, 20.15, 29.9])
+    # the log wraps around at its end
+    assert np.isclose(data(6000.), 20.) and np.isclose(data(5970.), 24.95)
+
+
+def test_data_env(tmpdir, Tamb_log):
+    filename = str(tmpdir.join('Tamb.npy'))
+    np.save(filename, Tamb_log)
+    env = TempCtrlEnvs(act_space='D10', ambtemp_model='Tdata', timestep_size='t30',
+                       ambtemp_file=filename, ambtemp_sample_time=60.)
+    assert env.integrator == 'odeint'
+
+    env.seed(0)
+    observation = env.reset()
+    offset = env.Tamb_trace.data_offset
+    assert observation[1] == Tamb_log[int(offset/60.)]
+    for i in range(1, 4):
+        observation, _, _, _ = env.step(0)
+        assert np.isclose(observation[1], TambData(filename, 60.)(offset + 30.*i))
+
+    # a seeded reset replays the log from the same offset
+    env.seed(0)
+    env.reset()
+    assert env.Tamb_trace.data_offset == offset
+
+
+def test_data_needs_file():
+    with pytest.raises(ValueError):
+        TempCtrlEnvs(ambtemp_model='Tdata')
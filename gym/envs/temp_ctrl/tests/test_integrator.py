@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from gym.envs.temp_ctrl import TempCtrlEnvs
+from gym.envs.temp_ctrl.Models import TambModels
+
+AMBTEMP_MODELS = ['Tcon', 'Tsin', 'Trand', 'Tsinrand']
+TIMESTEP_SIZES = ['t1', 't10', 't30', 't60', 't100']
+
+
+@pytest.mark.parametrize('ambtemp_model', AMBTEMP_MODELS)
+@pytest.mark.parametrize('timestep_size', TIMESTEP_SIZES)
+def test_exact_matches_odeint(ambtemp_model, timestep_size):
+    env_exact = TempCtrlEnvs(act_space='C', ambtemp_model=ambtemp_model,
+                             timestep_size=timestep_size, integrator='exact')
+    env_odeint = TempCtrlEnvs(act_space='C', ambtemp_model=ambtemp_model,
+                              timestep_size=timestep_size, integrator='odeint')
+
+    # The random models redraw T_amb in every odeint callback, whereas the
+    # exact scheme holds one draw over the step: both stay within the span
+    # of the ambient noise, scaled by how far the can relaxes in one step.
+    if ambtemp_model in ['Trand', 'Tsinrand']:
+        atol = 5.*(1. - np.exp(-env_exact.rate*env_exact.t_final))
+    else:
+        atol = 1e-6
+
+    for T_can, P_heat in [(15., 0.), (25., 50.), (45., 100.), (59., 0.)]:
+        env_exact.state = np.array([T_can, 20.])
+        env_odeint.state = np.array([T_can, 20.])
+        state_exact, _, _, _ = env_exact.step(np.array([P_heat]))
+        state_odeint, _, _, _ = env_odeint.step(np.array([P_heat]))
+        assert np.isclose(state_exact[0], state_odeint[0], rtol=0., atol=atol)
+
+
+@pytest.mark.parametrize('timestep_size', TIMESTEP_SIZES)
+def test_exact_sine_phase(timestep_size):
+    # later steps shift the phase of the sinusoidal ambient temperature
+    env_exact = TempCtrlEnvs(act_space='D100', ambtemp_model='Tsin',
+                             timestep_size=timestep_size, integrator='exact')
+    env_odeint = TempCtrlEnvs(act_space='D100', ambtemp_model='Tsin',
+                              timestep_size=timestep_size, integrator='odeint')
+    env_odeint.state = env_exact.state
+    for action in [0, 99, 37, 80, 5]:
+        state_exact, _, _, _ = env_exact.step(action)
+        state_odeint, _, _, _ = env_odeint.step(action)
+        assert np.allclose(state_exact, state_odeint, rtol=0., atol=1e-5)
+
+
+def test_tsine_coeffs():
+    offset, amplitude, phase = TambModels.TSineCoeffs(3, 10)
+    for time in [0., 0.1, 4.2]:
+        assert np.isclose(TambModels.TSine(3, time, 10),
+                          amplitude*np.sin(time + phase) + offset)
+
+
+@pytest.mark.parametrize('ambtemp_model,integrator', [
+    ('Tcon', 'exact'), ('Tsin', 'exact'),
+    ('Trand', 'odeint'), ('Tsinrand', 'odeint'),
+])
+def test_default_integrator(ambtemp_model, integrator):
+    env = TempCtrlEnvs(ambtemp_model=ambtemp_model)
+    assert env.integrator == integrator
+
+
+def test_unknown_integrator():
+    with pytest.raises(ValueError):
+        TempCtrlEnvs(integrator='euler')
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import gym
+from gym.envs.temp_ctrl import TempCtrlEnvs, ThermalNetworkEnv
+from gym.envs.temp_ctrl.Models import ThermalNetwork, sysParam
+
+
+@pytest.mark.parametrize('timestep_size', ['t1', 't10', 't100'])
+def test_single_node_matches_vac_can(timestep_size):
+    k, m, C, A, d = sysParam.VacCanParams()
+    network = ThermalNetwork([m*C], [[0.]], [k*A/d], [1.], names=['can'])
+    kwargs = dict(act_space='D100', reward_type='Rquad', ambtemp_model='Tcon',
+                  timestep_size=timestep_size)
+    env_network = ThermalNetworkEnv(network=network, **kwargs)
+    env = TempCtrlEnvs(integrator='exact', **kwargs)
+    env.state = np.copy(env_network.state)
+    for action in [99, 99, 0, 50, 10]:
+        state_network, reward_network, _, _ = env_network.step(action)
+        state, reward, _, _ = env.step(action)
+        assert np.allclose(state_network, state, rtol=0., atol=1e-9)
+        assert np.isclose(reward_network, reward, rtol=0., atol=1e-12)
+
+
+@pytest.mark.parametrize('thermalParam', ['VaccanNet', 'SeismNet'])
+def test_implicit_matches_expm(thermalParam):
+    envs = [ThermalNetworkEnv(thermalParam, act_space='C', timestep_size='t10',
+                              ambtemp_model='Tcon', solver=solver, implicit_step=0.1)
+            for solver in ['expm', 'implicit']]
+    for env in envs:
+        env.seed(0)
+        env.reset()
+    for _ in range(50):
+        states = [env.step(np.array([100.]))[0] for env in envs]
+        assert np.allclose(states[0], states[1], rtol=0., atol=1e-2)
+
+
+def test_steady_state():
+    env = ThermalNetworkEnv('SeismNet', act_space='C', timestep_size='t100',
+                            ambtemp_model='Tcon')
+    for _ in range(20000):  # slowest time constant is about 13 hours
+        state, _, done, _ = env.step(np.array([10.]))
+    assert not done
+    assert np.allclose(state[:-1], env.network.steady_state(10., 20.), rtol=0., atol=1e-6)
+    # no heat leaves the seismometer, which settles at the temperature of the can
+    assert np.isclose(state[0], state[1])
+
+
+def test_reset_profile():
+    env = ThermalNetworkEnv('VaccanNet', n_foam=6)
+    assert env.observation_space.shape == (len(env.network) + 1,)
+    for seed in range(5):
+        env.seed(seed)
+        state = env.reset()
+        assert env.observation_space.contains(state)
+        # the temperatures fall monotonically from the can to the ambient
+        assert np.all(np.diff(state[:-1] - state[-1]) <= 0.) or \
+               np.all(np.diff(state[:-1] - state[-1]) >= 0.)
+
+
+@pytest.mark.parametrize('thermalParam', ['VaccanNet', 'SeismNet'])
+def test_no_foam(thermalParam):
+    env = ThermalNetworkEnv(thermalParam, n_foam=0, act_space='C')
+    assert env.network.names[-2:] == ['can', 'air']
+    env.seed(0)
+    assert env.observation_space.contains(env.reset())
+    state, _, _, _ = env.step(np.array([10.]))
+    assert state.shape == (len(env.network) + 1,)
+
+
+def test_make():
+    env = gym.make('SeismNet_D20_Rw4_Tsin_t30-v0', n_foam=10)
+    assert env.unwrapped.network.names[:2] == ['seismometer', 'can']
+    assert env.reset().shape == (14,)
+    assert gym.spec('Vaccan_D20_Rw4_Tsin_t30-v0').entry_point == \
+        'gym.envs.temp_ctrl:TempCtrlEnvs'
+
+
+def test_invalid_network():
+    with pytest.raises(ValueError):
+        ThermalNetworkEnv('Vaccan')
+    with pytest.raises(ValueError):
+        ThermalNetworkEnv(solver='odeint')
+    with pytest.raises(ValueError):
+        ThermalNetworkEnv('VaccanNet', n_foam=-1)
+    with pytest.raises(ValueError):
+        ThermalNetwork([1., 1.], [[0., 1.], [2., 0.]], [1., 0.], [1., 0.])
+    with pytest.raises(ValueError):
+        ThermalNetwork([1., 1.], [[0., 1.], [1., 0.]], [0., 0.], [1., 0.])
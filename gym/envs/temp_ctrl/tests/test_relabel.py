@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from gym.envs.temp_ctrl import TempCtrlEnvs
+from gym.envs.temp_ctrl.Models import Reward, sysParam
+from gym.envs.temp_ctrl.relabel import relabel, main
+
+
+def rollout(reward_type, T_setpoint=45):
+    env = TempCtrlEnvs(act_space='D100', reward_type=reward_type,
+                       ambtemp_model='Tsin', timestep_size='t100')
+    env.T_setpoint = T_setpoint
+    env.reward = Reward(reward_type, T_setpoint)
+    env.seed(0)
+    env.reset()
+    next_states, rewards, dones = [], [], []
+    for action in [99]*100:
+        next_state, reward, done, _ = env.step(action)
+        next_states.append(next_state)
+        rewards.append(reward)
+        dones.append(done)
+        if done:
+            break
+    return np.array(next_states), np.array(rewards), np.array(dones)
+
+
+@pytest.mark.parametrize('reward_type', ['Rw10', 'Rw4', 'Rexp', 'Rquad', 'Rrecquad'])
+@pytest.mark.parametrize('T_setpoint', [40, 45])
+def test_matches_resimulation(reward_type, T_setpoint):
+    next_states, _, _ = rollout('Rexp')
+    _, rewards, dones = rollout(reward_type, T_setpoint)
+    assert dones[-1]
+
+    relabeled_rewards, relabeled_dones = relabel(next_states, reward_type, T_setpoint)
+    assert np.array_equal(relabeled_dones, dones)
+    assert np.allclose(relabeled_rewards, rewards, rtol=0., atol=1e-12)
+
+
+def test_default_observation_space():
+    env = TempCtrlEnvs()
+    assert sysParam.VacCanObservationSpace() == env.observation_space
+    env.close()
+    _, dones = relabel([[14., 20.], [45., 20.], [45., 51.]])
+    assert np.array_equal(dones, [True, False, True])
+
+
+def test_cli(tmpdir):
+    next_states, _, _ = rollout('Rexp')
+    states = np.zeros_like(next_states)
+    actions = np.full(len(next_states), 99)
+    input_file, output_file = str(tmpdir.join('in.npz')), str(tmpdir.join('out.npz'))
+    np.savez(input_file, states=states, actions=actions, next_states=next_states)
+
+    main([input_file, output_file, '--reward_type', 'Rw10', 'Rquad', '--setpoint', '40'])
+    with np.load(output_file) as data:
+        assert np.array_equal(data['actions'], actions)
+        for reward_type in ['Rw10', 'Rquad']:
+            rewards, dones = relabel(next_states, reward_type, 40)
+            assert np.array_equal(data['rewards_' + reward_type], rewards)
+        assert np.array_equal(data['dones'], dones)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from gym.envs.temp_ctrl import TempCtrlEnvs
+from gym.envs.temp_ctrl.VacuumCanTest import VacCanTestEnv
+from gym.envs.temp_ctrl.raster import VacCanScene
+
+
+def test_scene_colors_and_dial():
+    scene = VacCanScene()
+    frame = scene.render(45., 20., 0.)
+    x, y = scene.can_center
+    row = scene.screen_height - int(y)
+    assert np.array_equal(frame[row, int(x)], scene.color(45.))
+    assert np.array_equal(frame[row, int(x + scene.can_rad + 20)], scene.color(20.))
+    assert np.allclose(frame[row, int(x)], np.array(scene.colors.to_rgba(45.)[:3])*255, atol=2)
+
+    # the dial points right with the heater off and left at full power
+    x, y = scene.axle_center
+    row = scene.screen_height - int(y)
+    pole = [204, 153, 102]
+    assert np.array_equal(frame[row, int(x + 50)], pole)
+    frame = scene.render(45., 20., 1.)
+    assert np.array_equal(frame[row, int(x - 50)], pole)
+    assert np.array_equal(frame[row, int(x + 50)], [255, 255, 255])
+
+
+def test_env_rgb_array():
+    env = TempCtrlEnvs(act_space='D20')
+    frame = env.render(mode='rgb_array')
+    assert frame.shape == (400, 600, 3)
+    env.step(19)
+    # frames are rendered into the same buffer
+    assert env.render(mode='rgb_array') is frame
+    env.close()
+
+    env = VacCanTestEnv()
+    env.step(10)
+    assert env.render(mode='rgb_array').shape == (400, 600, 3)
+    env.close()
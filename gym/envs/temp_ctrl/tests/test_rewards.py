@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from gym.envs.temp_ctrl.Models import Reward
+
+REWARD_TYPES = ['Rw10', 'Rw4', 'Rquad', 'Rexp', 'Rrecquad']
+
+
+@pytest.mark.parametrize('reward_type', REWARD_TYPES)
+def test_batch_matches_scalar(reward_type):
+    reward = Reward(reward_type)
+    T_can = np.array([15., 39.9, 40., 40.1, 43., 44.5, 46.9, 47., 50., 50.1, 60.])
+    rewards = reward.batch(T_can)
+    assert rewards.shape == T_can.shape
+    for T, r in zip(T_can, rewards):
+        assert np.isscalar(reward(float(T)))
+        assert reward(float(T)) == r
+        assert reward(T) == r
+
+
+@pytest.mark.parametrize('reward_type', REWARD_TYPES)
+def test_batch_dones(reward_type):
+    reward = Reward(reward_type)
+    T_can = np.full((3, 4), 44.)
+    dones = np.zeros((3, 4), dtype=np.bool_)
+    dones[1, 2] = True
+    rewards = reward.batch(T_can, dones)
+    assert rewards[1, 2] == 0.
+    assert np.all(rewards[~dones] == reward(44.))
+
+
+def test_windows():
+    assert Reward('Rw10')(40.) == 0. and Reward('Rw10')(50.) == 0.1
+    assert Reward('Rw4')(43.) == 0. and Reward('Rw4')(47.) == 0.1
+
+
+def test_unknown_reward_type():
+    with pytest.raises(ValueError):
+        Reward('Rfoo')
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from gym.vector.vector_env import VectorEnv
+from gym.envs.temp_ctrl import (TempCtrlEnvs, TempCtrlVectorEnvs,
+                                VacCanEnvDiscrete, VacCanEnvContinuous,
+                                VacCanVectorEnvDiscrete, VacCanVectorEnvContinuous)
+
+NUM_ENVS = 4
+
+
+@pytest.mark.parametrize('ambtemp_model', ['Tcon', 'Tsin'])
+@pytest.mark.parametrize('reward_type', ['Rw10', 'Rw4', 'Rquad', 'Rexp'])
+@pytest.mark.parametrize('timestep_size', ['t1', 't100'])
+def test_matches_single_envs(ambtemp_model, reward_type, timestep_size):
+    kwargs = dict(act_space='D100', reward_type=reward_type,
+                  ambtemp_model=ambtemp_model, timestep_size=timestep_size)
+    vector_env = TempCtrlVectorEnvs(NUM_ENVS, **kwargs)
+    envs = [TempCtrlEnvs(**kwargs) for _ in range(NUM_ENVS)]
+    observations = vector_env.reset()
+    for env, observation in zip(envs, observations):
+        env.state = np.copy(observation)
+
+    assert isinstance(vector_env, VectorEnv)
+    rng = np.random.RandomState(0)
+    for _ in range(5):
+        actions = rng.randint(100, size=NUM_ENVS)
+        observations, rewards, dones, infos = vector_env.step(actions)
+        for i, env in enumerate(envs):
+            observation, reward, done, _ = env.step(int(actions[i]))
+            assert not done and not dones[i]
+            assert np.allclose(observations[i], observation, rtol=0., atol=1e-9)
+            assert np.isclose(rewards[i], reward, rtol=0., atol=1e-9)
+    assert len(infos) == NUM_ENVS
+
+
+@pytest.mark.parametrize('vector_cls,single_cls,actions', [
+    (VacCanVectorEnvDiscrete, VacCanEnvDiscrete, np.array([0, 10, 20, 34])),
+    (VacCanVectorEnvContinuous, VacCanEnvContinuous, np.array([[0.], [25.], [50.], [100.]])),
+])
+def test_vac_can_matches_single_envs(vector_cls, single_cls, actions):
+    vector_env = vector_cls(NUM_ENVS)
+    envs = [single_cls() for _ in range(NUM_ENVS)]
+    observations = vector_env.reset()
+    for env, observation in zip(envs, observations):
+        env.state = np.copy(observation)
+
+    for _ in range(5):
+        observations, rewards, dones, _ = vector_env.step(actions)
+        for i, env in enumerate(envs):
+            action = actions[i] if actions.ndim > 1 else int(actions[i])
+            observation, reward, done, _ = env.step(action)
+            assert np.allclose(observations[i], observation, rtol=0., atol=1e-6)
+            assert rewards[i] == reward and dones[i] == done
+
+
+@pytest.mark.parametrize('integrator', ['exact', 'odeint'])
+def test_auto_reset(integrator):
+    env = TempCtrlVectorEnvs(NUM_ENVS, act_space='C', timestep_size='t100',
+                             integrator=integrator)
+    env.reset()
+    env.state[:, 0] = [59.99, 30., 59.99, 45.]
+    observations, rewards, dones, _ = env.step(np.full((NUM_ENVS, 1), 100.))
+
+    assert np.array_equal(dones, [True, False, True, False])
+    assert np.all(rewards[dones] == 0.)
+    assert np.all((observations[dones, 0] >= 15.) & (observations[dones, 0] <= 30.))
+    assert np.all(observations[~dones, 0] > 30.)
+
+
+def test_seed():
+    env1 = TempCtrlVectorEnvs(NUM_ENVS, ambtemp_model='Tcon')
+    env2 = TempCtrlVectorEnvs(NUM_ENVS, ambtemp_model='Tcon')
+    env1.seed(0)
+    env2.seed(0)
+    assert np.array_equal(env1.reset(), env2.reset())
+
+
+def test_invalid_actions():
+    env = TempCtrlVectorEnvs(NUM_ENVS, act_space='D10')
+    with pytest.raises(AssertionError):
+        env.step(np.array([0, 1, 2, 10]))
+    with pytest.raises(AssertionError):
+        env.step(np.array([0, 1, 2]))
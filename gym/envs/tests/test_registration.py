@@ -77,3 +77,53 @@ def test_malformed_lookup():
         assert 'malformed environment ID' in '{}'.format(e), 'Unexpected message: {}'.format(e)
     else:
         assert False
+
+def test_family_lookup():
+    registry = registration.EnvRegistry()
+    registry.register_family(
+        id='{arg1}Test{arg2}-v0',
+        entry_point='gym.envs.tests.test_registration:ArgumentEnv',
+        params=[('arg1', [4, 8, 16]), ('arg2', ['', 'Hard'])],
+        kwargs={'arg3': 'arg3'},
+    )
+    spec = registry.spec('16TestHard-v0')
+    assert spec.id == '16TestHard-v0'
+    assert spec._kwargs == {'arg1': 16, 'arg2': 'Hard', 'arg3': 'arg3'}
+    assert registry.spec('16TestHard-v0') is spec
+    env = spec.make()
+    assert (env.arg1, env.arg2, env.arg3) == (16, 'Hard', 'arg3')
+
+    try:
+        registry.spec('32Test-v0')
+    except error.UnregisteredEnv:
+        pass
+    else:
+        assert False
+
+    ids = sorted(spec.id for spec in registry.all())
+    assert len(ids) == 6
+    assert ids[0] == '16Test-v0' and ids[-1] == '8TestHard-v0'
+
+    try:
+        registry.register(id='4Test-v0', entry_point=None)
+    except error.Error:
+        pass
+    else:
+        assert False
+
+def test_family_unknown_field():
+    registry = registration.EnvRegistry()
+    try:
+        registry.register_family(id='{size}Test-v0', params=[('arg1', [4, 8])])
+    except error.Error:
+        pass
+    else:
+        assert False
+
+def test_temp_ctrl_family():
+    spec = envs.spec('Vaccan_D200_Rexp_Tsin_t10-v0')
+    assert spec._kwargs == {'thermalParam': 'Vaccan', 'act_space': 'D200',
+                            'reward_type': 'Rexp', 'ambtemp_model': 'Tsin',
+                            'timestep_size': 't10'}
+    assert len([spec for spec in envs.registry.all()
+                if spec.entry_point == 'gym.envs.temp_ctrl:TempCtrlEnvs']) == 1400
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import gym
+from gym import error
+from gym.envs.classic_control import rendering
+
+
+def test_numpy_backend_geoms():
+    viewer = rendering.Viewer(40, 30, backend='numpy')
+    assert viewer.window is None
+    viewer.set_bounds(0., 4., 0., 3.)
+
+    square = rendering.FilledPolygon([(-.5, -.5), (-.5, .5), (.5, .5), (.5, -.5)])
+    square.set_color(1., 0., 0.)
+    square.add_attr(rendering.Transform(translation=(1., 1.)))
+    viewer.add_geom(square)
+    line = rendering.Line((2.5, 0.), (2.5, 3.))
+    line.set_color(0., 0., 1.)
+    viewer.add_geom(line)
+    frame = viewer.render(return_rgb_array=True)
+
+    assert frame.shape == (30, 40, 3) and frame.dtype == np.uint8
+    # the square spans x and y in [5, 15), and y points up
+    red = np.all(frame == [255, 0, 0], axis=-1)
+    assert np.array_equal(np.argwhere(red).min(axis=0), [15, 5])
+    assert np.array_equal(np.argwhere(red).max(axis=0), [24, 14])
+    assert np.count_nonzero(red) == 100
+    blue = np.all(frame == [0, 0, 255], axis=-1)
+    assert np.all(blue[:, 24] | blue[:, 25]) and np.count_nonzero(blue) <= 2*30
+    assert np.all(frame[:, 30:] == 255)
+
+    # the outermost transform is the last one added, so the translation is scaled
+    square.add_attr(rendering.Transform(scale=(2., 2.)))
+    frame = viewer.render(return_rgb_array=True)
+    red = np.all(frame == [255, 0, 0], axis=-1)
+    assert np.array_equal(np.argwhere(red).min(axis=0), [0, 10])
+    assert np.array_equal(np.argwhere(red).max(axis=0), [19, 29])
+    viewer.close()
+    assert not viewer.isopen
+
+
+def test_numpy_backend_compound_color_and_onetime():
+    viewer = rendering.Viewer(20, 20, backend='numpy')
+    capsule = rendering.make_capsule(10, 4)
+    capsule.set_color(0., 1., 0.)
+    capsule.add_attr(rendering.Transform(translation=(5, 10)))
+    viewer.add_geom(capsule)
+    viewer.draw_circle(2, color=(0., 0., 1.)).add_attr(rendering.Transform(translation=(3, 3)))
+
+    frame = viewer.render(return_rgb_array=True)
+    assert np.array_equal(frame[10, 10], [0, 255, 0])
+    assert np.array_equal(frame[16, 3], [0, 0, 255])
+    # one-time geoms are only in the next frame
+    frame = viewer.render(return_rgb_array=True)
+    assert np.array_equal(frame[16, 3], [255, 255, 255])
+    viewer.close()
+
+
+def test_numpy_backend_antialias():
+    frames = []
+    for antialias in [1, 4]:
+        viewer = rendering.Viewer(20, 20, backend='numpy', antialias=antialias)
+        viewer.draw_polygon([(0., 0.), (20., 0.), (0., 20.)])
+        frames.append(viewer.render(return_rgb_array=True))
+        viewer.close()
+    aliased, antialiased = frames
+    assert set(np.unique(aliased)) == {0, 255}
+    assert len(np.unique(antialiased)) > 2
+    # both cover half of the frame
+    assert np.mean(aliased) == pytest.approx(np.mean(antialiased), abs=255./20)
+
+
+def test_invalid_backend():
+    with pytest.raises(error.Error):
+        rendering.Viewer(20, 20, backend='opengl')
+
+
+@pytest.mark.parametrize('env_id', ['CartPole-v1', 'Acrobot-v1', 'MountainCar-v0', 'Pendulum-v0'])
+def test_numpy_backend_envs(env_id, monkeypatch):
+    monkeypatch.setenv('GYM_RENDERING_BACKEND', 'numpy')
+    env = gym.make(env_id)
+    env.seed(0)
+    env.reset()
+    env.step(env.action_space.sample())
+    frame = env.render(mode='rgb_array')
+    assert frame.ndim == 3 and frame.shape[2] == 3 and frame.dtype == np.uint8
+    assert np.any(frame != 255)
+    # every frame is a new array
+    assert env.render(mode='rgb_array') is not frame
+    env.close()
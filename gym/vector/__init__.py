@@ -5,11 +5,14 @@ except ImportError:
 
 from gym.vector.async_vector_env import AsyncVectorEnv
 from gym.vector.sync_vector_env import SyncVectorEnv
+from gym.vector.thread_vector_env import ThreadVectorEnv
 from gym.vector.vector_env import VectorEnv, VectorEnvWrapper
 
-__all__ = ['AsyncVectorEnv', 'SyncVectorEnv', 'VectorEnv', 'VectorEnvWrapper', 'make']
+__all__ = ['AsyncVectorEnv', 'SyncVectorEnv', 'ThreadVectorEnv', 'VectorEnv',
+           'VectorEnvWrapper', 'make']
 
-def make(id, num_envs=1, asynchronous=True, wrappers=None, **kwargs):
+def make(id, num_envs=1, asynchronous=True, wrappers=None, envs_per_worker=1,
+         mode=None, **kwargs):
     """Create a vectorized environment from multiple copies of an environment,
     from its id
 
@@ -30,6 +33,16 @@ def make(id, num_envs=1, asynchronous=True, wrappers=None, **kwargs):
         If not `None`, then apply the wrappers to each internal 
         environment during creation. 
 
+    envs_per_worker : int (default: 1)
+        Number of environments run by each worker process of an
+        `AsyncVectorEnv`. Ignored if `asynchronous` is `False`.
+
+    mode : {'async', 'sync', 'thread'}, optional
+        Wraps the environments in an `AsyncVectorEnv`, a `SyncVectorEnv`, or a
+        `ThreadVectorEnv` (which runs the environments in parallel on threads,
+        for environments that release the GIL). If `None`, the mode is given
+        by `asynchronous`.
+
     Returns
     -------
     env : `gym.vector.VectorEnv` instance
@@ -58,4 +71,13 @@ def make(id, num_envs=1, asynchronous=True, wrappers=None, **kwargs):
                 raise NotImplementedError
         return env
     env_fns = [_make_env for _ in range(num_envs)]
-    return AsyncVectorEnv(env_fns) if asynchronous else SyncVectorEnv(env_fns)
+    if mode is None:
+        mode = 'async' if asynchronous else 'sync'
+    if mode == 'async':
+        return AsyncVectorEnv(env_fns, envs_per_worker=envs_per_worker)
+    elif mode == 'sync':
+        return SyncVectorEnv(env_fns)
+    elif mode == 'thread':
+        return ThreadVectorEnv(env_fns)
+    raise ValueError('`mode` must be one of {{`async`, `sync`, `thread`}}, '
+        'got `{0}`.'.format(mode))
@@ -1,17 +1,25 @@
 import numpy as np
 import multiprocessing as mp
+import os
 import time
 import sys
+from ctypes import c_bool
 from enum import Enum
-from copy import deepcopy
+from functools import partial
+from itertools import cycle
+from multiprocessing.connection import wait
 
 from gym import logger
+from gym.utils import seeding
 from gym.vector.vector_env import VectorEnv
 from gym.error import (AlreadyPendingCallError, NoAsyncCallError,
                        ClosedEnvironmentError)
 from gym.vector.utils import (create_shared_memory, create_empty_array,
                               write_to_shared_memory, read_from_shared_memory,
-                              concatenate, CloudpickleWrapper, clear_mpi_env_vars)
+                              concatenate, index_batch, copy_batch,
+                              CloudpickleWrapper,
+                              clear_mpi_env_vars, space_fingerprint, worker_cpus,
+                              _BaseGymSpaces)
 
 __all__ = ['AsyncVectorEnv']
 
@@ -40,14 +48,25 @@ class AsyncVectorEnv(VectorEnv):
         of the first environment is taken.
 
     shared_memory : bool (default: `True`)
-        If `True`, then the observations from the worker processes are
-        communicated back through shared variables. This can improve the
-        efficiency if the observations are large (e.g. images).
+        If `True`, then the observations, rewards and dones from the worker
+        processes are communicated back through shared variables, and so are
+        the actions sent to them. The pipes then only carry the commands (and
+        the infos, when they are not empty). This can improve the efficiency if
+        the observations are large (e.g. images), or for large actions and high
+        step rates.
 
     copy : bool (default: `True`)
         If `True`, then the `reset` and `step` methods return a copy of the
         observations.
 
+    num_copies : int, optional
+        If not `None`, and `copy` is `True`, then the observations are copied
+        in turn into `num_copies` batches allocated once, instead of into new
+        arrays at every call. A batch returned by `reset` or `step` is then
+        overwritten `num_copies` calls later, so `num_copies` must be at least
+        the number of batches held at once (e.g. 2 to keep the observation and
+        the next observation of a transition).
+
     context : str, optional
         Context for multiprocessing. If `None`, then the default context is used.
         Only available in Python 3.
@@ -64,16 +83,94 @@ class AsyncVectorEnv(VectorEnv):
         logic, for instance, how resets on done are handled. Provides high
         degree of flexibility and a high chance to shoot yourself in the foot; thus,
         if you are writing your own worker, it is recommended to start from the code
-        for `_worker` (or `_worker_shared_memory`) method below, and add changes
+        for `_worker` (or `_worker_shared_memory`) method below, and add changes.
+        A custom worker runs a single environment, as in previous versions:
+        it is called with `(index, env_fn, pipe, parent_pipe, shared_memory,
+        error_queue)`, where `env_fn` creates the environment and
+        `shared_memory` is the buffer of the observations (or `None`), and
+        receives the action of `step` and the seed of `seed` through the pipe.
+        It requires `envs_per_worker=1` and `transport='pipe'`, and the
+        observation spaces are then always checked with `==`.
+
+    envs_per_worker : int (default: 1)
+        Number of environments run by each worker process. Each worker owns a
+        contiguous block of environments, which it steps in a loop before
+        replying with a single message. Running several cheap environments per
+        process cuts down the number of processes and of round-trips per step.
+
+    transport : {'pipe', 'flags'} (default: 'pipe')
+        How `reset` and `step` are signalled to the workers, and their
+        completion back to the main process. With 'pipe', every call is a
+        message sent and received on each pipe. With 'flags', the command and
+        the status of each worker are flags in shared memory, and each side is
+        woken up by a semaphore, which only costs a system call when the other
+        side is blocked waiting on it. Requires `shared_memory=True`. Infos are
+        still sent through the pipes when they are not empty, and so are the
+        other (rare) commands.
+
+    spin_wait : float (default: 0.)
+        With `transport='flags'`, number of seconds for which the workers and
+        the main process poll their semaphore before blocking on it. Spinning
+        removes the cost of waking up a sleeping process for environments that
+        step within a few microseconds, but keeps a core busy; it only helps
+        with at least one core per worker, plus one for the main process.
+
+    strict_space_check : bool (default: `False`)
+        If `True`, the observation space of the environments is checked
+        against `observation_space` by sending it to the workers, and comparing
+        it with `==`. Otherwise, the workers compare a compact fingerprint of
+        the spaces (see `space_fingerprint`), which is much cheaper than
+        sending spaces with large bounds (e.g. images) to each worker, but
+        requires the bounds to be exactly equal.
+
+    restart_workers : bool (default: `False`)
+        If `True`, a worker whose environment raises an error, or whose process
+        dies, during `seed`, `reset` or `step` is restarted instead of the
+        error being raised. The new worker creates its environments from
+        `env_fns`, seeds them with seeds derived from their last seeds and the
+        number of restarts of the worker (or leaves them unseeded if they were
+        never seeded), and resets them. After a `step`, the environments of a
+        restarted worker are `done`, with a reward of 0, the observation of
+        their reset, and `info['worker_restarted'] = True`. The number of
+        restarts of each worker is counted in `worker_restarts`.
+
+    cpu_affinity : 'auto' or list, optional
+        Pins each worker process to a set of CPUs, before it creates its
+        environments. Either a list with the CPU (int) or the CPUs (iterable
+        of int) of each worker, or 'auto' to give each worker one of the CPUs
+        this process may run on, node by node on NUMA machines (see
+        `worker_cpus`), so that the workers that write to the same part of the
+        shared buffers are on the same node. If `None`, the workers may run on
+        any CPU and migrate between them. Only available on Linux.
     """
     def __init__(self, env_fns, observation_space=None, action_space=None,
-                 shared_memory=True, copy=True, context=None, daemon=True, worker=None):
+                 shared_memory=True, copy=True, context=None, daemon=True, worker=None,
+                 envs_per_worker=1, transport='pipe', spin_wait=0., num_copies=None,
+                 strict_space_check=False, restart_workers=False, cpu_affinity=None):
         try:
             ctx = mp.get_context(context)
         except AttributeError:
             logger.warn('Context switching for `multiprocessing` is not '
                 'available in Python 2. Using the default context.')
             ctx = mp
+        if envs_per_worker < 1:
+            raise ValueError('`envs_per_worker` must be a positive integer, '
+                'got {0}.'.format(envs_per_worker))
+        if transport not in ('pipe', 'flags'):
+            raise ValueError('`transport` must be one of {{`pipe`, `flags`}}, '
+                'got `{0}`.'.format(transport))
+        if transport == 'flags' and not shared_memory:
+            raise ValueError('`transport=\'flags\'` requires `shared_memory=True`.')
+        if (worker is not None) and (envs_per_worker != 1 or transport != 'pipe'):
+            raise ValueError('A custom `worker` runs a single environment, and '
+                'requires `envs_per_worker=1` and `transport=\'pipe\'`.')
+        if num_copies is not None and num_copies < 1:
+            raise ValueError('`num_copies` must be a positive integer, '
+                'got {0}.'.format(num_copies))
+        num_workers = -(-len(env_fns) // envs_per_worker)
+        if isinstance(cpu_affinity, (list, tuple)) and len(cpu_affinity) != num_workers:
+            raise ValueError('`cpu_affinity` must give the CPUs of each of the '
+                '{0} workers, got {1}.'.format(num_workers, len(cpu_affinity)))
         self.env_fns = env_fns
         self.shared_memory = shared_memory
         self.copy = copy
@@ -92,32 +189,103 @@ class AsyncVectorEnv(VectorEnv):
                 n=self.num_envs, ctx=ctx)
             self.observations = read_from_shared_memory(_obs_buffer,
                 self.single_observation_space, n=self.num_envs)
+            _action_buffer = create_shared_memory(self.single_action_space,
+                n=self.num_envs, ctx=ctx)
+            self._actions = read_from_shared_memory(_action_buffer,
+                self.single_action_space, n=self.num_envs)
+            _reward_buffer = ctx.Array('d', self.num_envs)
+            self._rewards = np.frombuffer(_reward_buffer.get_obj(), dtype=np.float64)
+            _done_buffer = ctx.Array(c_bool, self.num_envs)
+            self._dones = np.frombuffer(_done_buffer.get_obj(), dtype=np.bool_)
+            self._action_buffer = _action_buffer
+            _shared_memory = (_obs_buffer, _action_buffer, _reward_buffer, _done_buffer,
+                None)
         else:
-            _obs_buffer = None
+            _shared_memory = None
             self.observations = create_empty_array(
             	self.single_observation_space, n=self.num_envs, fn=np.zeros)
-
-        self.parent_pipes, self.processes = [], []
+        self._observation_copies = None if num_copies is None else \
+            cycle([create_empty_array(self.single_observation_space,
+            n=self.num_envs, fn=np.empty) for _ in range(num_copies)])
+
+        # Each worker runs the environments env_fns[index:index + envs_per_worker]
+        self.envs_per_worker = envs_per_worker
+        self.worker_slices = [slice(index, min(index + envs_per_worker, self.num_envs))
+            for index in range(0, self.num_envs, envs_per_worker)]
+        self.num_workers = len(self.worker_slices)
+
+        self.transport = transport
+        self.spin_wait = spin_wait
+        if self.transport == 'flags':
+            self._commands_buffer = ctx.RawArray('i', self.num_workers)
+            self._statuses_buffer = ctx.RawArray('i', self.num_workers)
+            self._commands = np.frombuffer(self._commands_buffer, dtype=np.intc)
+            self._statuses = np.frombuffer(self._statuses_buffer, dtype=np.intc)
+            self._work_ready = [None for _ in range(self.num_workers)]
+            # released once by each worker that completes a command, so that the
+            # main process can wait for any of them
+            self._work_done = ctx.Semaphore(0)
+        self._waiting = np.zeros(self.num_workers, dtype=np.bool_)
+
+        self.restart_workers = restart_workers
+        self.worker_restarts = np.zeros(self.num_workers, dtype=np.int64)
+        self._seeds = [None for _ in range(self.num_envs)]
+
+        if cpu_affinity is None or not hasattr(os, 'sched_setaffinity'):
+            if cpu_affinity is not None:
+                logger.warn('Setting the CPU affinity of processes is not '
+                    'available on this platform. Ignoring `cpu_affinity`.')
+            self.worker_cpus = None
+        elif cpu_affinity == 'auto':
+            self.worker_cpus = worker_cpus(self.num_workers)
+        else:
+            self.worker_cpus = [[cpus] if isinstance(cpus, int) else list(cpus)
+                for cpus in cpu_affinity]
+
+        self._ctx = ctx
+        self._shared_memory_buffers = _shared_memory
+        # custom workers speak the single environment protocol
+        self._single_env_workers = worker is not None
+        self._worker_target = worker or (_worker_shared_memory
+            if self.shared_memory else _worker)
+        self._daemon = daemon
+        self.parent_pipes = [None for _ in range(self.num_workers)]
+        self.processes = [None for _ in range(self.num_workers)]
         self.error_queue = ctx.Queue()
-        target = _worker_shared_memory if self.shared_memory else _worker
-        target = worker or target
-        with clear_mpi_env_vars():
-            for idx, env_fn in enumerate(self.env_fns):
-                parent_pipe, child_pipe = ctx.Pipe()
-                process = ctx.Process(target=target,
-                    name='Worker<{0}>-{1}'.format(type(self).__name__, idx),
-                    args=(idx, CloudpickleWrapper(env_fn), child_pipe,
-                    parent_pipe, _obs_buffer, self.error_queue))
-
-                self.parent_pipes.append(parent_pipe)
-                self.processes.append(process)
-
-                process.daemon = daemon
-                process.start()
-                child_pipe.close()
+        for index in range(self.num_workers):
+            self._start_worker(index)
 
         self._state = AsyncState.DEFAULT
-        self._check_observation_spaces()
+        self._check_observation_spaces(strict=strict_space_check
+            or self._single_env_workers)
+
+    def _start_worker(self, index):
+        ctx, env_slice = self._ctx, self.worker_slices[index]
+        shared_memory = self._shared_memory_buffers
+        if self.transport == 'flags':
+            self._work_ready[index] = ctx.Semaphore(0)
+            shared_memory = shared_memory[:4] + ((index, self._commands_buffer,
+                self._statuses_buffer, self._work_ready[index], self._work_done,
+                self.spin_wait),)
+        if self._single_env_workers:
+            env_fn = self.env_fns[env_slice.start]
+            shared_memory = shared_memory and shared_memory[0]
+        else:
+            env_fn = partial(_make_envs, list(self.env_fns[env_slice]))
+        target = self._worker_target
+        if self.worker_cpus is not None:
+            target = partial(_run_on_cpus, self.worker_cpus[index], target)
+        parent_pipe, child_pipe = ctx.Pipe()
+        with clear_mpi_env_vars():
+            process = ctx.Process(target=target,
+                name='Worker<{0}>-{1}'.format(type(self).__name__, index),
+                args=(env_slice.start, CloudpickleWrapper(env_fn), child_pipe,
+                parent_pipe, shared_memory, self.error_queue))
+            process.daemon = self._daemon
+            process.start()
+        child_pipe.close()
+        self.parent_pipes[index] = parent_pipe
+        self.processes[index] = process
 
     def seed(self, seeds=None):
         self._assert_is_running()
@@ -132,10 +300,15 @@ class AsyncVectorEnv(VectorEnv):
                 'for a pending call to `{0}` to complete.'.format(
                 self._state.value), self._state.value)
 
-        for pipe, seed in zip(self.parent_pipes, seeds):
-            pipe.send(('seed', seed))
-        _, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
-        self._raise_if_errors(successes)
+        self._seeds = list(seeds)
+        for index, env_slice in enumerate(self.worker_slices):
+            self._send(index, ('seed', seeds[env_slice]))
+        _, successes = zip(*[self._recv(index) for index in range(self.num_workers)])
+        if self.restart_workers:
+            # restarted workers are seeded from `self._seeds`
+            self._restart_failed_workers(range(self.num_workers), successes)
+        else:
+            self._raise_if_errors(successes)
 
     def reset_async(self):
         self._assert_is_running()
@@ -144,8 +317,13 @@ class AsyncVectorEnv(VectorEnv):
                 'for a pending call to `{0}` to complete'.format(
                 self._state.value), self._state.value)
 
-        for pipe in self.parent_pipes:
-            pipe.send(('reset', None))
+        workers = np.arange(self.num_workers)
+        if self.transport == 'flags':
+            self._signal(_COMMAND_RESET, workers)
+        else:
+            for pipe in self.parent_pipes:
+                pipe.send(('reset', None))
+        self._waiting[workers] = True
         self._state = AsyncState.WAITING_RESET
 
     def reset_wait(self, timeout=None):
@@ -166,38 +344,89 @@ class AsyncVectorEnv(VectorEnv):
             raise NoAsyncCallError('Calling `reset_wait` without any prior '
                 'call to `reset_async`.', AsyncState.WAITING_RESET.value)
 
-        if not self._poll(timeout):
+        if self._poll(timeout) is None:
+            self._waiting[:] = False
             self._state = AsyncState.DEFAULT
             raise mp.TimeoutError('The call to `reset_wait` has timed out after '
-                '{0} second{1}.'.format(timeout, 's' if timeout > 1 else ''))
-
-        results, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
-        self._raise_if_errors(successes)
+                '{0} second{1}.'.format(timeout,
+                's' if (timeout is None) or (timeout > 1) else ''))
+
+        self._waiting[:] = False
+        workers = range(self.num_workers)
+        if self.transport == 'flags':
+            successes = [_SUCCESSES[status] for status in self._statuses]
+            results = [None for _ in workers]
+        else:
+            results, successes = map(list, zip(*[self._recv(worker, 'reset')
+                for worker in workers]))
+        if self.restart_workers:
+            for worker, observations in self._restart_failed_workers(workers,
+                    successes).items():
+                results[worker] = observations
+        else:
+            self._raise_if_errors(successes)
         self._state = AsyncState.DEFAULT
 
         if not self.shared_memory:
-            concatenate(results, self.observations, self.single_observation_space)
+            concatenate([observation for observations in results
+                for observation in observations], self.observations,
+                self.single_observation_space)
 
-        return deepcopy(self.observations) if self.copy else self.observations
+        return self._copy_observations()
 
-    def step_async(self, actions):
+    def step_async(self, actions, indices=None):
         """
         Parameters
         ----------
         actions : iterable of samples from `action_space`
             List of actions.
+
+        indices : iterable of int, optional
+            Indices of the environments to step, with `actions` in the same
+            order. The environments of a worker are stepped together, so the
+            indices must cover whole workers (see `envs_per_worker`), none of
+            which may still be stepping. Environments can be stepped this way
+            while others are still stepping, typically those returned by
+            `step_wait` with `min_ready`. If `None`, all the environments are
+            stepped.
         """
         self._assert_is_running()
-        if self._state != AsyncState.DEFAULT:
-            raise AlreadyPendingCallError('Calling `step_async` while waiting '
-                'for a pending call to `{0}` to complete.'.format(
-                self._state.value), self._state.value)
-
-        for pipe, action in zip(self.parent_pipes, actions):
-            pipe.send(('step', action))
+        if indices is None:
+            if self._state != AsyncState.DEFAULT:
+                raise AlreadyPendingCallError('Calling `step_async` while waiting '
+                    'for a pending call to `{0}` to complete.'.format(
+                    self._state.value), self._state.value)
+            workers = np.arange(self.num_workers)
+        else:
+            if self._state == AsyncState.WAITING_RESET:
+                raise AlreadyPendingCallError('Calling `step_async` while waiting '
+                    'for a pending call to `{0}` to complete.'.format(
+                    self._state.value), self._state.value)
+            indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+            workers = self._workers_of(indices)
+            if np.any(self._waiting[workers]):
+                raise AlreadyPendingCallError('Calling `step_async` on environments '
+                    'whose workers are still stepping.', AsyncState.WAITING_STEP.value)
+
+        if self.shared_memory and not self._single_env_workers:
+            self._write_actions(actions, indices)
+            if self.transport == 'flags':
+                self._signal(_COMMAND_STEP, workers)
+            else:
+                for worker in workers:
+                    self.parent_pipes[worker].send(('step', None))
+        else:
+            actions = list(actions)
+            if indices is not None:
+                # the actions of each worker, in the order of its environments
+                actions_of = dict(zip(indices.tolist(), actions))
+                actions = [actions_of.get(index) for index in range(self.num_envs)]
+            for worker in workers:
+                self._send(worker, ('step', actions[self.worker_slices[worker]]))
+        self._waiting[workers] = True
         self._state = AsyncState.WAITING_STEP
 
-    def step_wait(self, timeout=None):
+    def step_wait(self, timeout=None, min_ready=None):
         """
         Parameters
         ----------
@@ -205,6 +434,15 @@ class AsyncVectorEnv(VectorEnv):
             Number of seconds before the call to `step_wait` times out. If
             `None`, the call to `step_wait` never times out.
 
+        min_ready : int, optional
+            If not `None`, return as soon as at least `min_ready` of the
+            environments being stepped are done, without waiting for the
+            others, and return the results of the environments that are done
+            along with their indices. New actions can be sent to these
+            environments with `step_async(actions, indices)` while the others
+            are still stepping. If `None`, wait for all the environments, which
+            must all have been stepped.
+
         Returns
         -------
         observations : sample from `observation_space`
@@ -218,28 +456,122 @@ class AsyncVectorEnv(VectorEnv):
 
         infos : list of dict
             A list of auxiliary diagnostic information.
+
+        indices : `np.ndarray` instance (dtype `np.int64`)
+            Only returned if `min_ready` is not `None`. The indices of the
+            environments whose results are returned, in the order of the batch.
+            The observations are always copied in this case.
         """
         self._assert_is_running()
         if self._state != AsyncState.WAITING_STEP:
             raise NoAsyncCallError('Calling `step_wait` without any prior call '
                 'to `step_async`.', AsyncState.WAITING_STEP.value)
+        if (min_ready is None) and not np.all(self._waiting):
+            raise NoAsyncCallError('Calling `step_wait` without `min_ready` while '
+                'only some of the environments are stepping.', AsyncState.WAITING_STEP.value)
 
-        if not self._poll(timeout):
+        workers = self._poll(timeout, min_ready)
+        if workers is None:
+            self._waiting[:] = False
             self._state = AsyncState.DEFAULT
             raise mp.TimeoutError('The call to `step_wait` has timed out after '
-                '{0} second{1}.'.format(timeout, 's' if timeout > 1 else ''))
-
-        results, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
-        self._raise_if_errors(successes)
-        self._state = AsyncState.DEFAULT
+                '{0} second{1}.'.format(timeout,
+                's' if (timeout is None) or (timeout > 1) else ''))
+
+        self._waiting[workers] = False
+        if self.transport == 'flags':
+            successes = [_SUCCESSES[status] for status in self._statuses[workers]]
+            # only the workers with some non-empty infos send them
+            results = [(None, None, None, self.parent_pipes[worker].recv()
+                if self._statuses[worker] == _STATUS_INFOS else None) for worker in workers]
+        else:
+            results, successes = map(list, zip(*[self._recv(worker, 'step')
+                for worker in workers]))
+        if not np.any(self._waiting):
+            self._state = AsyncState.DEFAULT
+        if self.restart_workers:
+            # the environments of a restarted worker end their episode
+            for worker, observations in self._restart_failed_workers(workers,
+                    successes).items():
+                env_slice = self.worker_slices[worker]
+                num_envs = env_slice.stop - env_slice.start
+                results[list(workers).index(worker)] = (observations, [0.]*num_envs,
+                    [True]*num_envs, [{'worker_restarted': True} for _ in range(num_envs)])
+                if self.shared_memory:
+                    self._rewards[env_slice], self._dones[env_slice] = 0., True
+        else:
+            self._raise_if_errors(successes)
         observations_list, rewards, dones, infos = zip(*results)
+        # workers with only empty infos send `None` instead of the list
+        infos = [info for worker, block in zip(workers, infos)
+            for info in (block if block is not None else
+            [{} for _ in range(self.worker_slices[worker].stop
+                - self.worker_slices[worker].start)])]
+
+        if min_ready is not None:
+            indices = np.concatenate([np.arange(self.worker_slices[worker].start,
+                self.worker_slices[worker].stop) for worker in workers])
+            if self.shared_memory:
+                observations = index_batch(self.observations,
+                    self.single_observation_space, indices)
+                rewards, dones = self._rewards[indices], self._dones[indices]
+            else:
+                observations = create_empty_array(self.single_observation_space,
+                    n=len(indices), fn=np.empty)
+                concatenate([observation for block in observations_list
+                    for observation in block], observations,
+                    self.single_observation_space)
+                rewards, dones = [[item for block in blocks for item in block]
+                    for blocks in (rewards, dones)]
+                rewards, dones = np.array(rewards), np.array(dones, dtype=np.bool_)
+            return observations, rewards, dones, tuple(infos), indices
 
-        if not self.shared_memory:
-            concatenate(observations_list, self.observations,
+        if self.shared_memory:
+            rewards, dones = np.copy(self._rewards), np.copy(self._dones)
+        else:
+            concatenate([observation for observations in observations_list
+                for observation in observations], self.observations,
                 self.single_observation_space)
-
-        return (deepcopy(self.observations) if self.copy else self.observations,
-                np.array(rewards), np.array(dones, dtype=np.bool_), infos)
+            rewards, dones = [[item for block in blocks for item in block]
+                for blocks in (rewards, dones)]
+            rewards, dones = np.array(rewards), np.array(dones, dtype=np.bool_)
+
+        return (self._copy_observations(),
+                rewards, dones, tuple(infos))
+
+    def _copy_observations(self):
+        if not self.copy:
+            return self.observations
+        out = None if self._observation_copies is None else next(self._observation_copies)
+        return copy_batch(self.observations, self.single_observation_space, out=out)
+
+    def _write_actions(self, actions, indices=None):
+        if indices is not None:
+            for index, action in zip(indices, actions):
+                write_to_shared_memory(index, action, self._action_buffer,
+                    self.single_action_space)
+        elif isinstance(self.single_action_space, _BaseGymSpaces) \
+                and isinstance(actions, np.ndarray):
+            np.copyto(self._actions, actions.reshape(self._actions.shape),
+                casting='unsafe')
+        else:
+            concatenate(list(actions), self._actions, self.single_action_space)
+
+    def _workers_of(self, indices):
+        """Returns the workers running the environments `indices`, which must
+        be all the environments of these workers"""
+        if np.any(indices < 0) or np.any(indices >= self.num_envs):
+            raise ValueError('The indices `{0}` are not all in [0, {1}).'.format(
+                indices.tolist(), self.num_envs))
+        workers = np.unique(indices // self.envs_per_worker)
+        expected = np.concatenate([np.arange(self.worker_slices[worker].start,
+            self.worker_slices[worker].stop) for worker in workers]) \
+            if len(workers) else indices
+        if (len(indices) != len(expected)) or np.any(np.sort(indices) != expected):
+            raise ValueError('The indices `{0}` do not cover all the environments '
+                'of their workers, which run {1} environments each.'.format(
+                indices.tolist(), self.envs_per_worker))
+        return workers
 
     def close_extras(self, timeout=None, terminate=False):
         """
@@ -256,7 +588,11 @@ class AsyncVectorEnv(VectorEnv):
         """
         timeout = 0 if terminate else timeout
         try:
-            if self._state != AsyncState.DEFAULT:
+            if self._state == AsyncState.WAITING_STEP:
+                logger.warn('Calling `close` while waiting for a pending '
+                    'call to `step` to complete.')
+                self.step_wait(timeout, min_ready=self.num_envs)
+            elif self._state != AsyncState.DEFAULT:
                 logger.warn('Calling `close` while waiting for a pending '
                     'call to `{0}` to complete.'.format(self._state.value))
                 function = getattr(self, '{0}_wait'.format(self._state.value))
@@ -269,9 +605,9 @@ class AsyncVectorEnv(VectorEnv):
                 if process.is_alive():
                     process.terminate()
         else:
-            for pipe in self.parent_pipes:
+            for index, pipe in enumerate(self.parent_pipes):
                 if (pipe is not None) and (not pipe.closed):
-                    pipe.send(('close', None))
+                    self._send(index, ('close', None))
             for pipe in self.parent_pipes:
                 if (pipe is not None) and (not pipe.closed):
                     pipe.recv()
@@ -282,24 +618,90 @@ class AsyncVectorEnv(VectorEnv):
         for process in self.processes:
             process.join()
 
-    def _poll(self, timeout=None):
+    def _send(self, index, message):
+        if self._single_env_workers and message[0] in ('seed', 'step'):
+            # the seed or the action of the only environment of the worker
+            message = (message[0], message[1][0])
+        self.parent_pipes[index].send(message)
+        if self.transport == 'flags':
+            # tells the worker to read its next command from the pipe
+            self._commands[index] = _COMMAND_PIPE
+            self._work_ready[index].release()
+
+    def _signal(self, command, workers):
+        self._commands[workers] = command
+        self._statuses[workers] = _STATUS_PENDING
+        for worker in workers:
+            self._work_ready[worker].release()
+
+    def _poll(self, timeout=None, min_ready=None):
+        """Waits for the workers that are running a command to complete it.
+
+        Returns the indices of the workers that are done, once they run at
+        least `min_ready` environments (all of them if `None`), or `None` if
+        they were not done within `timeout` seconds or a worker has shut down.
+        """
         self._assert_is_running()
-        if timeout is None:
-            return True
-        end_time = time.time() + timeout
-        delta = None
-        for pipe in self.parent_pipes:
-            delta = max(end_time - time.time(), 0)
-            if pipe is None:
-                return False
-            if pipe.closed or (not pipe.poll(delta)):
-                return False
-        return True
-
-    def _check_observation_spaces(self):
+        waiting = np.flatnonzero(self._waiting)
+        sizes = np.array([self.worker_slices[worker].stop
+            - self.worker_slices[worker].start for worker in waiting], dtype=np.int64)
+        min_ready = sizes.sum() if min_ready is None else min(min_ready, sizes.sum())
+        if any(self.parent_pipes[worker] is None for worker in waiting):
+            return None
+        end_time = None if timeout is None else time.time() + timeout
+        delta = lambda: None if end_time is None else max(end_time - time.time(), 0)
+
+        if self.transport == 'flags':
+            # each worker releases `_work_done` after setting its status
+            ready, num_acquired = np.zeros(len(waiting), dtype=np.bool_), 0
+            while sizes[ready].sum() < min_ready:
+                if _acquire(self._work_done, self.spin_wait, self._supervised(delta())):
+                    num_acquired += 1
+                else:
+                    if self.restart_workers:
+                        self._find_crashed_workers(waiting)
+                    if (end_time is not None) and (time.time() >= end_time):
+                        return None
+                ready = self._statuses[waiting] != _STATUS_PENDING
+            # crashed workers do not release `_work_done`
+            num_released = np.count_nonzero(self._statuses[waiting[ready]] != _STATUS_CRASHED)
+            for _ in range(num_released - num_acquired):
+                self._work_done.acquire()
+            return waiting[ready]
+
+        if (timeout is None) and (min_ready == sizes.sum()):
+            return waiting
+        pipes = dict((self.parent_pipes[worker], worker) for worker in waiting)
+        ready = []
+        while sizes[np.isin(waiting, ready)].sum() < min_ready:
+            if any(pipe.closed for pipe in pipes):
+                return None
+            pipes_ready = wait(list(pipes), delta())
+            if not pipes_ready:
+                return None
+            ready.extend(pipes.pop(pipe) for pipe in pipes_ready)
+        return np.sort(np.array(ready, dtype=np.int64))
+
+    def _supervised(self, timeout):
+        """Shortens blocking waits to look for crashed workers regularly"""
+        if not self.restart_workers:
+            return timeout
+        return _SUPERVISION_INTERVAL if timeout is None else min(timeout,
+            _SUPERVISION_INTERVAL)
+
+    def _find_crashed_workers(self, workers):
+        for worker in workers:
+            if (self._statuses[worker] == _STATUS_PENDING) \
+                    and not self.processes[worker].is_alive():
+                self._statuses[worker] = _STATUS_CRASHED
+
+    def _check_observation_spaces(self, strict=False):
         self._assert_is_running()
-        for pipe in self.parent_pipes:
-            pipe.send(('_check_observation_space', self.single_observation_space))
+        # the workers compare the fingerprint of their spaces unless `strict`
+        space = self.single_observation_space if strict \
+            else space_fingerprint(self.single_observation_space)
+        for index in range(self.num_workers):
+            self._send(index, ('_check_observation_space', space))
         same_spaces, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
         self._raise_if_errors(successes)
         if not all(same_spaces):
@@ -313,14 +715,84 @@ class AsyncVectorEnv(VectorEnv):
             raise ClosedEnvironmentError('Trying to operate on `{0}`, after a '
                 'call to `close()`.'.format(type(self).__name__))
 
+    def _recv(self, worker, command=None):
+        try:
+            result, success = self.parent_pipes[worker].recv()
+        except (EOFError, OSError):
+            if not self.restart_workers:
+                raise
+            # the worker has died without reporting an error
+            return None, None
+        if self._single_env_workers and success:
+            result = self._from_single_env(worker, command, result)
+        return result, success
+
+    def _from_single_env(self, worker, command, result):
+        """Converts the result of `command` from a custom worker into the
+        lists of results of a block of environments"""
+        if command == 'reset':
+            return [result]
+        if command == 'step':
+            observation, reward, done, info = result
+            if self.shared_memory:
+                self._rewards[worker], self._dones[worker] = reward, done
+            return [observation], [reward], [done], [info]
+        return result
+
+    def _restart_failed_workers(self, workers, successes):
+        """Restarts the workers that failed, where `successes` is `False` for
+        the workers that reported an error, and `None` for the workers that
+        died. Returns the observations of the restarted workers after their
+        reset (`None` with shared memory), by worker."""
+        for _ in range(sum(success is False for success in successes)):
+            index, exctype, value = self.error_queue.get()
+            logger.warn('Received the following error from Worker-{0}: '
+                '{1}: {2}'.format(index // self.envs_per_worker, exctype.__name__, value))
+        restarted = {}
+        for worker, success in zip(workers, successes):
+            if success is None:
+                logger.warn('Worker-{0} has died (exit code {1}).'.format(worker,
+                    self.processes[worker].exitcode))
+            if not success:
+                logger.warn('Restarting Worker-{0}.'.format(worker))
+                restarted[worker] = self._restart_worker(worker)
+        return restarted
+
+    def _restart_worker(self, worker):
+        """Replaces the process of `worker` by a new one, running new
+        environments from `env_fns`, then seeds and resets them"""
+        process = self.processes[worker]
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        self.parent_pipes[worker].close()
+        self._start_worker(worker)
+        self.worker_restarts[worker] += 1
+
+        # the seeds of the new environments are derived from the last seeds,
+        # so that runs with the same seeds and failures are reproducible
+        env_slice = self.worker_slices[worker]
+        seeds = [None if seed is None else seeding.create_seed('{0}/{1}'.format(
+            seed, self.worker_restarts[worker]), max_bytes=4)
+            for seed in self._seeds[env_slice]]
+        for command, data in [('seed', seeds), ('reset', None)]:
+            self._send(worker, (command, data))
+            result, success = self.parent_pipes[worker].recv()
+            if not success:
+                self._raise_if_errors([success])
+        if self._single_env_workers:
+            result = self._from_single_env(worker, 'reset', result)
+        return result
+
     def _raise_if_errors(self, successes):
         if all(successes):
             return
 
-        num_errors = self.num_envs - sum(successes)
+        num_errors = len(successes) - sum(successes)
         assert num_errors > 0
         for _ in range(num_errors):
             index, exctype, value = self.error_queue.get()
+            index = index // self.envs_per_worker
             logger.error('Received the following error from Worker-{0}: '
                 '{1}: {2}'.format(index, exctype.__name__, value))
             logger.error('Shutting down Worker-{0}.'.format(index))
@@ -331,29 +803,73 @@ class AsyncVectorEnv(VectorEnv):
         raise exctype(value)
 
 
+_COMMAND_PIPE, _COMMAND_RESET, _COMMAND_STEP = 0, 1, 2
+_STATUS_PENDING, _STATUS_ERROR, _STATUS_OK, _STATUS_INFOS = -1, 0, 1, 2
+# status of a worker found dead while running a command
+_STATUS_CRASHED = -2
+_SUCCESSES = {_STATUS_OK: True, _STATUS_INFOS: True, _STATUS_ERROR: False,
+    _STATUS_CRASHED: None}
+# seconds between the checks for crashed workers with `restart_workers`
+_SUPERVISION_INTERVAL = 0.1
+
+
+def _acquire(semaphore, spin_wait, timeout=None):
+    """Acquires `semaphore`, polling it for `spin_wait` seconds before blocking.
+    Returns `False` if it could not be acquired within `timeout` seconds."""
+    if spin_wait > 0:
+        end_time = time.time() + spin_wait
+        while time.time() < end_time:
+            if semaphore.acquire(False):
+                return True
+    return semaphore.acquire(True, timeout)
+
+
+def _is_same_space(space_or_fingerprint, space):
+    if isinstance(space_or_fingerprint, str):
+        return space_or_fingerprint == space_fingerprint(space)
+    return space_or_fingerprint == space
+
+
+def _run_on_cpus(cpus, target, *args):
+    os.sched_setaffinity(0, cpus)
+    return target(*args)
+
+
+def _make_envs(env_fns):
+    return [env_fn() for env_fn in env_fns]
+
+
 def _worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
     assert shared_memory is None
-    env = env_fn()
+    envs = env_fn()
     parent_pipe.close()
     try:
         while True:
             command, data = pipe.recv()
             if command == 'reset':
-                observation = env.reset()
-                pipe.send((observation, True))
+                observations = [env.reset() for env in envs]
+                pipe.send((observations, True))
             elif command == 'step':
-                observation, reward, done, info = env.step(data)
-                if done:
-                    observation = env.reset()
-                pipe.send(((observation, reward, done, info), True))
+                observations, rewards, dones, infos = [], [], [], []
+                for env, action in zip(envs, data):
+                    observation, reward, done, info = env.step(action)
+                    if done:
+                        observation = env.reset()
+                    observations.append(observation)
+                    rewards.append(reward)
+                    dones.append(done)
+                    infos.append(info)
+                pipe.send(((observations, rewards, dones, infos), True))
             elif command == 'seed':
-                env.seed(data)
+                for env, seed in zip(envs, data):
+                    env.seed(seed)
                 pipe.send((None, True))
             elif command == 'close':
                 pipe.send((None, True))
                 break
             elif command == '_check_observation_space':
-                pipe.send((data == env.observation_space, True))
+                pipe.send((all(_is_same_space(data, env.observation_space)
+                    for env in envs), True))
             else:
                 raise RuntimeError('Received unknown command `{0}`. Must '
                     'be one of {`reset`, `step`, `seed`, `close`, '
@@ -362,43 +878,85 @@ def _worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
         error_queue.put((index,) + sys.exc_info()[:2])
         pipe.send((None, False))
     finally:
-        env.close()
+        for env in envs:
+            env.close()
 
 
 def _worker_shared_memory(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
     assert shared_memory is not None
-    env = env_fn()
-    observation_space = env.observation_space
+    envs = env_fn()
+    observation_space = envs[0].observation_space
+    action_space = envs[0].action_space
+    obs_buffer, action_buffer, reward_buffer, done_buffer, flags = shared_memory
+    # the number of environments (-1) is given by the size of the buffers
+    actions = read_from_shared_memory(action_buffer, action_space, n=-1)
+    rewards = np.frombuffer(reward_buffer.get_obj(), dtype=np.float64)
+    dones = np.frombuffer(done_buffer.get_obj(), dtype=np.bool_)
+    if flags is not None:
+        worker, commands, statuses, work_ready, work_done, spin_wait = flags
+        commands = np.frombuffer(commands, dtype=np.intc)
+        statuses = np.frombuffer(statuses, dtype=np.intc)
     parent_pipe.close()
+    from_pipe = True
     try:
         while True:
-            command, data = pipe.recv()
+            if flags is not None:
+                _acquire(work_ready, spin_wait)
+                from_pipe = (commands[worker] == _COMMAND_PIPE)
+            if from_pipe:
+                command, data = pipe.recv()
+            else:
+                command = 'reset' if commands[worker] == _COMMAND_RESET else 'step'
             if command == 'reset':
-                observation = env.reset()
-                write_to_shared_memory(index, observation, shared_memory,
-                                       observation_space)
-                pipe.send((None, True))
-            elif command == 'step':
-                observation, reward, done, info = env.step(data)
-                if done:
+                for i, env in enumerate(envs):
                     observation = env.reset()
-                write_to_shared_memory(index, observation, shared_memory,
-                                       observation_space)
-                pipe.send(((None, reward, done, info), True))
+                    write_to_shared_memory(index + i, observation, obs_buffer,
+                                           observation_space)
+                if from_pipe:
+                    pipe.send((None, True))
+                else:
+                    statuses[worker] = _STATUS_OK
+                    work_done.release()
+            elif command == 'step':
+                infos = []
+                for i, env in enumerate(envs):
+                    action = index_batch(actions, action_space, index + i)
+                    observation, reward, done, info = env.step(action)
+                    if done:
+                        observation = env.reset()
+                    write_to_shared_memory(index + i, observation, obs_buffer,
+                                           observation_space)
+                    rewards[index + i] = reward
+                    dones[index + i] = done
+                    infos.append(info)
+                if from_pipe:
+                    pipe.send(((None, None, None, infos if any(infos) else None), True))
+                else:
+                    if any(infos):
+                        pipe.send(infos)
+                    statuses[worker] = _STATUS_INFOS if any(infos) else _STATUS_OK
+                    work_done.release()
             elif command == 'seed':
-                env.seed(data)
+                for env, seed in zip(envs, data):
+                    env.seed(seed)
                 pipe.send((None, True))
             elif command == 'close':
                 pipe.send((None, True))
                 break
             elif command == '_check_observation_space':
-                pipe.send((data == observation_space, True))
+                pipe.send((all(_is_same_space(data, env.observation_space)
+                    for env in envs), True))
             else:
                 raise RuntimeError('Received unknown command `{0}`. Must '
                     'be one of {`reset`, `step`, `seed`, `close`, '
                     '`_check_observation_space`}.'.format(command))
     except (KeyboardInterrupt, Exception):
         error_queue.put((index,) + sys.exc_info()[:2])
-        pipe.send((None, False))
+        if from_pipe:
+            pipe.send((None, False))
+        else:
+            statuses[worker] = _STATUS_ERROR
+            work_done.release()
     finally:
-        env.close()
+        for env in envs:
+            env.close()
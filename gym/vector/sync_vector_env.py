@@ -1,9 +1,9 @@
 import numpy as np
-from copy import deepcopy
+from itertools import cycle
 
 from gym import logger
 from gym.vector.vector_env import VectorEnv
-from gym.vector.utils import concatenate, create_empty_array
+from gym.vector.utils import concatenate, create_empty_array, copy_batch
 
 __all__ = ['SyncVectorEnv']
 
@@ -27,9 +27,20 @@ class SyncVectorEnv(VectorEnv):
     copy : bool (default: `True`)
         If `True`, then the `reset` and `step` methods return a copy of the
         observations.
+
+    num_copies : int, optional
+        If not `None`, and `copy` is `True`, then the observations are copied
+        in turn into `num_copies` batches allocated once, instead of into new
+        arrays at every call. A batch returned by `reset` or `step` is then
+        overwritten `num_copies` calls later, so `num_copies` must be at least
+        the number of batches held at once (e.g. 2 to keep the observation and
+        the next observation of a transition).
     """
     def __init__(self, env_fns, observation_space=None, action_space=None,
-                 copy=True):
+                 copy=True, num_copies=None):
+        if num_copies is not None and num_copies < 1:
+            raise ValueError('`num_copies` must be a positive integer, '
+                'got {0}.'.format(num_copies))
         self.env_fns = env_fns
         self.envs = [env_fn() for env_fn in env_fns]
         self.copy = copy
@@ -43,6 +54,9 @@ class SyncVectorEnv(VectorEnv):
         self._check_observation_spaces()
         self.observations = create_empty_array(self.single_observation_space,
             n=self.num_envs, fn=np.zeros)
+        self._observation_copies = None if num_copies is None else \
+            cycle([create_empty_array(self.single_observation_space,
+            n=self.num_envs, fn=np.empty) for _ in range(num_copies)])
         self._rewards = np.zeros((self.num_envs,), dtype=np.float64)
         self._dones = np.zeros((self.num_envs,), dtype=np.bool_)
         self._actions = None
@@ -65,7 +79,7 @@ class SyncVectorEnv(VectorEnv):
             observations.append(observation)
         concatenate(observations, self.observations, self.single_observation_space)
 
-        return np.copy(self.observations) if self.copy else self.observations
+        return self._copy_observations()
 
     def step_async(self, actions):
         self._actions = actions
@@ -80,9 +94,15 @@ class SyncVectorEnv(VectorEnv):
             infos.append(info)
         concatenate(observations, self.observations, self.single_observation_space)
 
-        return (deepcopy(self.observations) if self.copy else self.observations,
+        return (self._copy_observations(),
             np.copy(self._rewards), np.copy(self._dones), infos)
 
+    def _copy_observations(self):
+        if not self.copy:
+            return self.observations
+        out = None if self._observation_copies is None else next(self._observation_copies)
+        return copy_batch(self.observations, self.single_observation_space, out=out)
+
     def close_extras(self, **kwargs):
         [env.close() for env in self.envs]
 
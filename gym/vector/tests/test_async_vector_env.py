@@ -1,3 +1,5 @@
+import os
+import sys
 import pytest
 import numpy as np
 
@@ -5,9 +7,12 @@ from multiprocessing import TimeoutError
 from gym.spaces import Box
 from gym.error import (AlreadyPendingCallError, NoAsyncCallError,
                        ClosedEnvironmentError)
-from gym.vector.tests.utils import make_env, make_slow_env
+from gym.vector.tests.utils import (make_env, make_slow_env, make_flaky_env,
+                                    make_scalar_action_env)
 
 from gym.vector.async_vector_env import AsyncVectorEnv
+from gym.vector.utils import write_to_shared_memory
+from gym.vector.sync_vector_env import SyncVectorEnv
 
 @pytest.mark.parametrize('shared_memory', [True, False])
 def test_create_async_vector_env(shared_memory):
@@ -101,7 +106,7 @@ def test_reset_timeout_async_vector_env(shared_memory):
         try:
             env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
             env.reset_async()
-            observations = env.reset_wait(timeout=0.1)
+            env.reset_wait(timeout=0.1)
         finally:
             env.close(terminate=True)
 
@@ -112,7 +117,7 @@ def test_step_timeout_async_vector_env(shared_memory):
     with pytest.raises(TimeoutError):
         try:
             env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
-            observations = env.reset()
+            env.reset()
             env.step_async([0.1, 0.1, 0.3, 0.1])
             observations, rewards, dones, _ = env.step_wait(timeout=0.1)
         finally:
@@ -126,7 +131,7 @@ def test_reset_out_of_order_async_vector_env(shared_memory):
     with pytest.raises(NoAsyncCallError):
         try:
             env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
-            observations = env.reset_wait()
+            env.reset_wait()
         except NoAsyncCallError as exception:
             assert exception.name == 'reset'
             raise
@@ -137,7 +142,7 @@ def test_reset_out_of_order_async_vector_env(shared_memory):
         try:
             env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
             actions = env.action_space.sample()
-            observations = env.reset()
+            env.reset()
             env.step_async(actions)
             env.reset_async()
         except NoAsyncCallError as exception:
@@ -155,7 +160,7 @@ def test_step_out_of_order_async_vector_env(shared_memory):
         try:
             env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
             actions = env.action_space.sample()
-            observations = env.reset()
+            env.reset()
             observations, rewards, dones, infos = env.step_wait()
         except AlreadyPendingCallError as exception:
             assert exception.name == 'step'
@@ -182,7 +187,7 @@ def test_already_closed_async_vector_env(shared_memory):
     with pytest.raises(ClosedEnvironmentError):
         env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
         env.close()
-        observations = env.reset()
+        env.reset()
 
 
 @pytest.mark.parametrize('shared_memory', [True, False])
@@ -194,3 +199,377 @@ def test_check_observations_async_vector_env(shared_memory):
     with pytest.raises(RuntimeError):
         env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
         env.close(terminate=True)
+
+
+@pytest.mark.parametrize('shared_memory', [True, False])
+def test_scalar_box_actions_async_vector_env(shared_memory):
+    env_fns = [make_scalar_action_env() for _ in range(2)]
+    try:
+        env = AsyncVectorEnv(env_fns, shared_memory=shared_memory)
+        env.reset()
+        actions = np.array([-0.5, 0.5], dtype=np.float32)
+        # the environments assert that their actions are in their action space
+        observations, _, _, _ = env.step(actions)
+    finally:
+        env.close()
+
+    assert np.all(observations == actions)
+
+
+@pytest.mark.parametrize('shared_memory', [True, False])
+@pytest.mark.parametrize('envs_per_worker', [1, 3, 8])
+def test_envs_per_worker_async_vector_env(shared_memory, envs_per_worker):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(8)]
+    try:
+        env = AsyncVectorEnv(env_fns, shared_memory=shared_memory,
+                             envs_per_worker=envs_per_worker)
+        sync_env = SyncVectorEnv(env_fns)
+        assert env.num_workers == len(env.processes) == -(-8 // envs_per_worker)
+
+        env.seed(0)
+        sync_env.seed(0)
+        assert np.all(env.reset() == sync_env.reset())
+        for _ in range(20):
+            actions = env.action_space.sample()
+            observations, rewards, dones, infos = env.step(actions)
+            sync_observations, sync_rewards, sync_dones, _ = sync_env.step(actions)
+            assert np.all(observations == sync_observations)
+            assert np.all(rewards == sync_rewards)
+            assert np.all(dones == sync_dones)
+            assert len(infos) == 8
+    finally:
+        env.close()
+        sync_env.close()
+
+
+def test_invalid_envs_per_worker_async_vector_env():
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(2)]
+    with pytest.raises(ValueError):
+        AsyncVectorEnv(env_fns, envs_per_worker=0)
+
+
+def _custom_worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
+    # a worker written against the single environment protocol, which tags
+    # the infos of its steps
+    env = env_fn()
+    parent_pipe.close()
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == 'reset':
+                observation = env.reset()
+                if shared_memory is not None:
+                    write_to_shared_memory(index, observation, shared_memory,
+                                           env.observation_space)
+                    observation = None
+                pipe.send((observation, True))
+            elif command == 'step':
+                observation, reward, done, info = env.step(data)
+                if done:
+                    observation = env.reset()
+                if shared_memory is not None:
+                    write_to_shared_memory(index, observation, shared_memory,
+                                           env.observation_space)
+                    observation = None
+                pipe.send(((observation, reward, done, dict(info, custom=index)), True))
+            elif command == 'seed':
+                env.seed(data)
+                pipe.send((None, True))
+            elif command == 'close':
+                pipe.send((None, True))
+                break
+            elif command == '_check_observation_space':
+                pipe.send((data == env.observation_space, True))
+    except (KeyboardInterrupt, Exception):
+        error_queue.put((index,) + sys.exc_info()[:2])
+        pipe.send((None, False))
+    finally:
+        env.close()
+
+
+@pytest.mark.parametrize('shared_memory', [True, False])
+def test_custom_worker_async_vector_env(shared_memory):
+    env_fns = [make_env('Pendulum-v0', i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, shared_memory=shared_memory,
+                             worker=_custom_worker)
+        sync_env = SyncVectorEnv(env_fns)
+        env.seed(0)
+        sync_env.seed(0)
+        assert np.allclose(env.reset(), sync_env.reset())
+        for _ in range(5):
+            actions = env.action_space.sample()
+            observations, rewards, dones, infos = env.step(actions)
+            sync_observations, sync_rewards, sync_dones, _ = sync_env.step(actions)
+            assert np.allclose(observations, sync_observations)
+            assert np.allclose(rewards, sync_rewards)
+            assert np.all(dones == sync_dones)
+            assert [info['custom'] for info in infos] == [0, 1, 2, 3]
+    finally:
+        env.close()
+        sync_env.close()
+
+
+@pytest.mark.parametrize('kwargs', [{'envs_per_worker': 2}, {'transport': 'flags'}])
+def test_invalid_custom_worker_async_vector_env(kwargs):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(2)]
+    with pytest.raises(ValueError):
+        AsyncVectorEnv(env_fns, worker=_custom_worker, **kwargs)
+
+
+@pytest.mark.parametrize('envs_per_worker', [1, 2])
+def test_shared_actions_async_vector_env(envs_per_worker):
+    env_fns = [make_env('Pendulum-v0', i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, shared_memory=True,
+                             envs_per_worker=envs_per_worker)
+        sync_env = SyncVectorEnv(env_fns)
+        env.seed(0)
+        sync_env.seed(0)
+        env.reset()
+        sync_env.reset()
+        num_dones = 0
+        for step in range(205):
+            actions = np.random.uniform(-2., 2., size=(4, 1)).astype(np.float32)
+            # batched arrays and lists of actions are both written to shared memory
+            observations, rewards, dones, infos = env.step(
+                actions if step % 2 else list(actions))
+            sync_observations, sync_rewards, sync_dones, sync_infos = \
+                sync_env.step(actions)
+            assert np.allclose(observations, sync_observations)
+            assert np.all(rewards == sync_rewards)
+            assert np.all(dones == sync_dones)
+            assert list(infos) == list(sync_infos)
+            num_dones += np.count_nonzero(dones)
+        # episodes of Pendulum-v0 are truncated after 200 steps, with an info
+        assert num_dones == 4
+    finally:
+        env.close()
+        sync_env.close()
+
+
+@pytest.mark.parametrize('envs_per_worker', [1, 3])
+@pytest.mark.parametrize('spin_wait', [0., 1e-4])
+def test_flags_transport_async_vector_env(envs_per_worker, spin_wait):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(8)]
+    try:
+        env = AsyncVectorEnv(env_fns, transport='flags', spin_wait=spin_wait,
+                             envs_per_worker=envs_per_worker)
+        sync_env = SyncVectorEnv(env_fns)
+        env.seed(0)
+        sync_env.seed(0)
+        assert np.all(env.reset() == sync_env.reset())
+        for _ in range(20):
+            actions = env.action_space.sample()
+            observations, rewards, dones, infos = env.step(actions)
+            sync_observations, sync_rewards, sync_dones, _ = sync_env.step(actions)
+            assert np.all(observations == sync_observations)
+            assert np.all(rewards == sync_rewards)
+            assert np.all(dones == sync_dones)
+            assert infos == tuple({} for _ in range(8))
+    finally:
+        env.close()
+        sync_env.close()
+
+
+def test_flags_transport_infos_async_vector_env():
+    # FrozenLake returns the probability of its transition in its infos
+    env_fns = [make_env('FrozenLake-v0', i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, transport='flags', envs_per_worker=2)
+        env.reset()
+        for _ in range(5):
+            _, _, _, infos = env.step(env.action_space.sample())
+            assert len(infos) == 4
+            assert all('prob' in info for info in infos)
+    finally:
+        env.close()
+
+
+def test_flags_transport_timeout_async_vector_env():
+    env_fns = [make_slow_env(0., i) for i in range(4)]
+    with pytest.raises(TimeoutError):
+        try:
+            env = AsyncVectorEnv(env_fns, transport='flags')
+            env.reset()
+            env.step_async([0.1, 0.1, 0.3, 0.1])
+            observations, rewards, dones, _ = env.step_wait(timeout=0.1)
+        finally:
+            env.close(terminate=True)
+
+
+def test_invalid_transport_async_vector_env():
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(2)]
+    with pytest.raises(ValueError):
+        AsyncVectorEnv(env_fns, transport='socket')
+    with pytest.raises(ValueError):
+        AsyncVectorEnv(env_fns, transport='flags', shared_memory=False)
+
+
+@pytest.mark.filterwarnings('ignore::UserWarning')
+def test_flags_transport_error_async_vector_env():
+    env_fns = [make_env('CartPole-v1', i) for i in range(4)]
+    env = AsyncVectorEnv(env_fns, transport='flags', envs_per_worker=2)
+    try:
+        env.reset()
+        with pytest.raises(AssertionError):
+            env.step([0, 5, 0, 0])
+    finally:
+        env.close()
+    assert all(not process.is_alive() for process in env.processes)
+
+
+@pytest.mark.parametrize('shared_memory,transport',
+    [(False, 'pipe'), (True, 'pipe'), (True, 'flags')])
+@pytest.mark.parametrize('envs_per_worker', [1, 2])
+def test_min_ready_async_vector_env(shared_memory, transport, envs_per_worker):
+    # the environments of the second worker step 10 times slower
+    durations = np.array([0.01, 0.01, 0.1, 0.1], dtype=np.float32)
+    if envs_per_worker == 1:
+        durations = np.array([0.01, 0.1, 0.01, 0.01], dtype=np.float32)
+    env_fns = [make_slow_env(0., i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, shared_memory=shared_memory,
+                             transport=transport, envs_per_worker=envs_per_worker)
+        env.reset()
+        slow = np.flatnonzero(durations == 0.1)
+        fast = np.flatnonzero(durations == 0.01)
+
+        env.step_async(durations.tolist())
+        observations, rewards, dones, infos, indices = env.step_wait(min_ready=2)
+        assert len(indices) >= 2 and set(indices) <= set(fast)
+        assert observations.shape == (len(indices),) + env.single_observation_space.shape
+        assert rewards.shape == dones.shape == (len(indices),)
+        assert len(infos) == len(indices)
+
+        # the environments that are done are stepped again, the others are still stepping
+        with pytest.raises(AlreadyPendingCallError):
+            env.step_async(durations[slow].tolist(), indices=slow)
+        env.step_async(durations[indices].tolist(), indices=indices)
+        stepped = []
+        while len(stepped) < 4:
+            stepped.extend(env.step_wait(min_ready=1)[-1].tolist())
+        assert sorted(stepped) == [0, 1, 2, 3]
+
+        # without `min_ready`, all the environments are stepped together
+        observations, rewards, dones, infos = env.step(durations.tolist())
+        assert observations.shape == env.observation_space.shape
+    finally:
+        env.close()
+
+
+def test_min_ready_invalid_indices_async_vector_env():
+    env_fns = [make_slow_env(0., i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, envs_per_worker=2)
+        env.reset()
+        with pytest.raises(ValueError):
+            env.step_async([0.], indices=[1])
+        with pytest.raises(ValueError):
+            env.step_async([0., 0.], indices=[4, 5])
+        env.step_async([0., 0.], indices=[3, 2])
+        with pytest.raises(NoAsyncCallError):
+            env.step_wait()
+        _, _, _, _, indices = env.step_wait(min_ready=2)
+        assert np.array_equal(indices, [2, 3])
+    finally:
+        env.close()
+
+
+@pytest.mark.parametrize('shared_memory', [True, False])
+def test_num_copies_async_vector_env(shared_memory):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, shared_memory=shared_memory, num_copies=2)
+        first = env.reset()
+        second, _, _, _ = env.step(env.action_space.sample())
+        expected = np.copy(second)
+        third, _, _, _ = env.step(env.action_space.sample())
+        # the batches are written in turn into the same two arrays
+        assert third is first
+        assert np.all(second == expected)
+        assert not np.shares_memory(third, env.observations)
+    finally:
+        env.close()
+
+
+@pytest.mark.parametrize('strict_space_check', [True, False])
+def test_strict_space_check_async_vector_env(strict_space_check):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(4)]
+    env = AsyncVectorEnv(env_fns, strict_space_check=strict_space_check)
+    env.close()
+
+    # the bounds differ from the observation space of CubeCrash-v0
+    observation_space = Box(low=0, high=254, shape=(40, 32, 3), dtype=np.uint8)
+    with pytest.raises(RuntimeError):
+        env = AsyncVectorEnv(env_fns, observation_space=observation_space,
+                             strict_space_check=strict_space_check)
+        env.close(terminate=True)
+
+
+@pytest.mark.filterwarnings('ignore::UserWarning')
+@pytest.mark.parametrize('shared_memory,transport',
+    [(False, 'pipe'), (True, 'pipe'), (True, 'flags')])
+@pytest.mark.parametrize('crash', [False, True])
+def test_restart_workers_async_vector_env(shared_memory, transport, crash):
+    # the second environment fails at its third step
+    env_fns = [make_flaky_env(None) for _ in range(4)]
+    env_fns[1] = make_flaky_env(3, crash=crash)
+
+    def run():
+        env = AsyncVectorEnv(env_fns, shared_memory=shared_memory,
+            transport=transport, envs_per_worker=2, restart_workers=True)
+        try:
+            env.seed(0)
+            batches = [env.reset()]
+            for step in range(1, 6):
+                observations, rewards, dones, infos = env.step([0, 1, 0, 1])
+                batches.append(observations)
+                if step == 3:
+                    # the environments of the restarted worker end their episode
+                    assert np.array_equal(dones, [True, True, False, False])
+                    assert np.array_equal(rewards, [0., 0., 1., 1.])
+                    assert [info.get('worker_restarted', False) for info in infos] == \
+                        [True, True, False, False]
+                else:
+                    assert not np.any(dones) and np.all(rewards == 1.)
+            assert np.array_equal(env.worker_restarts, [1, 0])
+            return batches
+        finally:
+            env.close()
+
+    # the restarted environments are seeded deterministically
+    batches = run()
+    assert np.all(np.array(batches) == np.array(run()))
+    assert not np.allclose(batches[3][:2], batches[0][:2])
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'),
+    reason='Setting the CPU affinity is only available on Linux.')
+@pytest.mark.parametrize('cpu_affinity', ['auto', [0, [0]]])
+def test_cpu_affinity_async_vector_env(cpu_affinity):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(4)]
+    try:
+        env = AsyncVectorEnv(env_fns, envs_per_worker=2, cpu_affinity=cpu_affinity)
+        available = os.sched_getaffinity(0)
+        for process, cpus in zip(env.processes, env.worker_cpus):
+            assert os.sched_getaffinity(process.pid) == set(cpus)
+            assert set(cpus) <= available
+        env.reset()
+        env.step(env.action_space.sample())
+    finally:
+        env.close()
+
+    with pytest.raises(ValueError):
+        AsyncVectorEnv(env_fns, envs_per_worker=2, cpu_affinity=[0])
+
+
+def test_worker_cpus():
+    from gym.vector.utils.misc import parse_cpu_list
+    from gym.vector.utils import worker_cpus
+    assert parse_cpu_list('0-3,8,10-11\n') == [0, 1, 2, 3, 8, 10, 11]
+    assert worker_cpus(2, cpus=[5]) == [[5], [5]]
+    cpus = worker_cpus(6, cpus=[0, 1, 2])
+    # consecutive workers share a CPU when there are more workers than CPUs
+    assert sorted(set(cpu for worker in cpus for cpu in worker)) == [0, 1, 2]
+    assert all(len(worker) == 1 for worker in cpus)
@@ -3,11 +3,12 @@ import numpy as np
 
 from collections import OrderedDict
 
-from gym.spaces import Tuple, Dict
+from gym.spaces import Tuple, Dict, Discrete
 from gym.vector.utils.spaces import _BaseGymSpaces
 from gym.vector.tests.utils import spaces
 
-from gym.vector.utils.numpy_utils import concatenate, create_empty_array
+from gym.vector.utils.numpy_utils import (concatenate, create_empty_array,
+    index_batch, copy_batch)
 
 @pytest.mark.parametrize('space', spaces,
     ids=[space.__class__.__name__ for space in spaces])
@@ -139,3 +140,64 @@ def test_create_empty_array_none_shape_ones(space):
 
     array = create_empty_array(space, n=None, fn=np.ones)
     assert_nested_type(array, space)
+
+
+def assert_nested_equal(lhs, rhs):
+    if isinstance(rhs, tuple):
+        assert isinstance(lhs, tuple)
+        for lhs_i, rhs_i in zip(lhs, rhs):
+            assert_nested_equal(lhs_i, rhs_i)
+    elif isinstance(rhs, (dict, OrderedDict)):
+        assert isinstance(lhs, OrderedDict)
+        for key in rhs.keys():
+            assert_nested_equal(lhs[key], rhs[key])
+    else:
+        assert np.all(lhs == rhs)
+        if isinstance(lhs, np.ndarray):
+            assert lhs.shape == np.shape(rhs)
+
+
+@pytest.mark.parametrize('space', spaces,
+    ids=[space.__class__.__name__ for space in spaces])
+def test_index_batch(space):
+    samples = [space.sample() for _ in range(8)]
+    batch = create_empty_array(space, n=8)
+    concatenate(samples, batch, space)
+
+    for i in range(8):
+        item = index_batch(batch, space, i)
+        if isinstance(space, Discrete):
+            assert isinstance(item, int) and space.contains(item)
+        assert_nested_equal(item, samples[i])
+
+    subset = [5, 2, 7]
+    expected = create_empty_array(space, n=3)
+    concatenate([samples[i] for i in subset], expected, space)
+    assert_nested_equal(index_batch(batch, space, subset), expected)
+
+
+@pytest.mark.parametrize('space', spaces,
+    ids=[space.__class__.__name__ for space in spaces])
+def test_copy_batch(space):
+    def assert_nested_no_shared_memory(lhs, rhs):
+        if isinstance(rhs, tuple):
+            for lhs_i, rhs_i in zip(lhs, rhs):
+                assert_nested_no_shared_memory(lhs_i, rhs_i)
+        elif isinstance(rhs, (dict, OrderedDict)):
+            for key in rhs.keys():
+                assert_nested_no_shared_memory(lhs[key], rhs[key])
+        else:
+            assert not np.shares_memory(lhs, rhs)
+
+    batch = create_empty_array(space, n=8)
+    concatenate([space.sample() for _ in range(8)], batch, space)
+
+    copy = copy_batch(batch, space)
+    assert_nested_equal(copy, batch)
+    assert_nested_no_shared_memory(copy, batch)
+
+    out = create_empty_array(space, n=8, fn=np.empty)
+    copy = copy_batch(batch, space, out=out)
+    assert_nested_equal(copy, batch)
+    assert_nested_equal(out, batch)
+    assert_nested_no_shared_memory(copy, batch)
@@ -1,10 +1,11 @@
 import pytest
 import numpy as np
 
-from gym.spaces import Box, MultiDiscrete, Tuple, Dict
+from gym.spaces import Box, Discrete, MultiDiscrete, Tuple, Dict
 from gym.vector.tests.utils import spaces
 
-from gym.vector.utils.spaces import _BaseGymSpaces, batch_space
+from gym.vector.utils.spaces import _BaseGymSpaces, batch_space, space_fingerprint
+from gym.vector.utils.spaces import BatchedBox, BatchedDiscrete, BatchedTuple, BatchedDict
 
 expected_batch_spaces_4 = [
     Box(low=-1., high=1., shape=(4,), dtype=np.float64),
@@ -37,3 +38,75 @@ expected_batch_spaces_4 = [
 def test_batch_space(space, expected_batch_space_4):
     batch_space_4 = batch_space(space, n=4)
     assert batch_space_4 == expected_batch_space_4
+
+
+def test_space_fingerprint():
+    fingerprints = [space_fingerprint(space) for space in spaces]
+    # the fingerprints of equal spaces are equal, and the spaces are all different
+    assert fingerprints == [space_fingerprint(space) for space in spaces]
+    assert len(set(fingerprints)) == len(spaces)
+
+    space = Box(low=0, high=255, shape=(32, 32, 3), dtype=np.uint8)
+    high = np.full((32, 32, 3), 255, dtype=np.uint8)
+    assert space_fingerprint(space) == space_fingerprint(Box(low=0, high=high, dtype=np.uint8))
+    high[0, 0, 0] = 254
+    assert space_fingerprint(space) != space_fingerprint(Box(low=0, high=high, dtype=np.uint8))
+    assert space_fingerprint(space) != space_fingerprint(Box(low=0, high=255,
+        shape=(32, 32, 3), dtype=np.float32))
+    assert space_fingerprint(Dict({'a': space})) != space_fingerprint(Dict({'b': space}))
+    assert space_fingerprint(Tuple((space,))) != space_fingerprint(space)
+
+
+@pytest.mark.parametrize('space', spaces, ids=[space.__class__.__name__ for space in spaces])
+def test_batch_space_sample_contains_batch(space):
+    batch_space_4 = batch_space(space, n=4)
+    batch_space_4.seed(0)
+    sample = batch_space_4.sample()
+    assert sample in batch_space_4
+    valid = batch_space_4.contains_batch(sample)
+    assert isinstance(valid, np.ndarray) and valid.dtype == np.bool_
+    assert valid.shape == (4,) and np.all(valid)
+
+
+def test_batched_box():
+    space = Box(low=0, high=255, shape=(32, 32, 3), dtype=np.uint8)
+    batch_space_4 = batch_space(space, n=4)
+    assert isinstance(batch_space_4, BatchedBox)
+    assert batch_space_4.single_space is space
+    # the bounds are not copied for every environment
+    assert batch_space_4.low.strides[0] == 0 and batch_space_4.high.strides[0] == 0
+
+    # same samples as the tiled `Box`
+    tiled_space = Box(low=0, high=255, shape=(4, 32, 32, 3), dtype=np.uint8)
+    tiled_space.seed(0)
+    batch_space_4.seed(0)
+    assert np.array_equal(batch_space_4.sample(), tiled_space.sample())
+
+    sample = batch_space_4.sample().astype(np.int64)
+    sample[2, 0, 0, 0] = 256
+    assert np.array_equal(batch_space_4.contains_batch(sample), [True, True, False, True])
+    assert not np.any(batch_space_4.contains_batch(sample[:3]))
+
+
+def test_batched_discrete():
+    batch_space_4 = batch_space(Discrete(3), n=4)
+    assert isinstance(batch_space_4, BatchedDiscrete)
+    assert np.array_equal(batch_space_4.contains_batch(np.array([0, 2, 3, -1])),
+        [True, True, False, False])
+    assert not np.any(batch_space_4.contains_batch(np.zeros((4,), dtype=np.float32)))
+
+
+def test_batched_dict():
+    space = Dict({
+        'position': Discrete(23),
+        'velocity': Tuple((Discrete(7), Box(low=0., high=1., shape=(2,), dtype=np.float32)))
+    })
+    batch_space_4 = batch_space(space, n=4)
+    assert isinstance(batch_space_4, BatchedDict)
+    assert isinstance(batch_space_4['velocity'], BatchedTuple)
+
+    sample = batch_space_4.sample()
+    sample['position'][1] = 23
+    sample['velocity'][1][3, 0] = 2.
+    assert np.array_equal(batch_space_4.contains_batch(sample), [True, False, True, False])
+    assert not np.any(batch_space_4.contains_batch({'position': sample['position']}))
@@ -70,3 +70,22 @@ def test_check_observations_sync_vector_env():
     with pytest.raises(RuntimeError):
         env = SyncVectorEnv(env_fns)
         env.close()
+
+
+def test_num_copies_sync_vector_env():
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(4)]
+    try:
+        env = SyncVectorEnv(env_fns, num_copies=2)
+        first = env.reset()
+        second, _, _, _ = env.step(env.action_space.sample())
+        expected = np.copy(second)
+        third, _, _, _ = env.step(env.action_space.sample())
+        # the batches are written in turn into the same two arrays
+        assert third is first
+        assert np.all(second == expected)
+        assert not np.shares_memory(third, env.observations)
+    finally:
+        env.close()
+
+    with pytest.raises(ValueError):
+        SyncVectorEnv(env_fns, num_copies=0)
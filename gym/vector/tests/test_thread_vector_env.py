@@ -0,0 +1,112 @@
+import pytest
+import numpy as np
+
+from multiprocessing import TimeoutError
+from gym.spaces import Box
+from gym.error import AlreadyPendingCallError, NoAsyncCallError
+from gym.vector.tests.utils import make_env, make_slow_env, make_flaky_env
+
+import gym
+from gym.vector.sync_vector_env import SyncVectorEnv
+from gym.vector.thread_vector_env import ThreadVectorEnv
+
+@pytest.mark.parametrize('num_threads', [1, 3, 8])
+def test_thread_vector_env_equal(num_threads):
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(8)]
+    try:
+        env = ThreadVectorEnv(env_fns, num_threads=num_threads)
+        sync_env = SyncVectorEnv(env_fns)
+        assert env.num_threads == num_threads
+        assert sum(len(block) for block in env.blocks) == 8
+
+        env.seed(0)
+        sync_env.seed(0)
+        observations = env.reset()
+        assert isinstance(env.observation_space, Box)
+        assert observations.shape == env.observation_space.shape
+        assert np.all(observations == sync_env.reset())
+
+        for _ in range(50):
+            actions = env.action_space.sample()
+            observations, rewards, dones, infos = env.step(actions)
+            sync_observations, sync_rewards, sync_dones, _ = sync_env.step(actions)
+            assert np.all(observations == sync_observations)
+            assert np.all(rewards == sync_rewards)
+            assert np.all(dones == sync_dones)
+            assert len(infos) == 8
+    finally:
+        env.close()
+        sync_env.close()
+
+
+def test_step_timeout_thread_vector_env():
+    env_fns = [make_slow_env(0., i) for i in range(4)]
+    try:
+        env = ThreadVectorEnv(env_fns, num_threads=4)
+        env.reset()
+        env.step_async([0.1, 0.1, 0.3, 0.1])
+        with pytest.raises(TimeoutError):
+            env.step_wait(timeout=0.1)
+        # the environments keep running, and can still be waited for
+        env.step_wait()
+    finally:
+        env.close()
+
+
+def test_already_pending_call_thread_vector_env():
+    env_fns = [make_slow_env(0., i) for i in range(4)]
+    try:
+        env = ThreadVectorEnv(env_fns, num_threads=2)
+        env.reset_async()
+        with pytest.raises(AlreadyPendingCallError):
+            env.step_async([0., 0., 0., 0.])
+        with pytest.raises(AlreadyPendingCallError):
+            env.reset_async()
+        env.reset_wait()
+
+        env.step_async([0., 0., 0., 0.])
+        with pytest.raises(AlreadyPendingCallError):
+            env.reset_async()
+        # a pending step cannot be taken for a reset
+        with pytest.raises(NoAsyncCallError):
+            env.reset_wait()
+        env.step_wait()
+    finally:
+        env.close()
+
+
+def test_no_async_call_thread_vector_env():
+    env_fns = [make_slow_env(0., i) for i in range(4)]
+    try:
+        env = ThreadVectorEnv(env_fns, num_threads=2)
+        with pytest.raises(NoAsyncCallError):
+            env.reset_wait()
+        env.reset()
+        with pytest.raises(NoAsyncCallError):
+            env.step_wait()
+    finally:
+        env.close()
+
+
+def test_error_thread_vector_env():
+    env_fns = [make_flaky_env(None) for _ in range(4)]
+    env_fns[2] = make_flaky_env(2)
+    try:
+        env = ThreadVectorEnv(env_fns, num_threads=2)
+        env.reset()
+        env.step([0, 0, 0, 0])
+        with pytest.raises(RuntimeError):
+            env.step([0, 0, 0, 0])
+    finally:
+        env.close()
+
+
+def test_make_thread_vector_env():
+    env = gym.vector.make('CartPole-v1', num_envs=4, mode='thread')
+    try:
+        assert isinstance(env, ThreadVectorEnv)
+        assert env.reset().shape == (4, 4)
+    finally:
+        env.close()
+    with pytest.raises(ValueError):
+        gym.vector.make('CartPole-v1', num_envs=4, mode='fork')
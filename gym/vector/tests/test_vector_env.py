@@ -41,3 +41,19 @@ def test_vector_env_equal(shared_memory):
     finally:
         async_env.close()
         sync_env.close()
+
+
+def test_batched_action_space():
+    env_fns = [make_env('CubeCrash-v0', i) for i in range(4)]
+    env = SyncVectorEnv(env_fns)
+    try:
+        assert env.batched_action_space.single_space == env.single_action_space
+        env.reset()
+        env.batched_action_space.seed(0)
+        actions = env.batched_action_space.sample()
+        assert actions.shape == (4,)
+        assert np.all(env.batched_action_space.contains_batch(actions))
+        assert tuple(actions) in env.action_space
+        env.step(actions)
+    finally:
+        env.close()
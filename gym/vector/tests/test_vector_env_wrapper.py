@@ -18,3 +18,11 @@ def test_vector_env_wrapper_inheritance():
     wrapped.reset()
     assert wrapped.counter == 1
     
+
+
+def test_vector_env_wrapper_spaces():
+    env = make('CartPole-v1', num_envs=2, asynchronous=False)
+    wrapped = VectorEnvWrapper(env)
+    assert wrapped.action_space is env.action_space
+    assert wrapped.observation_space is env.observation_space
+    assert wrapped.single_action_space is env.single_action_space
@@ -1,8 +1,10 @@
 import numpy as np
 import gym
+import os
 import time
 
 from gym.spaces import Box, Discrete, MultiDiscrete, MultiBinary, Tuple, Dict
+from gym.utils import seeding
 
 spaces = [
     Box(low=np.array(-1.), high=np.array(1.), dtype=np.float64),
@@ -42,7 +44,7 @@ class UnittestSlowEnv(gym.Env):
         return self.observation_space.sample()
 
     def step(self, action):
-        time.sleep(action)
+        time.sleep(float(action))
         observation = self.observation_space.sample()
         reward, done = 0., False
         return observation, reward, done, {}
@@ -60,3 +62,53 @@ def make_slow_env(slow_reset, seed):
         env.seed(seed)
         return env
     return _make
+
+class UnittestFlakyEnv(gym.Env):
+    """Raises an error (or kills its process if `crash`) at its step `fail_step`"""
+    def __init__(self, fail_step=None, crash=False):
+        super(UnittestFlakyEnv, self).__init__()
+        self.fail_step = fail_step
+        self.crash = crash
+        self.observation_space = Box(low=0., high=1., shape=(2,), dtype=np.float64)
+        self.action_space = Discrete(2)
+        self.num_steps = 0
+        self.seed()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def reset(self):
+        return self.np_random.uniform(size=(2,))
+
+    def step(self, action):
+        self.num_steps += 1
+        if self.num_steps == self.fail_step:
+            if self.crash:
+                os._exit(1)
+            raise RuntimeError('Failure at step {0}.'.format(self.num_steps))
+        return self.np_random.uniform(size=(2,)), 1., False, {}
+
+def make_flaky_env(fail_step, crash=False):
+    def _make():
+        return UnittestFlakyEnv(fail_step=fail_step, crash=crash)
+    return _make
+
+class UnittestScalarActionEnv(gym.Env):
+    """Checks that its actions, from a `Box` of shape `()`, are in its action space"""
+    def __init__(self):
+        super(UnittestScalarActionEnv, self).__init__()
+        self.observation_space = Box(low=-1., high=1., shape=(), dtype=np.float32)
+        self.action_space = Box(low=-1., high=1., shape=(), dtype=np.float32)
+
+    def reset(self):
+        return np.zeros((), dtype=np.float32)
+
+    def step(self, action):
+        assert self.action_space.contains(action)
+        return np.asarray(action, dtype=np.float32), 0., False, {}
+
+def make_scalar_action_env():
+    def _make():
+        return UnittestScalarActionEnv()
+    return _make
@@ -0,0 +1,184 @@
+import numpy as np
+import multiprocessing as mp
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from gym.error import AlreadyPendingCallError, NoAsyncCallError
+from gym.vector.async_vector_env import AsyncState
+from gym.vector.sync_vector_env import SyncVectorEnv
+from gym.spaces import Tuple, Dict
+from gym.vector.utils import _BaseGymSpaces
+
+__all__ = ['ThreadVectorEnv']
+
+
+class ThreadVectorEnv(SyncVectorEnv):
+    """Vectorized environment that runs multiple environments in parallel on
+    a pool of threads, in the main process.
+
+    The environments are split into one contiguous block per thread, and each
+    thread writes the observations, rewards and dones of its environments
+    directly into the batches. Environments only run in parallel while they
+    release the GIL, e.g. in large NumPy or BLAS operations, or while waiting
+    on I/O (a simulator or a device behind a socket), but the environments
+    are neither pickled nor duplicated, and there is no process to start.
+    Environments whose step runs Python code, including solvers calling back
+    into a Python function, hold the GIL and run one at a time.
+
+    Parameters
+    ----------
+    env_fns : iterable of callable
+        Functions that create the environments.
+
+    observation_space : `gym.spaces.Space` instance, optional
+        Observation space of a single environment. If `None`, then the
+        observation space of the first environment is taken.
+
+    action_space : `gym.spaces.Space` instance, optional
+        Action space of a single environment. If `None`, then the action space
+        of the first environment is taken.
+
+    copy : bool (default: `True`)
+        If `True`, then the `reset` and `step` methods return a copy of the
+        observations.
+
+    num_copies : int, optional
+        See `SyncVectorEnv`.
+
+    num_threads : int, optional
+        Number of threads running the environments. If `None`, the number of
+        CPUs (at most one thread per environment).
+    """
+    def __init__(self, env_fns, observation_space=None, action_space=None,
+                 copy=True, num_copies=None, num_threads=None):
+        super(ThreadVectorEnv, self).__init__(env_fns,
+            observation_space=observation_space, action_space=action_space,
+            copy=copy, num_copies=num_copies)
+        if num_threads is None:
+            num_threads = os.cpu_count() or 1
+        if num_threads < 1:
+            raise ValueError('`num_threads` must be a positive integer, '
+                'got {0}.'.format(num_threads))
+        self.num_threads = min(num_threads, self.num_envs)
+        self.blocks = np.array_split(np.arange(self.num_envs), self.num_threads)
+        self._infos = [{} for _ in range(self.num_envs)]
+        self._executor = ThreadPoolExecutor(max_workers=self.num_threads)
+        self._futures = None
+        self._state = AsyncState.DEFAULT
+
+    def reset_async(self):
+        if self._state != AsyncState.DEFAULT:
+            raise AlreadyPendingCallError('Calling `reset_async` while waiting '
+                'for a pending call to `{0}` to complete'.format(
+                self._state.value), self._state.value)
+        self._futures = [self._executor.submit(self._reset_block, block)
+            for block in self.blocks]
+        self._state = AsyncState.WAITING_RESET
+
+    def reset_wait(self, timeout=None):
+        """
+        Parameters
+        ----------
+        timeout : int or float, optional
+            Number of seconds before the call to `reset_wait` times out. If
+            `None`, the call to `reset_wait` never times out.
+
+        Returns
+        -------
+        observations : sample from `observation_space`
+            A batch of observations from the vectorized environment.
+        """
+        if self._state != AsyncState.WAITING_RESET:
+            raise NoAsyncCallError('Calling `reset_wait` without any prior '
+                'call to `reset_async`.', AsyncState.WAITING_RESET.value)
+        self._wait(timeout, 'reset_wait')
+        return self._copy_observations()
+
+    def step_async(self, actions):
+        if self._state != AsyncState.DEFAULT:
+            raise AlreadyPendingCallError('Calling `step_async` while waiting '
+                'for a pending call to `{0}` to complete.'.format(
+                self._state.value), self._state.value)
+        actions = list(actions)
+        self._futures = [self._executor.submit(self._step_block, block,
+            [actions[index] for index in block]) for block in self.blocks]
+        self._state = AsyncState.WAITING_STEP
+
+    def step_wait(self, timeout=None):
+        """
+        Parameters
+        ----------
+        timeout : int or float, optional
+            Number of seconds before the call to `step_wait` times out. If
+            `None`, the call to `step_wait` never times out.
+
+        Returns
+        -------
+        observations : sample from `observation_space`
+            A batch of observations from the vectorized environment.
+
+        rewards : `np.ndarray` instance (dtype `np.float_`)
+            A vector of rewards from the vectorized environment.
+
+        dones : `np.ndarray` instance (dtype `np.bool_`)
+            A vector whose entries indicate whether the episode has ended.
+
+        infos : list of dict
+            A list of auxiliary diagnostic information.
+        """
+        if self._state != AsyncState.WAITING_STEP:
+            raise NoAsyncCallError('Calling `step_wait` without any prior call '
+                'to `step_async`.', AsyncState.WAITING_STEP.value)
+        self._wait(timeout, 'step_wait')
+        return (self._copy_observations(), np.copy(self._rewards),
+            np.copy(self._dones), list(self._infos))
+
+    def _reset_block(self, block):
+        for index in block:
+            self._dones[index] = False
+            _write_to_batch(index, self.envs[index].reset(), self.observations,
+                self.single_observation_space)
+
+    def _step_block(self, block, actions):
+        for index, action in zip(block, actions):
+            env = self.envs[index]
+            observation, self._rewards[index], self._dones[index], \
+                self._infos[index] = env.step(action)
+            if self._dones[index]:
+                observation = env.reset()
+            _write_to_batch(index, observation, self.observations,
+                self.single_observation_space)
+
+    def _wait(self, timeout=None, name='wait'):
+        """Waits for the pending blocks, and raises the first of their errors.
+        The call stays pending if it times out."""
+        if self._futures is None:
+            return
+        _, not_done = wait(self._futures, timeout=timeout)
+        if not_done:
+            raise mp.TimeoutError('The call to `{0}` has timed out after {1} '
+                'second{2}.'.format(name, timeout, 's' if timeout > 1 else ''))
+        futures, self._futures = self._futures, None
+        self._state = AsyncState.DEFAULT
+        for future in futures:
+            future.result()
+
+    def close_extras(self, **kwargs):
+        try:
+            self._wait()
+        finally:
+            self._executor.shutdown(wait=True)
+            super(ThreadVectorEnv, self).close_extras(**kwargs)
+
+
+def _write_to_batch(index, value, batch, space):
+    if isinstance(space, _BaseGymSpaces):
+        batch[index] = value
+    elif isinstance(space, Tuple):
+        for item, items, subspace in zip(value, batch, space.spaces):
+            _write_to_batch(index, item, items, subspace)
+    elif isinstance(space, Dict):
+        for key, subspace in space.spaces.items():
+            _write_to_batch(index, value[key], batch[key], subspace)
+    else:
+        raise NotImplementedError()
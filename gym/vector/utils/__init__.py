@@ -1,16 +1,26 @@
-from gym.vector.utils.misc import CloudpickleWrapper, clear_mpi_env_vars
-from gym.vector.utils.numpy_utils import concatenate, create_empty_array
+from gym.vector.utils.misc import CloudpickleWrapper, clear_mpi_env_vars, numa_nodes, worker_cpus
+from gym.vector.utils.numpy_utils import concatenate, create_empty_array, index_batch, copy_batch
 from gym.vector.utils.shared_memory import create_shared_memory, read_from_shared_memory, write_to_shared_memory
-from gym.vector.utils.spaces import _BaseGymSpaces, batch_space
+from gym.vector.utils.spaces import _BaseGymSpaces, batch_space, space_fingerprint
+from gym.vector.utils.spaces import BatchedBox, BatchedDiscrete, BatchedTuple, BatchedDict
 
 __all__ = [
     'CloudpickleWrapper',
     'clear_mpi_env_vars',
+    'numa_nodes',
+    'worker_cpus',
     'concatenate',
     'create_empty_array',
+    'index_batch',
+    'copy_batch',
     'create_shared_memory',
     'read_from_shared_memory',
     'write_to_shared_memory',
     '_BaseGymSpaces',
-    'batch_space'
+    'batch_space',
+    'space_fingerprint',
+    'BatchedBox',
+    'BatchedDiscrete',
+    'BatchedTuple',
+    'BatchedDict'
 ]
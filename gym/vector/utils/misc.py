@@ -1,7 +1,8 @@
 import contextlib
+import glob
 import os
 
-__all__ = ['CloudpickleWrapper', 'clear_mpi_env_vars']
+__all__ = ['CloudpickleWrapper', 'clear_mpi_env_vars', 'numa_nodes', 'worker_cpus']
 
 class CloudpickleWrapper(object):
     def __init__(self, fn):
@@ -38,3 +39,47 @@ def clear_mpi_env_vars():
         yield
     finally:
         os.environ.update(removed_environment)
+
+def parse_cpu_list(cpu_list):
+    """Parses a list of CPUs in the format of the Linux sysfs (e.g. `0-3,8`)"""
+    cpus = []
+    for part in cpu_list.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+def numa_nodes():
+    """
+    Returns the list of the CPUs of each NUMA node of the machine, read from
+    the Linux sysfs. Machines without NUMA information are a single node.
+    """
+    nodes = []
+    paths = glob.glob('/sys/devices/system/node/node[0-9]*/cpulist')
+    for path in sorted(paths, key=lambda path: int(path.split('/')[-2][4:])):
+        with open(path) as f:
+            cpus = parse_cpu_list(f.read())
+        if cpus:
+            nodes.append(cpus)
+    if not nodes:
+        nodes = [list(range(os.cpu_count() or 1))]
+    return nodes
+
+def worker_cpus(num_workers, cpus=None):
+    """
+    Spreads `num_workers` worker processes over `cpus` (by default, the CPUs
+    this process may run on), one CPU per worker. The CPUs are taken node by
+    node, so consecutive workers, which run consecutive environments and
+    write to consecutive parts of the shared buffers, are on the same NUMA
+    node. With more workers than CPUs, consecutive workers share a CPU.
+    """
+    if cpus is None:
+        cpus = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') \
+            else range(os.cpu_count() or 1)
+    cpus = set(cpus)
+    ordered = [cpu for node in numa_nodes() for cpu in node if cpu in cpus]
+    ordered += sorted(cpus.difference(ordered))
+    return [[ordered[(index * len(ordered)) // num_workers]]
+        for index in range(num_workers)]
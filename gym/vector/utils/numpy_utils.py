@@ -1,10 +1,10 @@
 import numpy as np
 
-from gym.spaces import Tuple, Dict
+from gym.spaces import Tuple, Dict, Discrete
 from gym.vector.utils.spaces import _BaseGymSpaces
 from collections import OrderedDict
 
-__all__ = ['concatenate', 'create_empty_array']
+__all__ = ['concatenate', 'create_empty_array', 'index_batch', 'copy_batch']
 
 def concatenate(items, out, space):
     """Concatenate multiple samples from space into a single object.
@@ -110,3 +110,122 @@ def create_empty_array_tuple(space, n=1, fn=np.zeros):
 def create_empty_array_dict(space, n=1, fn=np.zeros):
     return OrderedDict([(key, create_empty_array(subspace, n=n, fn=fn))
         for (key, subspace) in space.spaces.items()])
+
+
+def index_batch(batch, space, index):
+    """Copy the sample of a single environment, or the samples of some of the
+    environments, out of a batch.
+
+    Parameters
+    ----------
+    batch : tuple, dict, or `np.ndarray`
+        A batch of samples from `space`. This object is a (possibly nested)
+        numpy array.
+
+    space : `gym.spaces.Space` instance
+        Space of a single environment in the vectorized environment.
+
+    index : int, or sequence of int
+        Index of the environment (must be in `[0, num_envs)`), or indices of
+        several environments.
+
+    Returns
+    -------
+    item : sample from `space`
+        A copy of the sample, which does not share the memory of `batch`.
+        Samples of `Discrete` are returned as `int`, and samples of a `Box`
+        of shape `()` as 0-d arrays.
+        If `index` is a sequence, a copy of the batch of the samples of these
+        environments, in the order of `index`.
+
+    Example
+    -------
+    >>> from gym.spaces import Box
+    >>> space = Box(low=0, high=1, shape=(3,), dtype=np.float32)
+    >>> batch = np.arange(6, dtype=np.float32).reshape(2, 3)
+    >>> index_batch(batch, space, 1)
+    array([3., 4., 5.], dtype=float32)
+    >>> index_batch(batch, space, [1, 0])
+    array([[3., 4., 5.],
+           [0., 1., 2.]], dtype=float32)
+    """
+    if isinstance(space, _BaseGymSpaces):
+        return index_batch_base(batch, space, index)
+    elif isinstance(space, Tuple):
+        return index_batch_tuple(batch, space, index)
+    elif isinstance(space, Dict):
+        return index_batch_dict(batch, space, index)
+    else:
+        raise NotImplementedError()
+
+def index_batch_base(batch, space, index):
+    item = batch[index]
+    if not isinstance(item, np.ndarray):
+        # only `Discrete` samples are Python scalars, `Box` samples are arrays
+        return item.item() if isinstance(space, Discrete) else np.array(item)
+    # indexing with a sequence already makes a copy
+    return np.copy(item) if np.ndim(index) == 0 else item
+
+def index_batch_tuple(batch, space, index):
+    return tuple(index_batch(items, subspace, index)
+        for (items, subspace) in zip(batch, space.spaces))
+
+def index_batch_dict(batch, space, index):
+    return OrderedDict([(key, index_batch(batch[key], subspace, index))
+        for (key, subspace) in space.spaces.items()])
+
+
+def copy_batch(batch, space, out=None):
+    """Copy a batch of samples, without the overhead of `copy.deepcopy`.
+
+    Parameters
+    ----------
+    batch : tuple, dict, or `np.ndarray`
+        A batch of samples from `space`. This object is a (possibly nested)
+        numpy array.
+
+    space : `gym.spaces.Space` instance
+        Space of a single environment in the vectorized environment.
+
+    out : tuple, dict, or `np.ndarray`, optional
+        A preallocated (possibly nested) numpy array with the structure of
+        `batch` (e.g. from `create_empty_array`), into which `batch` is copied.
+        If `None`, new arrays are allocated.
+
+    Returns
+    -------
+    out : tuple, dict, or `np.ndarray`
+        The copy of `batch`, which does not share the memory of `batch`.
+
+    Example
+    -------
+    >>> from gym.spaces import Box
+    >>> space = Box(low=0, high=1, shape=(3,), dtype=np.float32)
+    >>> batch = np.arange(6, dtype=np.float32).reshape(2, 3)
+    >>> out = create_empty_array(space, n=2, fn=np.empty)
+    >>> copy_batch(batch, space, out=out) is out
+    True
+    """
+    if isinstance(space, _BaseGymSpaces):
+        return copy_batch_base(batch, space, out=out)
+    elif isinstance(space, Tuple):
+        return copy_batch_tuple(batch, space, out=out)
+    elif isinstance(space, Dict):
+        return copy_batch_dict(batch, space, out=out)
+    else:
+        raise NotImplementedError()
+
+def copy_batch_base(batch, space, out=None):
+    if out is None:
+        return np.copy(batch)
+    np.copyto(out, batch)
+    return out
+
+def copy_batch_tuple(batch, space, out=None):
+    return tuple(copy_batch(items, subspace, out=None if out is None else out[i])
+        for (i, (items, subspace)) in enumerate(zip(batch, space.spaces)))
+
+def copy_batch_dict(batch, space, out=None):
+    return OrderedDict([(key, copy_batch(batch[key], subspace,
+        out=None if out is None else out[key]))
+        for (key, subspace) in space.spaces.items()])
@@ -1,10 +1,12 @@
+import hashlib
 import numpy as np
 from collections import OrderedDict
 
-from gym.spaces import Box, Discrete, MultiDiscrete, MultiBinary, Tuple, Dict
+from gym.spaces import Space, Box, Discrete, MultiDiscrete, MultiBinary, Tuple, Dict
 
 _BaseGymSpaces = (Box, Discrete, MultiDiscrete, MultiBinary)
-__all__ = ['_BaseGymSpaces', 'batch_space']
+__all__ = ['_BaseGymSpaces', 'batch_space', 'space_fingerprint',
+    'BatchedBox', 'BatchedDiscrete', 'BatchedTuple', 'BatchedDict']
 
 def batch_space(space, n=1):
     """Create a (batched) space, containing multiple copies of a single space.
@@ -32,6 +34,13 @@ def batch_space(space, n=1):
     ... 'velocity': Box(low=0, high=1, shape=(2,), dtype=np.float32)})
     >>> batch_space(space, n=5)
     Dict(position:Box(5, 3), velocity:Box(5, 2))
+
+    Notes
+    -----
+    The batched spaces are instances of `BatchedBox`, `BatchedDiscrete`,
+    `BatchedTuple` and `BatchedDict`, which are subclasses of the standard
+    spaces that sample a whole batch, and check it (`contains_batch`), with
+    one vectorized operation per subspace.
     """
     if isinstance(space, _BaseGymSpaces):
         return batch_space_base(space, n=n)
@@ -44,27 +53,218 @@ def batch_space(space, n=1):
 
 def batch_space_base(space, n=1):
     if isinstance(space, Box):
-        repeats = tuple([n] + [1] * space.low.ndim)
-        low, high = np.tile(space.low, repeats), np.tile(space.high, repeats)
-        return Box(low=low, high=high, dtype=space.dtype)
+        return BatchedBox(space, n=n)
 
     elif isinstance(space, Discrete):
-        return MultiDiscrete(np.full((n,), space.n, dtype=space.dtype))
+        return BatchedDiscrete(space, n=n)
 
     elif isinstance(space, MultiDiscrete):
-        repeats = tuple([n] + [1] * space.nvec.ndim)
-        high = np.tile(space.nvec, repeats) - 1
-        return Box(low=np.zeros_like(high), high=high, dtype=space.dtype)
+        high = space.nvec - 1
+        return BatchedBox(Box(low=np.zeros_like(high), high=high,
+            dtype=space.dtype), n=n)
 
     elif isinstance(space, MultiBinary):
-        return Box(low=0, high=1, shape=(n,) + space.shape, dtype=space.dtype)
+        return BatchedBox(Box(low=0, high=1, shape=space.shape,
+            dtype=space.dtype), n=n)
 
     else:
         raise NotImplementedError()
 
 def batch_space_tuple(space, n=1):
-    return Tuple(tuple(batch_space(subspace, n=n) for subspace in space.spaces))
+    return BatchedTuple(space, n=n)
 
 def batch_space_dict(space, n=1):
-    return Dict(OrderedDict([(key, batch_space(subspace, n=n))
-        for (key, subspace) in space.spaces.items()]))
+    return BatchedDict(space, n=n)
+
+
+class BatchedBox(Box):
+    """A batch of `n` samples of a `Box` space.
+
+    The bounds of the batch are read-only views of the bounds of `space`,
+    broadcast over the batch without copying them.
+
+    Parameters
+    ----------
+    space : `gym.spaces.Box` instance
+        Space of a single environment.
+
+    n : int
+        Number of environments in the batch.
+    """
+    def __init__(self, space, n=1):
+        self.single_space = space
+        self.batch_size = n
+        shape = (n,) + space.shape
+        # `Box.__init__` would cast, and so copy, the broadcast bounds
+        self.low = np.broadcast_to(space.low, shape)
+        self.high = np.broadcast_to(space.high, shape)
+        self.bounded_below = np.broadcast_to(space.bounded_below, shape)
+        self.bounded_above = np.broadcast_to(space.bounded_above, shape)
+        Space.__init__(self, shape, space.dtype)
+
+    def sample(self):
+        space = self.single_space
+        if not space.is_bounded():
+            return super(BatchedBox, self).sample()
+        # same samples as `Box.sample`, without indexing the bounds
+        high = space.high if self.dtype.kind == 'f' \
+            else space.high.astype('int64') + 1
+        sample = self.np_random.uniform(low=space.low, high=high,
+            size=self.shape)
+        if self.dtype.kind == 'i':
+            sample = np.floor(sample)
+        return sample.astype(self.dtype)
+
+    def contains_batch(self, x):
+        """Returns a boolean array, whose entries indicate whether each item
+        of the batch `x` is in the space of a single environment."""
+        x = np.asarray(x)
+        if x.shape != self.shape:
+            return np.zeros((self.batch_size,), dtype=np.bool_)
+        space = self.single_space
+        valid = (x >= space.low) & (x <= space.high)
+        return np.all(valid, axis=tuple(range(1, x.ndim)))
+
+
+class BatchedDiscrete(MultiDiscrete):
+    """A batch of `n` samples of a `Discrete` space.
+
+    Parameters
+    ----------
+    space : `gym.spaces.Discrete` instance
+        Space of a single environment.
+
+    n : int
+        Number of environments in the batch.
+    """
+    def __init__(self, space, n=1):
+        self.single_space = space
+        self.batch_size = n
+        super(BatchedDiscrete, self).__init__(np.full((n,), space.n,
+            dtype=space.dtype))
+
+    def sample(self):
+        return self.np_random.randint(self.single_space.n,
+            size=self.shape).astype(self.dtype)
+
+    def contains_batch(self, x):
+        """Returns a boolean array, whose entries indicate whether each item
+        of the batch `x` is in the space of a single environment."""
+        x = np.asarray(x)
+        if (x.shape != self.shape) or (x.dtype.kind not in 'iu'):
+            return np.zeros((self.batch_size,), dtype=np.bool_)
+        return (x >= 0) & (x < self.single_space.n)
+
+
+class BatchedTuple(Tuple):
+    """A batch of `n` samples of a `Tuple` space, which is the tuple of the
+    batches of its subspaces.
+
+    Parameters
+    ----------
+    space : `gym.spaces.Tuple` instance
+        Space of a single environment.
+
+    n : int
+        Number of environments in the batch.
+    """
+    def __init__(self, space, n=1):
+        self.single_space = space
+        self.batch_size = n
+        super(BatchedTuple, self).__init__(tuple(batch_space(subspace, n=n)
+            for subspace in space.spaces))
+
+    def contains_batch(self, x):
+        """Returns a boolean array, whose entries indicate whether each item
+        of the batch `x` is in the space of a single environment."""
+        valid = np.ones((self.batch_size,), dtype=np.bool_)
+        if not isinstance(x, (tuple, list)) or len(x) != len(self.spaces):
+            return ~valid
+        for subspace, items in zip(self.spaces, x):
+            valid &= subspace.contains_batch(items)
+        return valid
+
+
+class BatchedDict(Dict):
+    """A batch of `n` samples of a `Dict` space, which is the dictionary of
+    the batches of its subspaces.
+
+    Parameters
+    ----------
+    space : `gym.spaces.Dict` instance
+        Space of a single environment.
+
+    n : int
+        Number of environments in the batch.
+    """
+    def __init__(self, space, n=1):
+        self.single_space = space
+        self.batch_size = n
+        super(BatchedDict, self).__init__(OrderedDict([(key,
+            batch_space(subspace, n=n))
+            for (key, subspace) in space.spaces.items()]))
+
+    def contains_batch(self, x):
+        """Returns a boolean array, whose entries indicate whether each item
+        of the batch `x` is in the space of a single environment."""
+        valid = np.ones((self.batch_size,), dtype=np.bool_)
+        if not isinstance(x, dict) or len(x) != len(self.spaces):
+            return ~valid
+        for key, subspace in self.spaces.items():
+            if key not in x:
+                return ~valid
+            valid &= subspace.contains_batch(x[key])
+        return valid
+
+
+def space_fingerprint(space):
+    """Compute a compact fingerprint of a space, to check that two spaces are
+    the same without sending either of them.
+
+    Parameters
+    ----------
+    space : `gym.spaces.Space` instance
+        Space (e.g. the observation space) for a single environment in the
+        vectorized environment.
+
+    Returns
+    -------
+    fingerprint : str
+        Hash of the structure of `space` (the types of its subspaces, and the
+        keys of `Dict` spaces), of the shapes and dtypes of its samples, and of
+        its bounds. Spaces with the same fingerprint have exactly the same
+        bounds, unlike `Box.__eq__`, which compares them up to a tolerance.
+
+    Example
+    -------
+    >>> from gym.spaces import Box
+    >>> space = Box(low=0, high=255, shape=(84, 84, 3), dtype=np.uint8)
+    >>> space_fingerprint(space) == space_fingerprint(Box(low=0, high=255,
+    ...     shape=(84, 84, 3), dtype=np.uint8))
+    True
+    """
+    digest = hashlib.sha1()
+    _update_fingerprint(digest, space)
+    return digest.hexdigest()
+
+def _update_fingerprint(digest, space):
+    digest.update('{0}{1}{2}'.format(type(space).__name__, space.shape,
+        space.dtype).encode('utf-8'))
+    if isinstance(space, Box):
+        digest.update(np.ascontiguousarray(space.low).tobytes())
+        digest.update(np.ascontiguousarray(space.high).tobytes())
+    elif isinstance(space, Discrete):
+        digest.update(str(space.n).encode('utf-8'))
+    elif isinstance(space, MultiDiscrete):
+        digest.update(np.ascontiguousarray(space.nvec).tobytes())
+    elif isinstance(space, MultiBinary):
+        digest.update(str(space.n).encode('utf-8'))
+    elif isinstance(space, Tuple):
+        for subspace in space.spaces:
+            _update_fingerprint(digest, subspace)
+    elif isinstance(space, Dict):
+        for key, subspace in space.spaces.items():
+            digest.update(repr(key).encode('utf-8'))
+            _update_fingerprint(digest, subspace)
+    else:
+        digest.update(repr(space).encode('utf-8'))
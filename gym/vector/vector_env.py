@@ -27,12 +27,21 @@ class VectorEnv(gym.Env):
 
     action_space : `gym.spaces.Space` instance
         Action space of a single environment.
+
+    Notes
+    -----
+    The `action_space` is the `Tuple` of the action spaces of the
+    sub-environments, and its samples are sequences of actions accepted by
+    :meth:`step`. The `batched_action_space` holds the same actions as
+    batches (e.g. a single array for `Discrete` and `Box` action spaces),
+    which are sampled, and checked with `contains_batch`, in one call.
     """
     def __init__(self, num_envs, observation_space, action_space):
         super(VectorEnv, self).__init__()
         self.num_envs = num_envs
         self.observation_space = batch_space(observation_space, n=num_envs)
         self.action_space = Tuple((action_space,) * num_envs)
+        self.batched_action_space = batch_space(action_space, n=num_envs)
 
         self.closed = False
         self.viewer = None
@@ -158,6 +167,12 @@ class VectorEnvWrapper(VectorEnv):
     def __init__(self, env):
         assert isinstance(env, VectorEnv)
         self.env = env
+        # `gym.Env` defines these as class attributes, which would shadow
+        # the attributes of `self.env` forwarded by `__getattr__`
+        self.action_space = env.action_space
+        self.observation_space = env.observation_space
+        self.reward_range = env.reward_range
+        self.metadata = env.metadata
 
     # explicitly forward the methods defined in VectorEnv
     # to self.env (instead of the base class)
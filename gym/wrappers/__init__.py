@@ -2,12 +2,15 @@ from gym import error
 from gym.wrappers.monitor import Monitor
 from gym.wrappers.time_limit import TimeLimit
 from gym.wrappers.filter_observation import FilterObservation
-from gym.wrappers.atari_preprocessing import AtariPreprocessing
+from gym.wrappers.atari_preprocessing import AtariPreprocessing, VectorAtariPreprocessing
 from gym.wrappers.rescale_action import RescaleAction
 from gym.wrappers.flatten_observation import FlattenObservation
 from gym.wrappers.gray_scale_observation import GrayScaleObservation
 from gym.wrappers.frame_stack import LazyFrames
 from gym.wrappers.frame_stack import FrameStack
+from gym.wrappers.frame_stack import RingFrames
+from gym.wrappers.frame_stack import FrameReplay
+from gym.wrappers.frame_stack import VectorFrameStack
 from gym.wrappers.transform_observation import TransformObservation
 from gym.wrappers.transform_reward import TransformReward
 from gym.wrappers.resize_observation import ResizeObservation
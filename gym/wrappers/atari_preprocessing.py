@@ -3,6 +3,8 @@ import numpy as np
 import gym
 from gym.spaces import Box
 from gym.wrappers import TimeLimit
+from gym.vector import VectorEnvWrapper
+from gym.vector.utils import batch_space
 try:
     import cv2
 except ImportError:
@@ -30,7 +32,8 @@ class AtariPreprocessing(gym.Wrapper):
         env (Env): environment
         noop_max (int): max number of no-ops
         frame_skip (int): the frequency at which the agent experiences the game. 
-        screen_size (int): resize Atari frame
+        screen_size (int): resize Atari frame. If None, the max-pooled frame is returned at its
+            original size, e.g. to be resized for a whole batch by `VectorAtariPreprocessing`.
         terminal_on_life_loss (bool): if True, then step() returns done=True whenever a
             life is lost. 
         grayscale_obs (bool): if True, then gray scale observation is returned, otherwise, RGB observation
@@ -44,10 +47,10 @@ class AtariPreprocessing(gym.Wrapper):
     def __init__(self, env, noop_max=30, frame_skip=4, screen_size=84, terminal_on_life_loss=False, grayscale_obs=True,
                  grayscale_newaxis=False, scale_obs=False):
         super().__init__(env)
-        assert cv2 is not None, \
+        assert cv2 is not None or screen_size is None, \
             "opencv-python package not installed! Try running pip install gym[atari] to get dependencies  for atari"
         assert frame_skip > 0
-        assert screen_size > 0
+        assert screen_size is None or screen_size > 0
         assert noop_max >= 0
         if frame_skip > 1:
             assert 'NoFrameskip' in env.spec.id, 'disable frame-skipping in the original env. for more than one' \
@@ -75,7 +78,8 @@ class AtariPreprocessing(gym.Wrapper):
         self.game_over = False
 
         _low, _high, _obs_dtype = (0, 255, np.uint8) if not scale_obs else (0, 1, np.float32)
-        _shape = (screen_size, screen_size, 1 if grayscale_obs else 3)
+        _size = env.observation_space.shape[:2] if screen_size is None else (screen_size, screen_size)
+        _shape = _size + (1 if grayscale_obs else 3,)
         if grayscale_obs and not grayscale_newaxis:
             _shape = _shape[:-1]  # Remove channel axis
         self.observation_space = Box(low=_low, high=_high, shape=_shape, dtype=_obs_dtype)
@@ -127,7 +131,10 @@ class AtariPreprocessing(gym.Wrapper):
     def _get_obs(self):
         if self.frame_skip > 1:  # more efficient in-place pooling
             np.maximum(self.obs_buffer[0], self.obs_buffer[1], out=self.obs_buffer[0])
-        obs = cv2.resize(self.obs_buffer[0], (self.screen_size, self.screen_size), interpolation=cv2.INTER_AREA)
+        if self.screen_size is None:
+            obs = self.obs_buffer[0].copy()
+        else:
+            obs = cv2.resize(self.obs_buffer[0], (self.screen_size, self.screen_size), interpolation=cv2.INTER_AREA)
 
         if self.scale_obs:
             obs = np.asarray(obs, dtype=np.float32) / 255.0
@@ -137,3 +144,105 @@ class AtariPreprocessing(gym.Wrapper):
         if self.grayscale_obs and self.grayscale_newaxis:
             obs = np.expand_dims(obs, axis=-1)  # Add a channel axis
         return obs
+
+
+class VectorAtariPreprocessing(VectorEnvWrapper):
+    r"""Resizing and scaling of the Atari frames of a whole vectorized environment.
+
+    The sub-environments do the rest of the preprocessing, and return max-pooled frames
+    at their original size, e.g. with `AtariPreprocessing(env, screen_size=None)`. All
+    the frames of a batch are then downsampled at once, by area averaging like
+    `cv2.INTER_AREA`, into buffers which are allocated once, and optionally scaled to
+    [0, 1] in place.
+
+    Max-pooling stays in the sub-environments: it needs the last two frames of the
+    frame skip, which only the sub-environments see, and is done in place there.
+
+    Args:
+        env (VectorEnv): vectorized environment, whose observations are uint8 frames of
+            shape (height, width) or (height, width, channels)
+        screen_size (int): size of the square frames
+        grayscale_newaxis (bool): if True and the frames are grayscale, then a channel axis
+            is added to the observations.
+        scale_obs (bool): if True, then observations normalized in range [0,1] are returned.
+        copy (bool): if True, then `reset` and `step` return a copy of the observations,
+            otherwise the buffer, which is overwritten by the next call.
+    """
+
+    def __init__(self, env, screen_size=84, grayscale_newaxis=False, scale_obs=False, copy=True):
+        super().__init__(env)
+        space = env.single_observation_space
+        assert isinstance(space, Box) and space.dtype == np.uint8 and len(space.shape) in (2, 3), \
+            'the observations must be uint8 frames, got {}'.format(space)
+        assert screen_size > 0
+        self.screen_size = screen_size
+        self.scale_obs = scale_obs
+        self.copy = copy
+
+        height, width = space.shape[:2]
+        channels = space.shape[2:]
+        self._rows_area = _area_weights(height, screen_size, 1 + len(channels))
+        self._cols_area = _area_weights(width, screen_size, len(channels))
+        self._frames = np.empty((env.num_envs,) + space.shape, dtype=np.float32)
+        self._rows = np.empty((env.num_envs, screen_size, width) + channels, dtype=np.float32)
+        self._rows_buffer = np.empty_like(self._rows)
+        self._resized = np.empty((env.num_envs, screen_size, screen_size) + channels, dtype=np.float32)
+        self._resized_buffer = np.empty_like(self._resized)
+
+        _shape = (screen_size, screen_size) + channels
+        if not channels and grayscale_newaxis:
+            _shape = _shape + (1,)  # Add a channel axis
+        if scale_obs:
+            self.observations = self._resized.reshape((env.num_envs,) + _shape)
+            self.single_observation_space = Box(low=0, high=1, shape=_shape, dtype=np.float32)
+        else:
+            self.observations = np.empty((env.num_envs,) + _shape, dtype=np.uint8)
+            self.single_observation_space = Box(low=0, high=255, shape=_shape, dtype=np.uint8)
+        self.observation_space = batch_space(self.single_observation_space, n=env.num_envs)
+
+    def reset_wait(self, **kwargs):
+        return self._preprocess(self.env.reset_wait(**kwargs))
+
+    def step_wait(self, **kwargs):
+        observations, rewards, dones, infos = self.env.step_wait(**kwargs)
+        return self._preprocess(observations), rewards, dones, infos
+
+    def _preprocess(self, observations):
+        np.copyto(self._frames, observations)
+        _area_resample(self._frames, 1, self._rows_area, self._rows, self._rows_buffer)
+        _area_resample(self._rows, 2, self._cols_area, self._resized, self._resized_buffer)
+        np.rint(self._resized, out=self._resized)
+
+        if self.scale_obs:
+            self._resized *= 1. / 255.
+        else:
+            np.copyto(self.observations, self._resized.reshape(self.observations.shape), casting='unsafe')
+        return self.observations.copy() if self.copy else self.observations
+
+
+def _area_weights(in_size, out_size, trailing_dims=0):
+    """Returns the indices and weights of the pixels covered by each output pixel, as
+       (num_covered, out_size) arrays, the weights broadcasting over `trailing_dims` axes"""
+    scale = in_size / out_size
+    edges = np.arange(out_size + 1) * scale
+    pixels = np.arange(in_size)
+    overlap = np.minimum(edges[1:, None], pixels + 1.) - np.maximum(edges[:-1, None], pixels)
+    weights = np.maximum(overlap, 0.) / scale
+    # each output pixel only covers a few consecutive pixels
+    covered = weights > 0.
+    starts = covered.argmax(axis=1)
+    indices = starts + np.arange(covered.sum(axis=1).max())[:, None]
+    weights = np.where(indices < in_size, weights[np.arange(out_size), np.minimum(indices, in_size - 1)], 0.)
+    indices = np.minimum(indices, in_size - 1)
+    return indices, weights.astype(np.float32).reshape(weights.shape + (1,) * trailing_dims)
+
+
+def _area_resample(frames, axis, area, out, buffer):
+    """Averages along `axis` the pixels of `frames` covered by each pixel of `out`"""
+    indices, weights = area
+    np.take(frames, indices[0], axis=axis, out=out, mode='clip')
+    out *= weights[0]
+    for index, weight in zip(indices[1:], weights[1:]):
+        np.take(frames, index, axis=axis, out=buffer, mode='clip')
+        buffer *= weight
+        out += buffer
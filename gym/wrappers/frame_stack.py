@@ -3,6 +3,8 @@ import numpy as np
 
 from gym.spaces import Box
 from gym import Wrapper
+from gym.vector import VectorEnvWrapper
+from gym.vector.utils import batch_space
 
 
 class LazyFrames(object):
@@ -31,6 +33,17 @@ class LazyFrames(object):
         self._frames = frames
         self.lz4_compress = lz4_compress
 
+    @classmethod
+    def from_compressed(cls, frames, frame_shape, dtype):
+        r"""Wraps frames which are already compressed by lz4, without compressing them again."""
+        lazy_frames = cls.__new__(cls)
+        lazy_frames.frame_shape = tuple(frame_shape)
+        lazy_frames.shape = (len(frames),) + lazy_frames.frame_shape
+        lazy_frames.dtype = np.dtype(dtype)
+        lazy_frames._frames = frames
+        lazy_frames.lz4_compress = True
+        return lazy_frames
+
     def __array__(self, dtype=None):
         arr = self[:]
         if dtype is not None:
@@ -55,6 +68,150 @@ class LazyFrames(object):
         return frame
 
 
+class FrameReplay(object):
+    r"""Replay storage of stacked frames, which stores every frame only once.
+
+    Consecutive stacked observations share ``num_stack - 1`` frames. The frames are
+    appended one at a time, and the stacked observation ending at any stored frame is
+    rebuilt from its index, repeating the first frame of its episode like
+    :class:`FrameStack` does after a reset. The frames are stored in a circular
+    buffer of ``capacity`` frames, optionally compressed with lz4.
+
+    Example::
+
+        >>> storage = FrameReplay(1000000, 4, (84, 84), np.uint8)
+        >>> index = storage.append(env.reset()[-1], new_episode=True)
+        >>> next_index = storage.append(env.step(action)[0][-1])
+        >>> observations = storage.stack([index, next_index])  # shape (2, 4, 84, 84)
+
+    Args:
+        capacity (int): number of frames stored before the oldest ones are overwritten
+        num_stack (int): number of stacked frames
+        frame_shape (tuple): shape of a frame
+        dtype (np.dtype): type of the frames
+        lz4_compress (bool): use lz4 to compress the frames internally
+
+    """
+    def __init__(self, capacity, num_stack, frame_shape, dtype, lz4_compress=False):
+        assert capacity >= num_stack
+        self.capacity = capacity
+        self.num_stack = num_stack
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.lz4_compress = lz4_compress
+        if lz4_compress:
+            self._frames = np.empty((capacity,), dtype=object)
+        else:
+            self._frames = np.empty((capacity,) + self.frame_shape, dtype=self.dtype)
+        # index of the first frame of the episode of every frame
+        self._episode_starts = np.zeros((capacity,), dtype=np.int64)
+        self._offsets = np.arange(1 - num_stack, 1)
+        self.num_frames = 0  # number of frames ever appended, the index of the next one
+
+    def __len__(self):
+        return min(self.num_frames, self.capacity)
+
+    def append(self, frame, new_episode=False):
+        r"""Stores the next frame of the episode, or the first frame of a new episode,
+        and returns its index."""
+        index = self.num_frames
+        assert new_episode or index > 0, 'the first frame must start an episode'
+        slot = index % self.capacity
+        if self.lz4_compress:
+            from lz4.block import compress
+            self._frames[slot] = compress(np.ascontiguousarray(frame, dtype=self.dtype))
+        else:
+            self._frames[slot] = frame
+        self._episode_starts[slot] = index if new_episode \
+            else self._episode_starts[(index - 1) % self.capacity]
+        self.num_frames += 1
+        return index
+
+    def _frame_indices(self, indices):
+        r"""Returns the indices of the frames stacked in the observations ending at
+        ``indices``, of shape ``indices.shape + (num_stack,)``."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if np.any(indices >= self.num_frames) or np.any(indices < self.num_frames - len(self)):
+            raise IndexError('The frame index must be between {0} and {1}.'.format(
+                self.num_frames - len(self), self.num_frames - 1))
+        starts = self._episode_starts[indices % self.capacity]
+        frame_indices = np.maximum(indices[..., np.newaxis] + self._offsets, starts[..., np.newaxis])
+        if np.any(frame_indices < self.num_frames - self.capacity):
+            raise IndexError('The stacked observation has frames which have been overwritten.')
+        return frame_indices
+
+    def __getitem__(self, index):
+        r"""Returns the stacked observation ending at the frame ``index``, as :class:`LazyFrames`
+        sharing the stored frames, until they are overwritten."""
+        slots = self._frame_indices(index) % self.capacity
+        if self.lz4_compress:
+            return LazyFrames.from_compressed(list(self._frames[slots]), self.frame_shape, self.dtype)
+        return LazyFrames([self._frames[slot] for slot in slots])
+
+    def stack(self, indices):
+        r"""Returns the stacked observations ending at the frames ``indices``, as an array
+        of shape ``(len(indices), num_stack) + frame_shape``."""
+        slots = self._frame_indices(indices) % self.capacity
+        if not self.lz4_compress:
+            return self._frames[slots]
+        # every frame is decompressed once, even if it is in several observations
+        from lz4.block import decompress
+        unique_slots, inverse = np.unique(slots, return_inverse=True)
+        frames = np.empty((len(unique_slots),) + self.frame_shape, dtype=self.dtype)
+        for frame, slot in zip(frames, unique_slots):
+            frame[...] = np.frombuffer(decompress(self._frames[slot]), dtype=self.dtype).reshape(self.frame_shape)
+        return frames[inverse.reshape(slots.shape)]
+
+
+class RingFrames(object):
+    r"""Circular buffer of the most recent frames, whose ordered stack is a view.
+
+    The frames are written in a fixed backing array, with no allocation. Every frame
+    is written twice, at its position in the ring and ``num_stack`` positions after it,
+    so that the most recent ``num_stack`` frames are always contiguous and in order.
+
+    .. note::
+
+        The stack returned by :meth:`view` is overwritten by the next frames. It must
+        be copied to be kept, e.g. in a replay buffer.
+
+    Args:
+        num_stack (int): number of stacked frames
+        frame_shape (tuple): shape of a frame
+        dtype (np.dtype): type of the frames
+        batch_shape (tuple): shape of the batch of frames appended together, e.g.
+            ``(num_envs,)`` for the frames of a vectorized environment
+
+    """
+    def __init__(self, num_stack, frame_shape, dtype, batch_shape=()):
+        self.num_stack = num_stack
+        self.batch_shape = tuple(batch_shape)
+        self._buffer = np.zeros((2 * num_stack,) + self.batch_shape + tuple(frame_shape), dtype=dtype)
+        self._index = 0  # position of the oldest frame
+
+    def __len__(self):
+        return self.num_stack
+
+    def append(self, frame):
+        self._buffer[self._index] = frame
+        self._buffer[self._index + self.num_stack] = frame
+        self._index = (self._index + 1) % self.num_stack
+
+    def fill(self, frame, indices=None):
+        r"""Fills the whole stack with ``frame``, or only the stacks of the items
+        ``indices`` of the batch, with the frames ``frame``."""
+        if indices is None:
+            self._buffer[...] = frame
+        else:
+            self._buffer[:, indices] = frame
+
+    def view(self):
+        r"""Returns the stack, of shape ``batch_shape + (num_stack,) + frame_shape``,
+        from the oldest frame to the most recent one."""
+        stack = self._buffer[self._index:self._index + self.num_stack]
+        return np.moveaxis(stack, 0, len(self.batch_shape))
+
+
 class FrameStack(Wrapper):
     r"""Observation wrapper that stacks the observations in a rolling manner.
 
@@ -67,6 +224,12 @@ class FrameStack(Wrapper):
 
         To be memory efficient, the stacked observations are wrapped by :class:`LazyFrame`.
 
+    .. note::
+
+        With ``ring_buffer=True``, the frames are kept in a :class:`RingFrames` instead,
+        and the stacked observations are arrays, which are views of its backing array,
+        overwritten by the next steps. They must be copied to be kept.
+
     .. note::
 
         The observation space must be `Box` type. If one uses `Dict`
@@ -84,14 +247,20 @@ class FrameStack(Wrapper):
         env (Env): environment object
         num_stack (int): number of stacks
         lz4_compress (bool): use lz4 to compress the frames internally
+        ring_buffer (bool): stack the frames in a circular buffer, without allocation
 
     """
-    def __init__(self, env, num_stack, lz4_compress=False):
+    def __init__(self, env, num_stack, lz4_compress=False, ring_buffer=False):
         super(FrameStack, self).__init__(env)
+        assert not (lz4_compress and ring_buffer), 'the frames of the ring buffer are not compressed'
         self.num_stack = num_stack
         self.lz4_compress = lz4_compress
+        self.ring_buffer = ring_buffer
 
-        self.frames = deque(maxlen=num_stack)
+        if ring_buffer:
+            self.frames = RingFrames(num_stack, self.observation_space.shape, self.observation_space.dtype)
+        else:
+            self.frames = deque(maxlen=num_stack)
 
         low = np.repeat(self.observation_space.low[np.newaxis, ...], num_stack, axis=0)
         high = np.repeat(self.observation_space.high[np.newaxis, ...], num_stack, axis=0)
@@ -99,6 +268,8 @@ class FrameStack(Wrapper):
 
     def _get_observation(self):
         assert len(self.frames) == self.num_stack, (len(self.frames), self.num_stack)
+        if self.ring_buffer:
+            return self.frames.view()
         return LazyFrames(list(self.frames), self.lz4_compress)
 
     def step(self, action):
@@ -108,5 +279,55 @@ class FrameStack(Wrapper):
 
     def reset(self, **kwargs):
         observation = self.env.reset(**kwargs)
-        [self.frames.append(observation) for _ in range(self.num_stack)]
+        if self.ring_buffer:
+            self.frames.fill(observation)
+        else:
+            [self.frames.append(observation) for _ in range(self.num_stack)]
         return self._get_observation()
+
+
+class VectorFrameStack(VectorEnvWrapper):
+    r"""Stacks the observations of a vectorized environment in a rolling manner.
+
+    The observations of all the sub-environments are stacked together in a
+    :class:`RingFrames`, without allocation, and the stack of a sub-environment is
+    refilled with its first observation when its episode ends. The observations are
+    batches of shape ``(num_envs, num_stack) + frame_shape``.
+
+    Args:
+        env (VectorEnv): vectorized environment, with a `Box` observation space
+        num_stack (int): number of stacks
+        copy (bool): if True, then `reset` and `step` return a copy of the stacked
+            observations, otherwise a view of the ring buffer, which is overwritten by
+            the next steps.
+
+    """
+    def __init__(self, env, num_stack, copy=True):
+        super(VectorFrameStack, self).__init__(env)
+        space = env.single_observation_space
+        assert isinstance(space, Box), 'the observation space must be a Box, got {}'.format(space)
+        self.num_stack = num_stack
+        self.copy = copy
+        self.frames = RingFrames(num_stack, space.shape, space.dtype, batch_shape=(env.num_envs,))
+
+        low = np.repeat(space.low[np.newaxis, ...], num_stack, axis=0)
+        high = np.repeat(space.high[np.newaxis, ...], num_stack, axis=0)
+        self.single_observation_space = Box(low=low, high=high, dtype=space.dtype)
+        self.observation_space = batch_space(self.single_observation_space, n=env.num_envs)
+
+    def _get_observation(self):
+        observations = self.frames.view()
+        return observations.copy() if self.copy else observations
+
+    def reset_wait(self, **kwargs):
+        self.frames.fill(self.env.reset_wait(**kwargs))
+        return self._get_observation()
+
+    def step_wait(self, **kwargs):
+        observations, rewards, dones, infos = self.env.step_wait(**kwargs)
+        self.frames.append(observations)
+        if np.any(dones):
+            # the sub-environments which are done have been reset
+            indices = np.flatnonzero(dones)
+            self.frames.fill(observations[indices], indices=indices)
+        return self._get_observation(), rewards, dones, infos
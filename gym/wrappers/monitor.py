@@ -11,10 +11,13 @@ MANIFEST_PREFIX = FILE_PREFIX + '.manifest'
 
 class Monitor(Wrapper):
     def __init__(self, env, directory, video_callable=None, force=False, resume=False,
-                 write_upon_reset=False, uid=None, mode=None):
+                 write_upon_reset=False, uid=None, mode=None, video_queue_size=0, video_backpressure='block'):
         super(Monitor, self).__init__(env)
 
         self.videos = []
+        # see `VideoRecorder`, for the encoding of the videos in the background
+        self.video_queue_size = video_queue_size
+        self.video_backpressure = video_backpressure
 
         self.stats_recorder = None
         self.video_recorder = None
@@ -202,6 +205,8 @@ class Monitor(Wrapper):
             base_path=os.path.join(self.directory, '{}.video.{}.video{:06}'.format(self.file_prefix, self.file_infix, self.episode_id)),
             metadata={'episode_id': self.episode_id},
             enabled=self._video_enabled(),
+            queue_size=self.video_queue_size,
+            backpressure=self.video_backpressure,
         )
         self.video_recorder.capture_frame()
 
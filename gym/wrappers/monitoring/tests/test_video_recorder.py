@@ -1,11 +1,15 @@
+import distutils.spawn
 import json
 import os
 import shutil
+import sys
 import tempfile
 import numpy as np
+import pytest
 
 import gym
-from gym.wrappers.monitoring.video_recorder import VideoRecorder
+from gym import error
+from gym.wrappers.monitoring.video_recorder import VideoRecorder, ImageEncoder
 
 class BrokenRecordableEnv(object):
     metadata = {'render.modes': [None, 'rgb_array']}
@@ -63,3 +67,52 @@ def test_text_envs():
         video.close()
     finally:
         os.remove(video.path)
+
+def fake_encoder(tmp_path, monkeypatch, script):
+    """Puts first on the PATH a fake ffmpeg, which runs the Python `script`"""
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text('#!{}\n{}'.format(sys.executable, script))
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv('PATH', '{}{}{}'.format(tmp_path, os.pathsep, os.environ['PATH']))
+    monkeypatch.setattr(distutils.spawn, 'find_executable',
+        lambda name: str(ffmpeg) if name == 'ffmpeg' else None)
+    return str(tmp_path / 'video.mp4')
+
+@pytest.fixture
+def slow_encoder(tmp_path, monkeypatch):
+    """A fake ffmpeg, which reads its input slowly"""
+    return fake_encoder(tmp_path, monkeypatch,
+        'import sys, time\nwhile sys.stdin.buffer.read(30000):\n    time.sleep(0.02)\n')
+
+@pytest.fixture
+def dead_encoder(tmp_path, monkeypatch):
+    """A fake ffmpeg, which exits without reading its input"""
+    return fake_encoder(tmp_path, monkeypatch, 'import time\ntime.sleep(0.2)\n')
+
+@pytest.mark.parametrize('backpressure', ['block', 'drop', 'decimate'])
+def test_image_encoder_backpressure(slow_encoder, backpressure):
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    encoder = ImageEncoder(slow_encoder, frame.shape, 30, 30, queue_size=4, backpressure=backpressure)
+    for _ in range(40):
+        encoder.capture_frame(frame)
+    encoder.close()
+
+    assert encoder.frames_captured == 40
+    if backpressure == 'block':
+        assert encoder.frames_dropped == 0
+    else:
+        assert 0 < encoder.frames_dropped < 40
+
+def test_image_encoder_invalid_backpressure(slow_encoder):
+    with pytest.raises(error.Error):
+        ImageEncoder(slow_encoder, (100, 100, 3), 30, 30, queue_size=4, backpressure='skip')
+
+def test_image_encoder_writer_error(dead_encoder):
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    encoder = ImageEncoder(dead_encoder, frame.shape, 30, 30, queue_size=100)
+    # the frames are queued before the encoder exits, and fail to be written
+    for _ in range(20):
+        encoder.capture_frame(frame)
+    with pytest.raises(BrokenPipeError):
+        encoder.close()
+    assert encoder._writer_error is None
@@ -1,7 +1,9 @@
 import json
 import os
+import queue
 import subprocess
 import tempfile
+import threading
 import os.path
 import distutils.spawn, distutils.version
 import numpy as np
@@ -26,9 +28,16 @@ class VideoRecorder(object):
         base_path (Optional[str]): Alternatively, path to the video file without extension, which will be added.
         metadata (Optional[dict]): Contents to save to the metadata file.
         enabled (bool): Whether to actually record video, or just no-op (for convenience)
+        queue_size (int): If positive, the frames are sent to the video encoder by a background
+            thread, through a queue of at most `queue_size` frames. Otherwise each frame is sent
+            synchronously by `capture_frame`.
+        backpressure (str): What `capture_frame` does when the queue is full: 'block' until there is
+            room in the queue, 'drop' the frame, or 'decimate' (drop every other frame until the queue
+            is half empty). The numbers of captured and dropped frames are saved in the metadata.
     """
 
-    def __init__(self, env, path=None, metadata=None, enabled=True, base_path=None):
+    def __init__(self, env, path=None, metadata=None, enabled=True, base_path=None, queue_size=0,
+                 backpressure='block'):
         modes = env.metadata.get('render.modes', [])
         self._async = env.metadata.get('semantics.async')
         self.enabled = enabled
@@ -77,6 +86,8 @@ class VideoRecorder(object):
         self.frames_per_sec = env.metadata.get('video.frames_per_second', 30)
         self.output_frames_per_sec = env.metadata.get('video.output_frames_per_second', self.frames_per_sec)
         self.encoder = None # lazily start the process
+        self.queue_size = queue_size
+        self.backpressure = backpressure
         self.broken = False
 
         # Dump metadata
@@ -123,6 +134,9 @@ class VideoRecorder(object):
         if self.encoder:
             logger.debug('Closing video encoder: path=%s', self.path)
             self.encoder.close()
+            if not self.ansi_mode:
+                self.metadata['frames_captured'] = self.encoder.frames_captured
+                self.metadata['frames_dropped'] = self.encoder.frames_dropped
             self.encoder = None
         else:
             # No frames captured. Set metadata, and remove the empty output file.
@@ -159,7 +173,8 @@ class VideoRecorder(object):
 
     def _encode_image_frame(self, frame):
         if not self.encoder:
-            self.encoder = ImageEncoder(self.path, frame.shape, self.frames_per_sec, self.output_frames_per_sec)
+            self.encoder = ImageEncoder(self.path, frame.shape, self.frames_per_sec, self.output_frames_per_sec,
+                                        queue_size=self.queue_size, backpressure=self.backpressure)
             self.metadata['encoder_version'] = self.encoder.version_info
 
         try:
@@ -234,7 +249,17 @@ class TextEncoder(object):
         return {'backend':'TextEncoder','version':1}
 
 class ImageEncoder(object):
-    def __init__(self, output_path, frame_shape, frames_per_sec, output_frames_per_sec):
+    """Encodes RGB frames into a video with ffmpeg or avconv.
+
+    With a positive `queue_size`, the frames are written to the encoder by a background thread, so
+    that `capture_frame` does not wait for the encoder, and `backpressure` ('block', 'drop' or
+    'decimate') is what happens to the frames captured while the queue is full. The dropped frames
+    are skipped in the video, and counted in `frames_dropped`.
+    """
+    def __init__(self, output_path, frame_shape, frames_per_sec, output_frames_per_sec, queue_size=0,
+                 backpressure='block'):
+        if backpressure not in ('block', 'drop', 'decimate'):
+            raise error.Error("Invalid backpressure: {}. (Must be 'block', 'drop' or 'decimate'.)".format(backpressure))
         self.proc = None
         self.output_path = output_path
         # Frame shape should be lines-first, so w and h are swapped
@@ -246,6 +271,14 @@ class ImageEncoder(object):
         self.frame_shape = frame_shape
         self.frames_per_sec = frames_per_sec
         self.output_frames_per_sec = output_frames_per_sec
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._queue = None
+        self._writer = None
+        self._writer_error = None
+        self._decimating = False
 
         if distutils.spawn.find_executable('avconv') is not None:
             self.backend = 'avconv'
@@ -292,6 +325,39 @@ class ImageEncoder(object):
         else:
             self.proc = subprocess.Popen(self.cmdline, stdin=subprocess.PIPE)
 
+        if self.queue_size > 0:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._writer = threading.Thread(target=self._write_frames, name='ImageEncoder-writer')
+            self._writer.daemon = True
+            self._writer.start()
+
+    def _write_frames(self):
+        """Writes the queued frames to the encoder, until the `None` sentinel"""
+        while True:
+            frame_bytes = self._queue.get()
+            if frame_bytes is None:
+                return
+            if self._writer_error is not None:
+                # keep emptying the queue, so that `capture_frame` never blocks on a dead encoder
+                continue
+            try:
+                self.proc.stdin.write(frame_bytes)
+            except Exception as e:
+                self._writer_error = e
+
+    def _drop_frame(self):
+        if self.backpressure == 'block':
+            return False
+        if self.backpressure == 'decimate':
+            if self._queue.full():
+                self._decimating = True
+            elif self._queue.qsize() <= self.queue_size // 2:
+                self._decimating = False
+            if self._decimating and self.frames_captured % 2 == 0:
+                return True
+        # `capture_frame` is the only producer, so the queue stays not full until the next put
+        return self._queue.full()
+
     def capture_frame(self, frame):
         if not isinstance(frame, (np.ndarray, np.generic)):
             raise error.InvalidFrame('Wrong type {} for {} (must be np.ndarray or np.generic)'.format(type(frame), frame))
@@ -300,13 +366,41 @@ class ImageEncoder(object):
         if frame.dtype != np.uint8:
             raise error.InvalidFrame("Your frame has data type {}, but we require uint8 (i.e. RGB values from 0-255).".format(frame.dtype))
 
+        if self._writer_error is not None:
+            # raised once, the next frames are written to the encoder again
+            writer_error, self._writer_error = self._writer_error, None
+            raise writer_error
+
+        self.frames_captured += 1
+        if self._queue is not None and self._drop_frame():
+            self.frames_dropped += 1
+            return
+
         if distutils.version.LooseVersion(np.__version__) >= distutils.version.LooseVersion('1.9.0'):
-            self.proc.stdin.write(frame.tobytes())
+            frame_bytes = frame.tobytes()
         else:
-            self.proc.stdin.write(frame.tostring())
+            frame_bytes = frame.tostring()
+        if self._queue is None:
+            self.proc.stdin.write(frame_bytes)
+        else:
+            self._queue.put(frame_bytes)
 
     def close(self):
-        self.proc.stdin.close()
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self.frames_dropped:
+            logger.info('VideoRecorder dropped %d of %d frames', self.frames_dropped, self.frames_captured)
+        writer_error, self._writer_error = self._writer_error, None
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            # the encoder has exited, which the error of the writer reports
+            if writer_error is None:
+                raise
         ret = self.proc.wait()
         if ret != 0:
             logger.error("VideoRecorder encoder exited with status {}".format(ret))
+        if writer_error is not None:
+            raise writer_error
@@ -1,13 +1,14 @@
 import numpy as np
 import gym
-from gym.wrappers import AtariPreprocessing
+from gym.spaces import Box
+from gym.vector import SyncVectorEnv
+from gym.wrappers import AtariPreprocessing, VectorAtariPreprocessing
 import pytest
 
-pytest.importorskip('atari_py')
-
 
 @pytest.fixture(scope='module')
 def env_fn():
+    pytest.importorskip('atari_py')
     return lambda: gym.make('PongNoFrameskip-v4')
 
 
@@ -69,3 +70,101 @@ def test_atari_preprocessing_scale(env_fn):
                 step_i += 1
 
             env.close()
+
+
+class FramesEnv(gym.Env):
+    def __init__(self, shape):
+        self.observation_space = Box(low=0, high=255, shape=shape, dtype=np.uint8)
+        self.action_space = Box(low=0., high=1., shape=(), dtype=np.float32)
+        self.seed()
+
+    def seed(self, seed=None):
+        self.np_random = np.random.RandomState(seed)
+        return [seed]
+
+    def _frame(self):
+        return self.np_random.randint(0, 256, size=self.observation_space.shape).astype(np.uint8)
+
+    def reset(self):
+        return self._frame()
+
+    def step(self, action):
+        return self._frame(), 0., False, {}
+
+
+def make_env(shape, seed):
+    def _make():
+        env = FramesEnv(shape)
+        env.seed(seed)
+        return env
+    return _make
+
+
+def area_resize(frame, size):
+    """Reference downsampling, one output pixel at a time"""
+    height, width = frame.shape[:2]
+    out = np.zeros((size, size) + frame.shape[2:])
+    for i in range(size):
+        for j in range(size):
+            for y in range(height):
+                dy = min((i + 1) * height / size, y + 1) - max(i * height / size, y)
+                for x in range(width):
+                    dx = min((j + 1) * width / size, x + 1) - max(j * width / size, x)
+                    if dy > 0 and dx > 0:
+                        out[i, j] += dy * dx * frame[y, x]
+    return out * size * size / (height * width)
+
+
+@pytest.mark.parametrize('grayscale', [True, False])
+def test_vector_atari_preprocessing(grayscale):
+    shape = (21, 16) if grayscale else (21, 16, 3)
+    env = SyncVectorEnv([make_env(shape, i) for i in range(3)])
+    wrapped = VectorAtariPreprocessing(SyncVectorEnv([make_env(shape, i) for i in range(3)]), screen_size=12)
+    try:
+        channels = () if grayscale else (3,)
+        assert wrapped.single_observation_space.shape == (12, 12) + channels
+        assert wrapped.observation_space.shape == (3, 12, 12) + channels
+
+        frames, observations = env.reset(), wrapped.reset()
+        for _ in range(3):
+            assert observations.shape == (3, 12, 12) + channels and observations.dtype == np.uint8
+            expected = np.stack([area_resize(frame, 12) for frame in frames])
+            assert np.all(np.abs(observations - expected) <= 0.5 + 1e-3)
+            actions = env.action_space.sample()
+            frames, _, _, _ = env.step(actions)
+            observations, _, _, _ = wrapped.step(actions)
+    finally:
+        env.close()
+        wrapped.close()
+
+
+def test_vector_atari_preprocessing_scale_obs():
+    env = VectorAtariPreprocessing(SyncVectorEnv([make_env((21, 16), i) for i in range(3)]), screen_size=10)
+    scaled = VectorAtariPreprocessing(SyncVectorEnv([make_env((21, 16), i) for i in range(3)]), screen_size=10,
+                                      grayscale_newaxis=True, scale_obs=True, copy=False)
+    try:
+        assert scaled.single_observation_space == Box(low=0, high=1, shape=(10, 10, 1), dtype=np.float32)
+        observations = env.reset()
+        scaled_observations = scaled.reset()
+        assert scaled_observations.shape == (3, 10, 10, 1) and scaled_observations.dtype == np.float32
+        assert np.allclose(scaled_observations[..., 0], observations / 255.)
+
+        # without copy, the observations are written in place in the same buffer
+        actions = env.action_space.sample()
+        env.step(actions)
+        assert scaled.step(actions)[0] is scaled_observations
+    finally:
+        env.close()
+        scaled.close()
+
+
+def test_vector_atari_preprocessing_integer_factor():
+    env = SyncVectorEnv([make_env((168, 168), i) for i in range(4)])
+    wrapped = VectorAtariPreprocessing(SyncVectorEnv([make_env((168, 168), i) for i in range(4)]), screen_size=84)
+    try:
+        frames = env.reset().astype(np.float64)
+        expected = np.rint(frames.reshape(4, 84, 2, 84, 2).mean(axis=(2, 4)))
+        assert np.array_equal(wrapped.reset(), expected)
+    finally:
+        env.close()
+        wrapped.close()
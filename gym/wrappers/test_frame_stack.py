@@ -1,16 +1,23 @@
 import pytest
-pytest.importorskip("atari_py")
 
 import numpy as np
 import gym
-from gym.wrappers import FrameStack
+from gym.vector import SyncVectorEnv
+from gym.wrappers import (FrameStack, RingFrames, VectorFrameStack, FrameReplay,
+                          LazyFrames)
+try:
+    import atari_py
+except ImportError:
+    atari_py = None
 try:
     import lz4
 except ImportError:
     lz4 = None
 
 
-@pytest.mark.parametrize('env_id', ['CartPole-v1', 'Pendulum-v0', 'Pong-v0'])
+@pytest.mark.parametrize('env_id', ['CartPole-v1', 'Pendulum-v0',
+    pytest.param('Pong-v0', marks=pytest.mark.skipif(atari_py is None, reason="Need atari_py to run tests with Pong"))
+])
 @pytest.mark.parametrize('num_stack', [2, 3, 4])
 @pytest.mark.parametrize('lz4_compress', [
     pytest.param(True, marks=pytest.mark.skipif(lz4 is None, reason="Need lz4 to run tests with compression")),
@@ -38,3 +45,127 @@ def test_frame_stack(env_id, num_stack, lz4_compress):
 
     obs, _, _, _ = env.step(env.action_space.sample())
     assert len(obs) == num_stack
+
+
+def test_ring_frames():
+    frames = RingFrames(3, (2,), np.int64)
+    frames.fill(np.zeros(2))
+    for t in range(1, 8):
+        frames.append(np.full(2, t))
+        stack = frames.view()
+        assert stack.shape == (3, 2)
+        assert np.array_equal(stack[:, 0], [max(t - 2, 0), max(t - 1, 0), t])
+        # the stack is a view of the backing array
+        assert stack.base is not None and np.shares_memory(stack, frames._buffer)
+
+
+def test_ring_frames_batch():
+    frames = RingFrames(2, (), np.int64, batch_shape=(3,))
+    frames.fill(np.arange(3))
+    frames.append(np.arange(3) + 10)
+    assert np.array_equal(frames.view(), [[0, 10], [1, 11], [2, 12]])
+    frames.fill(np.array([20]), indices=np.array([1]))
+    assert np.array_equal(frames.view(), [[0, 10], [20, 20], [2, 12]])
+
+
+@pytest.mark.parametrize('env_id', ['CartPole-v1', 'Pendulum-v0'])
+@pytest.mark.parametrize('num_stack', [2, 3, 4])
+def test_frame_stack_ring_buffer(env_id, num_stack):
+    env = FrameStack(gym.make(env_id), num_stack)
+    ring_env = FrameStack(gym.make(env_id), num_stack, ring_buffer=True)
+    assert ring_env.observation_space == env.observation_space
+    env.seed(0)
+    ring_env.seed(0)
+
+    # the frames are stored with the dtype of the observation space
+    assert np.allclose(ring_env.reset(), np.asarray(env.reset()))
+    for _ in range(10):
+        action = env.action_space.sample()
+        observation, _, done, _ = env.step(action)
+        ring_observation, _, ring_done, _ = ring_env.step(action)
+        assert isinstance(ring_observation, np.ndarray)
+        assert np.allclose(ring_observation, np.asarray(observation))
+        if done:
+            break
+    env.close()
+    ring_env.close()
+
+
+def test_vector_frame_stack():
+    env_fns = [lambda: gym.make('CartPole-v1') for _ in range(3)]
+    envs = [FrameStack(env_fn(), 4) for env_fn in env_fns]
+    vector_env = VectorFrameStack(SyncVectorEnv(env_fns), 4)
+    assert vector_env.single_observation_space == envs[0].observation_space
+    assert vector_env.observation_space.shape == (3, 4, 4)
+    for i, env in enumerate(envs):
+        env.seed(i)
+    vector_env.seed(0)
+
+    observations = vector_env.reset()
+    assert np.allclose(observations, np.stack([np.asarray(env.reset()) for env in envs]))
+    np.random.seed(0)
+    for _ in range(50):
+        actions = np.random.randint(2, size=3)
+        observations, _, dones, _ = vector_env.step(actions)
+        for i, env in enumerate(envs):
+            observation, _, done, _ = env.step(actions[i])
+            assert done == dones[i]
+            if done:
+                observation = env.reset()
+            assert np.allclose(observations[i], np.asarray(observation))
+    vector_env.close()
+
+
+@pytest.mark.parametrize('lz4_compress', [
+    pytest.param(True, marks=pytest.mark.skipif(lz4 is None, reason="Need lz4 to run tests with compression")),
+    False
+])
+def test_frame_replay(lz4_compress):
+    env = FrameStack(gym.make('CartPole-v1'), 4)
+    env.seed(0)
+    env.action_space.seed(0)
+    storage = FrameReplay(100, 4, (4,), np.float64, lz4_compress=lz4_compress)
+
+    observations, indices = [], []
+    observation, done = env.reset(), True
+    for _ in range(80):
+        indices.append(storage.append(observation[-1], new_episode=done))
+        observations.append(np.asarray(observation))
+        observation, _, done, _ = env.step(env.action_space.sample())
+        if done:
+            observation = env.reset()
+    assert len(storage) == 80
+
+    for index, observation in zip(indices, observations):
+        lazy_frames = storage[index]
+        assert isinstance(lazy_frames, LazyFrames)
+        assert np.array_equal(np.asarray(lazy_frames), observation)
+    sampled = np.random.RandomState(0).randint(80, size=32)
+    assert np.array_equal(storage.stack(sampled), np.stack([observations[index] for index in sampled]))
+
+    # the oldest frames are overwritten
+    for _ in range(40):
+        storage.append(observation[-1])
+    assert len(storage) == 100
+    with pytest.raises(IndexError):
+        storage.stack([10])
+    assert np.array_equal(storage.stack([79]), observations[79][np.newaxis])
+    with pytest.raises(IndexError):
+        storage[120]
+    env.close()
+
+
+def test_frame_replay_shares_frames():
+    storage = FrameReplay(10, 3, (2,), np.int64)
+    for t in range(5):
+        storage.append(np.full(2, t), new_episode=(t in [0, 3]))
+    assert np.array_equal(storage.stack([0, 2, 3, 4])[..., 0], [[0, 0, 0], [0, 1, 2], [3, 3, 3], [3, 3, 4]])
+    # consecutive observations share the same frames
+    assert np.shares_memory(np.asarray(storage[1][2]), np.asarray(storage[2][1]))
+
+    # the observation ending at frame 2 stacks frames 0 and 1, which are overwritten
+    for t in range(5, 12):
+        storage.append(np.full(2, t))
+    assert np.array_equal(storage.stack([11])[..., 0], [[9, 10, 11]])
+    with pytest.raises(IndexError):
+        storage.stack([2])